@@ -0,0 +1,139 @@
+import heapq
+
+
+class TopKTracker:
+    """Indexed max-heap of per-key totals
+
+    add() bumps one key's total and restores heap order in O(log n); top()
+    returns the k largest totals in O(k log k) by walking the heap from the
+    root, so neither needs to sort every app.
+    """
+
+    def __init__(self):
+        self._keys = []       # heap of keys, ordered by their totals
+        self._position = {}   # key -> index in _keys
+        self.totals = {}      # key -> total
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key, amount):
+        total = self.totals.get(key, 0) + amount
+        self.totals[key] = total
+        index = self._position.get(key)
+        if index is None:
+            index = len(self._keys)
+            self._keys.append(key)
+            self._position[key] = index
+        if amount >= 0:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def top(self, k):
+        """Return [(key, total)] for the k largest totals, largest first"""
+        keys = self._keys
+        totals = self.totals
+        result = []
+        if not keys:
+            return result
+        frontier = [(-totals[keys[0]], 0)]
+        while frontier and len(result) < k:
+            negative_total, index = heapq.heappop(frontier)
+            result.append((keys[index], -negative_total))
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(keys):
+                    heapq.heappush(frontier, (-totals[keys[child]], child))
+        return result
+
+    def _swap(self, i, j):
+        keys = self._keys
+        keys[i], keys[j] = keys[j], keys[i]
+        self._position[keys[i]] = i
+        self._position[keys[j]] = j
+
+    def _sift_up(self, index):
+        totals = self.totals
+        keys = self._keys
+        while index > 0:
+            parent = (index - 1) // 2
+            if totals[keys[parent]] >= totals[keys[index]]:
+                break
+            self._swap(index, parent)
+            index = parent
+
+    def _sift_down(self, index):
+        totals = self.totals
+        keys = self._keys
+        size = len(keys)
+        while True:
+            largest = index
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < size and totals[keys[child]] > totals[keys[largest]]:
+                    largest = child
+            if largest == index:
+                return
+            self._swap(index, largest)
+            index = largest
+
+
+class RunningAnalytics:
+    """Session aggregates kept up to date as each sample arrives
+
+    Every processed sample adds to the tracked and unproductive totals and to
+    its focus phase's counters, so ``unproductive_time`` is the same number
+    the timer shows as "Distracted". Only samples that are logged to the
+    session (not WorkWise itself or an empty title) count towards per-app
+    usage. Each update is O(log n) in the number of apps, and reading any
+    aggregate or the top-K apps never rescans the session.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.tracked_time = 0
+        self.unproductive_time = 0
+        self.apps = TopKTracker()
+        self.phase_times = {}  # phase -> [productive seconds, unproductive seconds]
+
+    def add(self, seconds, unproductive, phase="", app=None):
+        self.tracked_time += seconds
+        counters = self.phase_times.get(phase)
+        if counters is None:
+            counters = self.phase_times[phase] = [0, 0]
+        if unproductive:
+            self.unproductive_time += seconds
+            counters[1] += seconds
+        else:
+            counters[0] += seconds
+        if app is not None:
+            self.apps.add(app, seconds)
+
+    @property
+    def productive_time(self):
+        return self.tracked_time - self.unproductive_time
+
+    @property
+    def app_times(self):
+        return self.apps.totals
+
+    def top_apps(self, k=3):
+        return self.apps.top(k)
+
+    def snapshot(self):
+        """Return the aggregates as a JSON-serializable dict"""
+        return {
+            "tracked_time": self.tracked_time,
+            "unproductive_time": self.unproductive_time,
+            "app_times": dict(self.apps.totals),
+            "phase_times": {phase: list(counters) for phase, counters in self.phase_times.items()},
+        }
+
+    def restore(self, state):
+        self.reset()
+        self.tracked_time = state["tracked_time"]
+        self.unproductive_time = state["unproductive_time"]
+        for app, seconds in state["app_times"].items():
+            self.apps.add(app, seconds)
+        self.phase_times = {phase: list(counters) for phase, counters in state["phase_times"].items()}
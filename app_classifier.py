@@ -0,0 +1,99 @@
+from collections import OrderedDict
+
+DEFAULT_UNPRODUCTIVE_APPS = ('chrome', 'firefox', 'edge')
+
+
+class AppClassifier:
+    """Decides whether a window title matches any unproductive app
+
+    Matches the original ``any(app in title for app in apps)`` rule, but the
+    app list is compiled into one Aho-Corasick automaton so a title is scanned
+    once no matter how many entries the list has. Verdicts are kept in an LRU
+    cache because the same few titles come back every tick. Call update()
+    whenever the app set changes; the automaton and cache are only rebuilt
+    when the contents actually differ.
+    """
+
+    def __init__(self, apps=(), cache_size=4096):
+        self.cache_size = cache_size
+        self.apps = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.update(apps)
+
+    def update(self, apps):
+        """Recompile the matcher if ``apps`` differs from the current set"""
+        apps = frozenset(apps)
+        if apps == self.apps:
+            return False
+        self.apps = apps
+        self._match_all = "" in apps  # an empty entry is a substring of every title
+        self._build(app for app in apps if app)
+        self._cache = OrderedDict()
+        return True
+
+    def is_unproductive(self, title):
+        cache = self._cache
+        verdict = cache.get(title)
+        if verdict is not None:
+            cache.move_to_end(title)
+            self.cache_hits += 1
+            return verdict
+        self.cache_misses += 1
+        verdict = self._match_all or self._search(title)
+        cache[title] = verdict
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return verdict
+
+    def classify(self, titles):
+        """Return a list of unproductive verdicts, one per title"""
+        is_unproductive = self.is_unproductive
+        return [is_unproductive(title) for title in titles]
+
+    def _build(self, apps):
+        # State 0 is the root; each state has a transition dict, a failure
+        # link and a flag saying whether any pattern ends at or below it
+        goto = [{}]
+        fail = [0]
+        output = [False]
+        for app in apps:
+            state = 0
+            for char in app:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    fail.append(0)
+                    output.append(False)
+                state = next_state
+            output[state] = True
+
+        # Breadth-first pass to fill in failure links
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                output[next_state] = output[next_state] or output[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def _search(self, title):
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for char in title:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                return True
+        return False
@@ -0,0 +1,365 @@
+"""Fleet report over WorkWise data collected from many machines.
+
+Walks ``directory`` for session files and analyzes them in a process pool:
+
+* ``*.db``: a history database (workwise_history.db), every session the
+  app has recorded on that machine; read-only
+* ``*.ndjson`` / ``*.jsonl``: session journal segments ("start", "snapshot",
+  "sample" and "stop" records) or recorded window traces. A journal only
+  holds the latest session, which that machine's history database may
+  already have, so collect one or the other
+
+Every title is classified with the unproductive app list from
+app_settings.json (or ``--apps``), the same rule the app applies, so
+recorded verdicts from other machines' settings are ignored. Files are
+attributed to a user by the subdirectory they are in, so copying each
+machine's workwise_history.db into ``collected/<user>/`` is enough:
+
+    python batch_analyze.py collected/ --workers 8 --json report.json
+"""
+import argparse
+import heapq
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from app_classifier import DEFAULT_UNPRODUCTIVE_APPS, AppClassifier
+from engine import WORK
+from history_store import read_sessions
+from journal import read_segment
+from session_store import SessionStore
+from tracking import SessionTracker
+from window_sampler import WindowSample
+
+HISTORY_SUFFIX = ".db"
+SESSION_SUFFIXES = (".ndjson", ".jsonl", HISTORY_SUFFIX)
+SPIKE_GAP = 1.0  # seconds between unproductive intervals that still count as one spike
+
+# Per-worker state, set by _init_worker
+_classifier = None
+_options = None
+
+
+class Report:
+    """Mergeable fleet totals
+
+    merge() is associative and commutative with an empty Report as its
+    identity, so per-file reports can be combined in any grouping: inside
+    a worker, then across workers as results arrive.
+    """
+
+    def __init__(self, top=10):
+        self.top = top
+        self.files = 0
+        self.sessions = 0
+        self.errors = 0
+        self.error_samples = []   # first few "path: error" messages, sorted
+        self.productive = 0.0
+        self.unproductive = 0.0
+        self.app_seconds = {}     # title -> seconds
+        self.phase_seconds = {}   # phase -> [productive, unproductive]
+        self.user_seconds = {}    # user -> [productive, unproductive]
+        self.spike_count = 0
+        self.spike_seconds = 0.0
+        self.spike_hours = [0] * 24  # spikes by local hour of day they started
+        self.top_spikes = []      # (seconds, user, path, start, app), largest first
+
+    def merge(self, other):
+        self.files += other.files
+        self.sessions += other.sessions
+        self.errors += other.errors
+        self.error_samples = sorted(self.error_samples + other.error_samples)[:5]
+        self.productive += other.productive
+        self.unproductive += other.unproductive
+        for app, seconds in other.app_seconds.items():
+            self.app_seconds[app] = self.app_seconds.get(app, 0) + seconds
+        for totals, other_totals in ((self.phase_seconds, other.phase_seconds),
+                                     (self.user_seconds, other.user_seconds)):
+            for key, (productive, unproductive) in other_totals.items():
+                pair = totals.setdefault(key, [0, 0])
+                pair[0] += productive
+                pair[1] += unproductive
+        self.spike_count += other.spike_count
+        self.spike_seconds += other.spike_seconds
+        self.spike_hours = [a + b for a, b in zip(self.spike_hours, other.spike_hours)]
+        self.top_spikes = heapq.nlargest(self.top, self.top_spikes + other.top_spikes)
+        return self
+
+    def add_session(self, store, user, path, classifier, spike_seconds):
+        """Account the intervals of one replayed session"""
+        self.sessions += 1
+        user_pair = self.user_seconds.setdefault(user, [0, 0])
+        spike = None  # [start, end, seconds, {app: seconds}]
+        for start, end, title, _, _, phase in store:
+            seconds = end - start
+            unproductive = classifier.is_unproductive(title)
+            self.app_seconds[title] = self.app_seconds.get(title, 0) + seconds
+            phase_pair = self.phase_seconds.setdefault(phase, [0, 0])
+            if unproductive:
+                self.unproductive += seconds
+                phase_pair[1] += seconds
+                user_pair[1] += seconds
+            else:
+                self.productive += seconds
+                phase_pair[0] += seconds
+                user_pair[0] += seconds
+
+            if unproductive and phase == WORK:
+                if spike is not None and start - spike[1] <= SPIKE_GAP:
+                    spike[1] = end
+                    spike[2] += seconds
+                else:
+                    self._close_spike(spike, user, path, spike_seconds)
+                    spike = [start, end, seconds, {}]
+                spike[3][title] = spike[3].get(title, 0) + seconds
+            else:
+                self._close_spike(spike, user, path, spike_seconds)
+                spike = None
+        self._close_spike(spike, user, path, spike_seconds)
+
+    def _close_spike(self, spike, user, path, spike_seconds):
+        if spike is None or spike[2] < spike_seconds:
+            return
+        start, _, seconds, apps = spike
+        self.spike_count += 1
+        self.spike_seconds += seconds
+        self.spike_hours[time.localtime(start).tm_hour] += 1
+        app = max(apps, key=lambda title: (apps[title], title))
+        self.top_spikes = heapq.nlargest(self.top, self.top_spikes + [(seconds, user, path, start, app)])
+
+    def to_dict(self):
+        return {
+            "files": self.files,
+            "sessions": self.sessions,
+            "errors": self.errors,
+            "error_samples": self.error_samples,
+            "productive_seconds": self.productive,
+            "unproductive_seconds": self.unproductive,
+            "app_seconds": self.app_seconds,
+            "phase_seconds": self.phase_seconds,
+            "user_seconds": self.user_seconds,
+            "spikes": {
+                "count": self.spike_count,
+                "seconds": self.spike_seconds,
+                "by_hour": self.spike_hours,
+                "top": [
+                    {"seconds": seconds, "user": user, "file": path, "start": start, "app": app}
+                    for seconds, user, path, start, app in self.top_spikes
+                ],
+            },
+        }
+
+
+def read_session_file(path, check_interval=1.0):
+    """Yield a SessionStore for every session in one file"""
+    if path.endswith(HISTORY_SUFFIX):
+        for _, intervals in read_sessions(path):
+            store = SessionStore(check_interval)
+            for start, end, title, productive, phase in intervals:
+                ticks = max(1, round((end - start) / check_interval))
+                store.add_interval(start, end, title, productive, ticks, phase)
+            yield store
+        return
+    for records in split_sessions(read_segment(path)):
+        yield replay_session(records, check_interval)
+
+
+def split_sessions(records):
+    """Group records into sessions, each starting at its latest start or snapshot
+
+    A snapshot holds the whole session so far, so records before it are
+    dropped. Samples with no header (window traces) form their own group.
+    """
+    sessions = []
+    current = None
+    session_id = None
+    for record in records:
+        kind = record.get("type")
+        if kind in ("start", "snapshot"):
+            if kind == "start" or current is None or record.get("session_id") != session_id:
+                current = []
+                sessions.append(current)
+                session_id = record.get("session_id")
+            current.clear()
+            current.append(record)
+        elif kind == "stop":
+            current = None
+        else:
+            if current is None:
+                current = []
+                sessions.append(current)
+                session_id = None
+            current.append(record)
+    return [session for session in sessions if session]
+
+
+def replay_session(records, check_interval=1.0):
+    """Rebuild a session's SessionStore with the app's own accounting rules"""
+    tracker = SessionTracker((), check_interval)
+    if records[0].get("type") in ("start", "snapshot"):
+        tracker.restore(records)
+    else:
+        for record in records:
+            timestamp = record.get("t")
+            if not isinstance(timestamp, (int, float)):
+                raise ValueError(f"record without a timestamp: {record}")
+            title = (record.get("title") or record.get("app") or "").lower()
+            tracker.phase = record.get("phase", "")
+            # Verdicts are reapplied per interval with the fleet-wide list
+            tracker.process(WindowSample(timestamp, title, record.get("process", "")), False)
+    return tracker.session_data
+
+
+def iter_session_files(directory):
+    """Yield (path, user) for every session file under ``directory`` in a stable order"""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        user = os.path.relpath(root, directory)
+        user = "" if user == "." else user.replace(os.sep, "/")
+        for name in sorted(files):
+            if name.endswith(SESSION_SUFFIXES):
+                yield os.path.join(root, name), user
+
+
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _init_worker(apps, options):
+    global _classifier, _options
+    _classifier = AppClassifier(apps)
+    _options = options
+
+
+def analyze_file(path, user):
+    report = Report(_options["top"])
+    try:
+        for store in read_session_file(path, _options["check_interval"]):
+            report.add_session(store, user, path, _classifier, _options["spike_seconds"])
+        report.files = 1
+    except Exception as e:
+        report.errors = 1
+        report.error_samples = [f"{path}: {e}"]
+    return report
+
+
+def analyze_batch(batch):
+    """Analyze a batch of (path, user) pairs and merge them inside the worker"""
+    report = Report(_options["top"])
+    for path, user in batch:
+        report.merge(analyze_file(path, user))
+    return report
+
+
+def analyze_directory(directory, apps, workers=None, batch_size=32, top=10,
+                      spike_seconds=60, check_interval=1.0):
+    """Return the merged Report for every session file under ``directory``"""
+    options = {"top": top, "spike_seconds": spike_seconds, "check_interval": check_interval}
+    batches = batched(iter_session_files(directory), batch_size)
+    report = Report(top)
+    if workers == 1:
+        _init_worker(apps, options)
+        for batch in batches:
+            report.merge(analyze_batch(batch))
+        return report
+    with multiprocessing.Pool(workers, _init_worker, (list(apps), options)) as pool:
+        for partial in pool.imap_unordered(analyze_batch, batches):
+            report.merge(partial)
+    return report
+
+
+def load_unproductive_apps(settings_file):
+    """Read the app list the way ProductivityApp.load_settings does"""
+    try:
+        with open(settings_file) as f:
+            return set(json.load(f).get("unproductive_apps", []))
+    except FileNotFoundError:
+        return set(DEFAULT_UNPRODUCTIVE_APPS)
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def print_report(report, classifier, limit=10):
+    tracked = report.productive + report.unproductive
+    ratio = report.productive / tracked * 100 if tracked else 0
+    print(f"Files: {report.files} ({report.errors} unreadable), sessions: {report.sessions}")
+    for message in report.error_samples:
+        print(f"  {message}")
+    print(f"Tracked: {format_duration(tracked)}, productive {ratio:.1f}%")
+
+    print("\nMost used apps:")
+    apps = sorted(report.app_seconds.items(), key=lambda item: (-item[1], item[0]))
+    for app, seconds in apps[:limit]:
+        flag = " (unproductive)" if classifier.is_unproductive(app) else ""
+        print(f"  {format_duration(seconds):>10s}  {app[:60]}{flag}")
+
+    print("\nBy user:")
+    for user, (productive, unproductive) in sorted(report.user_seconds.items()):
+        total = productive + unproductive
+        print(f"  {user or '(top level)':24s} {format_duration(total):>10s}  "
+              f"{productive / total * 100 if total else 0:5.1f}% productive")
+
+    print("\nBy focus phase:")
+    for phase, (productive, unproductive) in sorted(report.phase_seconds.items()):
+        total = productive + unproductive
+        print(f"  {phase or '(normal mode)':24s} {format_duration(total):>10s}  "
+              f"{productive / total * 100 if total else 0:5.1f}% productive")
+
+    print(f"\nDistraction spikes in Work phases: {report.spike_count}, "
+          f"{format_duration(report.spike_seconds)} in total")
+    if report.spike_count:
+        peak = max(range(24), key=lambda hour: report.spike_hours[hour])
+        print(f"  most spikes start at {peak:02d}:00 ({report.spike_hours[peak]})")
+        for seconds, user, path, start, app in report.top_spikes[:limit]:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(start))
+            print(f"  {format_duration(seconds):>10s}  {when}  {user or '(top level)'}  {app[:40]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--settings", default="app_settings.json",
+                        help="settings file with the unproductive app list")
+    parser.add_argument("--apps", help="comma-separated unproductive apps (overrides --settings)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=32, help="files per task")
+    parser.add_argument("--spike-seconds", type=float, default=60,
+                        help="shortest unproductive stretch in a Work phase counted as a spike")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", help="also write the full report to this file")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"Error: {args.directory} is not a directory")
+        sys.exit(2)
+    if args.apps is not None:
+        apps = {app.strip().lower() for app in args.apps.split(",") if app.strip()}
+    else:
+        apps = load_unproductive_apps(args.settings)
+
+    start = time.perf_counter()
+    report = analyze_directory(args.directory, apps, args.workers, args.batch_size,
+                               args.top, args.spike_seconds)
+    seconds = time.perf_counter() - start
+
+    print_report(report, AppClassifier(apps), args.top)
+    print(f"\nAnalyzed {report.files + report.errors} files in {seconds:.2f} s")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Measure how batch_analyze scales with worker processes.
+
+Writes ``--files`` synthetic session files into a temporary directory, split
+across ``--users`` user subdirectories: mostly journal segments (a "start"
+record, 1 Hz samples through Work and Break phases, a "stop"), plus some
+window traces and history databases of a few sessions each. It then analyzes the directory
+with 1, 2, 4, ... up to ``--max-workers`` processes and reports files/s
+and the speedup over one worker.
+
+Every run must produce the same report (totals compared after rounding to
+milliseconds); otherwise the merge is not associative and the benchmark
+fails with exit status 1. The parent's share of the one-worker run (walking
+the tree, unpickling and merging partial reports) is printed too, since
+that serial part bounds the speedup more cores can give.
+
+    python benchmarks/bench_batch_analyze.py --files 4000 --max-workers 8
+"""
+import argparse
+import json
+import os
+import pickle
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_analyze  # noqa: E402
+from engine import BREAK, WORK  # noqa: E402
+from history_store import HistoryStore  # noqa: E402
+from tracking import SessionTracker  # noqa: E402
+
+APPS = ["main.py - visual studio code", "youtube - google chrome", "slack - general",
+        "terminal", "reddit - mozilla firefox", "docs - microsoft edge", "figma"]
+UNPRODUCTIVE_APPS = ["youtube", "reddit", "slack"]
+START = 1_700_000_000.0
+
+
+def session_records(rng, start, seconds):
+    """Journal records for one session of ``seconds`` 1 Hz samples"""
+    tracker = SessionTracker(())
+    tracker.reset(int(start * 1000))
+    tracker.phase = WORK
+    records = [dict(type="start", t=start, mode="focus", start_time=start, **tracker.snapshot())]
+    title = rng.choice(APPS)
+    for tick in range(1, seconds + 1):
+        if rng.random() < 0.03:
+            title = rng.choice(APPS)
+        # 25 minute Work phases with 5 minute breaks
+        phase = WORK if tick % 1800 < 1500 else BREAK
+        # Verdicts from another machine's settings; the analyzer reapplies its own
+        records.append({"type": "sample", "t": start + tick, "app": title,
+                        "unproductive": False, "phase": phase})
+    records.append({"type": "stop", "t": start + seconds})
+    return records
+
+
+def write_history(path, rng, start, seconds, sessions=3):
+    """A workwise_history.db holding ``sessions`` sessions, written the way the app does"""
+    history = HistoryStore(path, batch_size=5000)
+    history.start()
+    for index in range(sessions):
+        tracker = SessionTracker((), history=history)
+        tracker.restore(session_records(rng, start + index * 86400, seconds))
+        tracker.finish()
+    history.close(timeout=None)
+
+
+def write_files(directory, count, users, seconds, seed=0):
+    rng = random.Random(seed)
+    for index in range(count):
+        user_dir = os.path.join(directory, f"user{index % users:03d}")
+        os.makedirs(user_dir, exist_ok=True)
+        start = START + index * 3600
+        kind = index % 10
+        if kind == 8:  # recorded window trace
+            path = os.path.join(user_dir, f"trace-{index:05d}.jsonl")
+            title = rng.choice(APPS)
+            rows = []
+            for tick in range(seconds):
+                if rng.random() < 0.03:
+                    title = rng.choice(APPS)
+                rows.append({"t": start + tick, "title": title, "process": ""})
+        elif kind == 9:  # a machine's history database
+            write_history(os.path.join(user_dir, f"history-{index:05d}.db"), rng, start, seconds)
+            continue
+        else:
+            path = os.path.join(user_dir, f"segment-{index:05d}.ndjson")
+            rows = session_records(rng, start, seconds)
+        with open(path, "w") as f:
+            f.writelines(json.dumps(row) + "\n" for row in rows)
+
+
+def fingerprint(report):
+    """Report contents with float totals rounded, for comparing runs"""
+    def rounded(value):
+        if isinstance(value, float):
+            return round(value, 3)
+        if isinstance(value, dict):
+            return {key: rounded(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [rounded(item) for item in value]
+        return value
+    return json.dumps(rounded(report.to_dict()), sort_keys=True)
+
+
+def parent_share(directory, batch_size):
+    """Seconds the parent spends walking, unpickling and merging, without the analysis"""
+    batch_analyze._init_worker(UNPRODUCTIVE_APPS, {"top": 10, "spike_seconds": 60, "check_interval": 1.0})
+    partials = [pickle.dumps(batch_analyze.analyze_batch(batch))
+                for batch in batch_analyze.batched(batch_analyze.iter_session_files(directory), batch_size)]
+    start = time.perf_counter()
+    report = batch_analyze.Report()
+    sum(1 for _ in batch_analyze.iter_session_files(directory))
+    for partial in partials:
+        report.merge(pickle.loads(partial))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--minutes", type=int, default=10, help="length of each session")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="workwise-batch-")
+    try:
+        start = time.perf_counter()
+        write_files(directory, args.files, args.users, args.minutes * 60)
+        print(f"Wrote {args.files} files ({args.minutes} min sessions) in {time.perf_counter() - start:.1f} s; "
+              f"{os.cpu_count()} CPUs available")
+
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= args.max_workers:
+            worker_counts.append(worker_counts[-1] * 2)
+        if worker_counts[-1] != args.max_workers:
+            worker_counts.append(args.max_workers)
+
+        print(f"{'workers':>8s} {'seconds':>9s} {'files/s':>9s} {'speedup':>8s} {'efficiency':>11s}")
+        baseline = None
+        expected = None
+        ok = True
+        for workers in worker_counts:
+            start = time.perf_counter()
+            report = batch_analyze.analyze_directory(directory, UNPRODUCTIVE_APPS, workers, args.batch_size)
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            speedup = baseline / seconds
+            print(f"{workers:8d} {seconds:9.2f} {args.files / seconds:9.0f} {speedup:7.2f}x "
+                  f"{speedup / workers * 100:10.0f}%")
+            if report.errors or report.files != args.files:
+                print(f"  FAIL: analyzed {report.files} files with {report.errors} errors")
+                ok = False
+            if expected is None:
+                expected = fingerprint(report)
+            elif fingerprint(report) != expected:
+                print(f"  FAIL: report with {workers} workers differs from the 1-worker report")
+                ok = False
+
+        serial = parent_share(directory, args.batch_size)
+        fraction = serial / baseline
+        print(f"Parent (walk + unpickle + merge): {serial * 1000:.0f} ms, {fraction * 100:.2f}% of the "
+              f"1-worker run; Amdahl bound {1 / (fraction + (1 - fraction) / args.max_workers):.1f}x "
+              f"at {args.max_workers} workers")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compare the compiled AppClassifier with the original linear substring scan.
+
+Builds a synthetic block list (domains, app names, keywords) and a stream of
+window titles with realistic repetition, checks that both paths agree on
+every title and reports titles per second for each.
+
+    python benchmarks/bench_classifier.py --apps 5000 --titles 20000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_classifier import AppClassifier  # noqa: E402
+
+WORDS = ["youtube", "reddit", "twitter", "netflix", "steam", "discord", "news", "game",
+         "code", "terminal", "docs", "mail", "calendar", "slack", "jira", "notes"]
+
+
+def random_word(rng, low=4, high=10):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+def synthetic_block_list(count, seed=0):
+    rng = random.Random(seed)
+    apps = set(WORDS[:8])
+    while len(apps) < count:
+        kind = rng.random()
+        if kind < 0.5:
+            apps.add(f"{random_word(rng)}.{rng.choice(['com', 'net', 'io', 'tv'])}")
+        elif kind < 0.8:
+            apps.add(random_word(rng, 5, 12))
+        else:
+            apps.add(f"{random_word(rng)} {random_word(rng)}")
+    return apps
+
+
+def synthetic_titles(count, distinct=500, seed=1):
+    rng = random.Random(seed)
+    pool = [
+        f"{random_word(rng)} - {rng.choice(WORDS)} - {random_word(rng, 6, 14)} {random_word(rng)}"
+        for _ in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", type=int, default=5000, help="block list size")
+    parser.add_argument("--titles", type=int, default=20000, help="titles to classify")
+    args = parser.parse_args()
+
+    apps = synthetic_block_list(args.apps)
+    titles = synthetic_titles(args.titles)
+
+    start = time.perf_counter()
+    linear = [any(app in title for app in apps) for title in titles]
+    linear_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    classifier = AppClassifier(apps)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = classifier.classify(titles)
+    compiled_seconds = time.perf_counter() - start
+
+    uncached = AppClassifier(apps, cache_size=0)
+    start = time.perf_counter()
+    uncached.classify(titles)
+    uncached_seconds = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(linear, compiled))
+    print(f"Block list:        {len(apps)} entries, {len(titles)} titles")
+    print(f"Automaton build:   {build_seconds * 1000:.1f} ms")
+    print(f"Linear scan:       {len(titles) / linear_seconds:,.0f} titles/s")
+    print(f"Automaton only:    {len(titles) / uncached_seconds:,.0f} titles/s")
+    print(f"Automaton + cache: {len(titles) / compiled_seconds:,.0f} titles/s "
+          f"({classifier.cache_hits} hits, {classifier.cache_misses} misses)")
+    print(f"Mismatches:        {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Replay a simulated focus session through the headless TrackerEngine.
+
+Runs TrackerEngine on a VirtualClock for ``--hours`` of Pomodoro cycles with
+a scripted foreground window (an app switch every ~30 s) and a scripted
+camera (10 results a second, with away spans), then checks the result
+against what the session should have produced:
+
+* phase changes follow Work -> Break ... and a Long Break after every 4th
+  Work phase, each phase starting exactly when the previous one ran out
+* distracted time equals the unproductive window checks
+* an "away" warning is raised in every away span that outlasts the grace
+  period during a Work phase, and never while the user is present
+
+Exits with status 1 when a check fails or the replay is slower than
+``--max-seconds``.
+
+    python benchmarks/bench_engine_simulation.py --hours 8 --max-seconds 1
+"""
+import argparse
+import bisect
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import BREAK, LONG_BREAK, WORK, EngineListener, TrackerEngine, VirtualClock  # noqa: E402
+from presence import PresencePolicy  # noqa: E402
+from simulation import ScriptedCamera, ScriptedWindowSource, run_simulation  # noqa: E402
+from tracking import SessionTracker  # noqa: E402
+
+APPS = [f"project {n} - visual studio code" for n in range(20)] + \
+       [f"youtube - video {n} - google chrome" for n in range(10)] + \
+       [f"terminal {n}" for n in range(10)]
+UNPRODUCTIVE_APPS = ["youtube"]
+START = 1_700_000_000.0
+
+
+class RecordingListener(EngineListener):
+    def __init__(self, clock):
+        self.clock = clock
+        self.phases = []    # (time, phase, completed_sessions)
+        self.warnings = []  # (time, reason)
+
+    def on_phase_change(self, phase, completed_sessions):
+        self.phases.append((self.clock.time(), phase, completed_sessions))
+
+    def on_warning(self, reason):
+        self.warnings.append((self.clock.time(), reason))
+
+
+def synthetic_script(hours, seed=0):
+    """Return (window switches, away spans) for ``hours`` of activity from START"""
+    rng = random.Random(seed)
+    end = START + hours * 3600
+    switches = []
+    t = START
+    while t < end:
+        switches.append((t, rng.choice(APPS)))
+        t += max(1, int(rng.expovariate(1 / 30)))
+    away = []
+    t = START + 300
+    while t < end:
+        length = rng.choice([2, 4, 30, 120])  # some shorter than the grace period
+        away.append((t, t + length))
+        t += length + rng.randint(300, 1800)
+    return switches, away
+
+
+def expected_phases(engine, duration):
+    """[(time, phase)] the phase machine should produce over ``duration`` seconds"""
+    phases = []
+    t, phase, completed = START, WORK, 0
+    while True:
+        # Phase changes are seen on the first timer tick at or after the deadline
+        t += engine.phase_durations[phase]
+        if t > START + duration:
+            return phases
+        if phase == WORK:
+            completed += 1
+            phase = LONG_BREAK if completed % engine.sessions_before_long_break == 0 else BREAK
+        else:
+            phase = WORK
+        phases.append((t, phase))
+
+
+def check(engine, listener, switches, away, duration):
+    failures = []
+    got = [(t, phase) for t, phase, _ in listener.phases]
+    want = expected_phases(engine, duration)
+    if got != want:
+        failures.append(f"phase changes differ: got {got[:6]}..., want {want[:6]}...")
+
+    classifier = engine.tracker.classifier
+    unproductive = sum(
+        1 for second in range(int(duration) + 1)
+        if classifier.is_unproductive(title_at(switches, START + second))
+    )
+    if engine.distracted_time != unproductive:
+        failures.append(f"distracted {engine.distracted_time} s, expected {unproductive} s")
+
+    warned = {t for t, reason in listener.warnings if reason == "away"}
+    for span_start, span_end in away:
+        in_span = [t for t in warned if span_start <= t < span_end + 0.1]
+        outlasts = span_end - span_start > engine.face_grace_period
+        if in_span and not outlasts:
+            failures.append(f"away warning in a {span_end - span_start} s span")
+        if outlasts and not in_span and phase_at(listener, span_start + engine.face_grace_period) == WORK:
+            failures.append(f"no away warning for the span at {span_start - START:.0f} s")
+    return failures
+
+
+def title_at(switches, t):
+    index = bisect.bisect_right(switches, (t, "\uffff")) - 1
+    return switches[index][1] if index >= 0 else None
+
+
+def phase_at(listener, t):
+    phase = WORK
+    for change_time, name, _ in listener.phases:
+        if change_time > t:
+            break
+        phase = name
+    return phase
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=8)
+    parser.add_argument("--max-seconds", type=float, default=None, help="fail if the replay is slower")
+    args = parser.parse_args()
+
+    duration = args.hours * 3600
+    switches, away = synthetic_script(args.hours)
+    clock = VirtualClock(START)
+    listener = RecordingListener(clock)
+    engine = TrackerEngine(
+        SessionTracker(UNPRODUCTIVE_APPS),
+        ScriptedWindowSource(clock, switches),
+        clock=clock,
+        listener=listener,
+        # The checks below expect the face-only rule; bench_presence.py covers the fused one
+        presence_policy=PresencePolicy.camera_only()
+    )
+    engine.start(focus=True)
+
+    start = time.perf_counter()
+    events = run_simulation(engine, clock, duration, ScriptedCamera(away))
+    seconds = time.perf_counter() - start
+    engine.stop()
+
+    long_breaks = sum(1 for _, phase, _ in listener.phases if phase == LONG_BREAK)
+    print(f"Replayed {args.hours:g} h ({events:,} events) in {seconds:.3f} s "
+          f"({duration / seconds:,.0f}x real time)")
+    print(f"Phase changes: {len(listener.phases)} ({long_breaks} long breaks), "
+          f"away warnings: {sum(1 for _, reason in listener.warnings if reason == 'away')}")
+    print(f"Productive {engine.tracker.analytics.productive_time:.0f} s, "
+          f"distracted {engine.distracted_time:.0f} s")
+
+    failures = check(engine, listener, switches, away, duration)
+    if args.max_seconds is not None and seconds > args.max_seconds:
+        failures.append(f"replay took {seconds:.3f} s, budget is {args.max_seconds:.3f} s")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("All checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Compare the adaptive FaceDetector against the full-frame cascade scan.
+
+Runs both detection paths over a recorded frame set (a directory of images or
+a video file) and reports CPU time per frame, per-frame presence agreement,
+the overlap of the detected boxes and how often the "Away!" state derived
+from each path (same 5 second grace logic as the app) disagrees.
+
+    python benchmarks/bench_face_detector.py recordings/desk.mp4
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_detector import FaceDetector, detect_full_frame  # noqa: E402
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def load_frames(path, limit=None):
+    """Load grayscale frames from a directory of images or a video file"""
+    frames = []
+    if os.path.isdir(path):
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names[:limit]:
+            frame = cv2.imread(os.path.join(path, name))
+            if frame is not None:
+                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    else:
+        cap = cv2.VideoCapture(path)
+        while limit is None or len(frames) < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        cap.release()
+    return frames
+
+
+def run_path(detect, frames):
+    """Return per-frame detections and total CPU seconds"""
+    results = []
+    start = time.process_time()
+    for gray in frames:
+        results.append(detect(gray))
+    return results, time.process_time() - start
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+def away_states(detections, frame_interval, grace_period=5):
+    """Replay the app's last_face_time logic and return the Away flag per frame"""
+    states = []
+    last_face_time = 0.0
+    for i, faces in enumerate(detections):
+        now = i * frame_interval
+        if faces:
+            last_face_time = now
+        states.append(not faces and now - last_face_time > grace_period)
+    return states
+
+
+def compare(frames, face_cascade, frame_interval=0.1, **detector_args):
+    baseline, baseline_cpu = run_path(lambda gray: detect_full_frame(face_cascade, gray), frames)
+    detector = FaceDetector(face_cascade, **detector_args)
+    adaptive, adaptive_cpu = run_path(detector.detect, frames)
+
+    count = len(frames)
+    presence_agree = sum(bool(a) == bool(b) for a, b in zip(baseline, adaptive))
+    overlaps = [
+        iou(max(a, key=lambda f: f[2] * f[3]), max(b, key=lambda f: f[2] * f[3]))
+        for a, b in zip(baseline, adaptive) if a and b
+    ]
+    away_agree = sum(
+        a == b for a, b in zip(away_states(baseline, frame_interval), away_states(adaptive, frame_interval))
+    )
+    return {
+        "frames": count,
+        "baseline_ms_per_frame": baseline_cpu / count * 1000,
+        "adaptive_ms_per_frame": adaptive_cpu / count * 1000,
+        "speedup": baseline_cpu / adaptive_cpu if adaptive_cpu else float("inf"),
+        "presence_agreement": presence_agree / count,
+        "away_state_agreement": away_agree / count,
+        "mean_iou": sum(overlaps) / len(overlaps) if overlaps else None,
+        "detector": detector.stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("frames", help="directory of images or a video file")
+    parser.add_argument("--limit", type=int, default=None, help="maximum number of frames to use")
+    parser.add_argument("--detect-width", type=int, default=320)
+    parser.add_argument("--full-scan-every", type=int, default=10)
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames, args.limit)
+    if not frames:
+        sys.exit(f"No frames found in {args.frames}")
+
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    report = compare(frames, face_cascade,
+                     detect_width=args.detect_width, full_scan_every=args.full_scan_every)
+
+    print(f"Frames:              {report['frames']}")
+    print(f"Full-frame CPU:      {report['baseline_ms_per_frame']:.2f} ms/frame")
+    print(f"Adaptive CPU:        {report['adaptive_ms_per_frame']:.2f} ms/frame "
+          f"({report['speedup']:.1f}x)")
+    print(f"Presence agreement:  {report['presence_agreement']:.1%}")
+    print(f"Away-state agreement: {report['away_state_agreement']:.1%}")
+    if report["mean_iou"] is not None:
+        print(f"Mean box IoU:        {report['mean_iou']:.2f}")
+    print(f"Detector stats:      {report['detector']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Time HistoryStore queries over a synthetic year of tracked activity.
+
+Generates working days of activity intervals (8 hours a day, an app switch
+every ~30 s on average), loads them through the batched writer thread into a
+fresh SQLite database and reports the median latency of each analytics query.
+
+    python benchmarks/bench_history.py --days 365
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_store import HistoryStore  # noqa: E402
+
+APPS = [f"project {n} - visual studio code" for n in range(40)] + \
+       [f"youtube - video {n} - google chrome" for n in range(60)] + \
+       [f"inbox ({n}) - mail" for n in range(20)] + \
+       [f"terminal {n}" for n in range(20)]
+PHASES = ["", "Work", "Break", "Long Break"]
+
+
+def synthetic_intervals(days, now, mean_dwell=30, seed=0):
+    """Yield (session_id, interval) pairs for ``days`` days ending at ``now``"""
+    rng = random.Random(seed)
+    first_day = now - days * 86400
+    for day in range(days):
+        t = first_day + day * 86400 + 9 * 3600
+        end_of_day = t + 8 * 3600
+        session_id = int(t * 1000)
+        while t < end_of_day:
+            dwell = max(1, int(rng.expovariate(1 / mean_dwell)))
+            app = rng.choice(APPS)
+            yield session_id, (t, t + dwell, app, "youtube" not in app, dwell, rng.choice(PHASES))
+            t += dwell
+
+
+def time_query(query, repeats=7):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        query()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--db", help="database path (default: a temporary file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, "history.db")
+        now = time.time()
+
+        store = HistoryStore(path, batch_size=5000)
+        store.start()
+        start = time.perf_counter()
+        intervals = 0
+        for session_id, interval in synthetic_intervals(args.days, now):
+            store.add(session_id, interval)
+            intervals += 1
+        store.close(timeout=None)
+        load_seconds = time.perf_counter() - start
+
+        print(f"Loaded {intervals:,} intervals ({store.rows_written:,} rows) "
+              f"for {args.days} days in {load_seconds:.1f} s")
+
+        store = HistoryStore(path)
+        queries = [
+            ("top 10 apps, 30 days", lambda: store.top_apps(days=30, limit=10, now=now)),
+            ("top 10 apps, 365 days", lambda: store.top_apps(days=365, limit=10, now=now)),
+            ("productive ratio by hour, 30 days", lambda: store.productive_ratio_by_hour(days=30, now=now)),
+            ("daily totals, 7 days", lambda: store.daily_totals(days=7, now=now)),
+            ("weekly totals, 12 weeks", lambda: store.weekly_totals(weeks=12, now=now)),
+            ("single app per day, 30 days", lambda: store.app_daily_usage(APPS[0], days=30, now=now)),
+            ("phase totals, 30 days", lambda: store.phase_totals(days=30, now=now)),
+        ]
+        for name, query in queries:
+            print(f"{name:36s} {time_query(query) * 1000:8.2f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
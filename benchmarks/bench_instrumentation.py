@@ -0,0 +1,162 @@
+"""Measure what the hot-path instrumentation costs, switched off and on.
+
+Times the primitives (span() and record(), enabled and disabled), then runs
+the camera pipeline (CameraWorker.process_frame with the real cascade over
+synthetic 640x480 frames, preview on) with instrumentation off and on in
+back-to-back pairs of blocks. Reports the overhead two ways:
+
+* measured: the median over the pairs of the on block's median frame time
+  against its off neighbour's, so drift in machine speed cancels out
+* estimated: the record calls made per frame times the cost of one,
+  against the frame time; a cross-check that is not subject to timing noise
+
+It also exports a Chrome trace and checks it parses and holds every span.
+Fails (exit status 1) if the measured overhead is 1% or more.
+
+    python benchmarks/bench_instrumentation.py --frames 300
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from camera_worker import CameraWorker  # noqa: E402
+from face_detector import FaceDetector, MotionGate  # noqa: E402
+from instrumentation import SKIPPED, Instrumentation, format_summary  # noqa: E402
+
+BUDGET = 0.01
+
+
+class SyntheticCamera:
+    """VideoCapture stand-in cycling through a few noisy desk frames"""
+
+    def __init__(self, count=8):
+        rng = np.random.default_rng(0)
+        base = np.full((480, 640, 3), 90, np.uint8)
+        cv2.ellipse(base, (320, 240), (70, 95), 0, 0, 360, (200, 190, 180), -1)
+        self.frames = [cv2.add(base, rng.integers(0, 20, base.shape, dtype=np.uint8)) for _ in range(count)]
+        self.index = 0
+
+    def read(self, image=None):
+        frame = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        if image is None:
+            return True, frame.copy()
+        image[...] = frame
+        return True, image
+
+
+def per_call(function, calls=200000):
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls
+
+
+def primitives():
+    instrumentation = Instrumentation(enabled=True)
+
+    def span():
+        with instrumentation.span("bench.span"):
+            pass
+
+    def record():
+        instrumentation.record("bench.record", 0.001)
+
+    names = ("bench.a", "bench.b", "bench.c", "bench.d", "bench.e", "bench.f")
+    marks = (0.0, 0.001, 0.002, SKIPPED, 0.003, 0.004, 0.005)
+
+    def stages():
+        instrumentation.record_stages(names, marks)
+
+    def count():
+        instrumentation.count("bench.count")
+
+    costs = {"span on": per_call(span), "record on": per_call(record), "stages on": per_call(stages),
+             "count on": per_call(count)}
+    instrumentation.enabled = False
+    costs.update({"span off": per_call(span), "record off": per_call(record), "stages off": per_call(stages),
+                  "count off": per_call(count)})
+    return costs
+
+
+def camera_frames(instrumentation, frames, blocks):
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    worker = CameraWorker(SyntheticCamera(), FaceDetector(face_cascade), gate=MotionGate(),
+                          instrumentation=instrumentation)
+    for _ in range(20):  # warm up buffers and the detector's tracking state
+        worker.process_frame()
+    times = {False: [], True: []}
+    ratios = []
+    block = max(1, frames // blocks)
+    for pair in range(blocks):
+        medians = {}
+        for enabled in ((False, True) if pair % 2 == 0 else (True, False)):
+            instrumentation.enabled = enabled
+            block_times = []
+            for _ in range(block):
+                start = time.perf_counter()
+                worker.process_frame()
+                worker.results.get_latest()
+                block_times.append(time.perf_counter() - start)
+            medians[enabled] = statistics.median(block_times)
+            times[enabled].extend(block_times)
+        ratios.append(medians[True] / medians[False])
+    instrumentation.enabled = True
+    return statistics.median(times[False]), statistics.median(times[True]), statistics.median(ratios) - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300, help="frames per setting")
+    parser.add_argument("--blocks", type=int, default=30, help="pairs of off/on blocks")
+    args = parser.parse_args()
+
+    costs = primitives()
+    print("Primitive costs:")
+    for name, seconds in costs.items():
+        print(f"  {name:10s} {seconds * 1e9:8.0f} ns")
+
+    instrumentation = Instrumentation()
+    off, on, measured = camera_frames(instrumentation, args.frames, args.blocks)
+    snapshot = instrumentation.snapshot()
+    frames = snapshot["spans"]["camera.read"]["count"]
+    spans_per_frame = sum(stats["count"] for stats in snapshot["spans"].values()) / frames
+    estimated = costs["stages on"] / off  # one record_stages() call per frame
+    print(f"\nCamera pipeline: {off * 1000:.2f} ms/frame off, {on * 1000:.2f} ms/frame on "
+          f"(measured {measured:+.2%}, median of paired blocks)")
+    print(f"  {spans_per_frame:.1f} spans/frame in one record_stages() call, "
+          f"{costs['stages on'] * 1e9:.0f} ns = {estimated:.3%} of a frame (estimated)")
+    print()
+    print(format_summary(snapshot))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.json")
+        written = instrumentation.export_chrome_trace(path)
+        with open(path) as f:
+            document = json.load(f)
+    complete = [event for event in document["traceEvents"] if event["ph"] == "X"]
+    recorded = min(sum(stats["count"] for stats in snapshot["spans"].values()), instrumentation.trace_events)
+    print(f"Chrome trace: {written} spans, {os.path.basename(path)} parsed back with {len(complete)}")
+
+    failures = []
+    if len(complete) != recorded:
+        failures.append(f"trace holds {len(complete)} spans, {recorded} were recorded")
+    if measured >= BUDGET:
+        failures.append(f"instrumentation costs {measured:.2%} of a frame, budget is {BUDGET:.0%}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Measure how many detections the MotionGate saves and check it does not delay "Away!".
+
+The synthetic mode (default) renders a desk scene at the camera rate:
+sensor noise, a slow exposure drift, and a bright head-shaped blob that sits
+still, fidgets, walks out of frame and comes back. A stand-in detector
+reports a face while the blob is in frame, so this measures the gate on
+its own. Every frame goes through the ungated path and the gated path, and
+both feed the app's presence rule (Away once no face was seen for the
+grace period). The benchmark reports detector calls and the time each
+departure took to turn into "Away!" in both paths.
+
+It fails (exit status 1) if the gated path ever reports Away later than
+the ungated one, or reports Away while the user is at the desk.
+
+With ``--frames`` it also runs the real cascade over a recording (a
+directory of images or a video, as in bench_face_detector.py) and reports
+the frames skipped and the presence agreement with the ungated detector.
+
+    python benchmarks/bench_motion_gate.py --minutes 10
+    python benchmarks/bench_motion_gate.py --frames recordings/desk.mp4
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_detector import FaceDetector, MotionGate  # noqa: E402
+
+WIDTH, HEIGHT = 640, 480
+GRACE_PERIOD = 5.0
+
+
+def scripted_position(t):
+    """Return (x offset of the head, state) at ``t`` seconds into a 3-minute cycle"""
+    t %= 180
+    if t < 60:
+        return 0.0, "still"
+    if t < 90:
+        return 25 * np.sin(t * 3.0), "fidget"
+    if t < 92:
+        return (t - 90) * 250, "leaving"  # out of frame after ~1.5 s
+    if t < 150:
+        return None, "away"
+    if t < 152:
+        return (152 - t) * 250, "returning"
+    return 0.0, "still"
+
+
+def render(t, noise, background):
+    offset, state = scripted_position(t)
+    frame = background + np.float32(3 * np.sin(t / 20))  # auto-exposure drift
+    frame += noise
+    visible = offset is not None and abs(offset) < WIDTH / 2
+    if visible:
+        cv2.ellipse(frame, (int(WIDTH / 2 + offset), HEIGHT // 2), (70, 95), 0, 0, 360, 220, -1)
+    return np.clip(frame, 0, 255).astype(np.uint8), visible, state
+
+
+class PresenceRule:
+    """TrackerEngine.handle_faces' away rule; records when Away starts"""
+
+    def __init__(self):
+        self.last_face_time = 0.0
+        self.away = False
+        self.away_starts = []
+
+    def handle(self, timestamp, now, faces):
+        if faces:
+            self.last_face_time = timestamp
+            self.away = False
+        elif timestamp - self.last_face_time > GRACE_PERIOD and not self.away:
+            self.away = True
+            self.away_starts.append(now)
+
+
+def synthetic(minutes, fps, max_age, threshold):
+    rng = np.random.default_rng(0)
+    noise = [rng.normal(0, 2.0, (HEIGHT, WIDTH)).astype(np.float32) for _ in range(17)]  # sensor noise
+    background = np.full((HEIGHT, WIDTH), 90, np.float32)
+    cv2.rectangle(background, (0, 380), (WIDTH, HEIGHT), 60, -1)  # the desk
+    gate = MotionGate(threshold, max_age)
+    plain, gated = PresenceRule(), PresenceRule()
+    detector_calls = 0
+    false_away = 0
+    gate_seconds = 0.0
+    departures = []
+    previous_state = None
+    for index in range(int(minutes * 60 * fps)):
+        now = index / fps
+        gray, visible, state = render(now, noise[index % len(noise)], background)
+        faces = ((WIDTH // 2, HEIGHT // 2, 140, 190),) if visible else ()
+        if state == "leaving" and previous_state != "leaving":
+            departures.append(now + 1.5)  # the head leaves the frame
+        previous_state = state
+
+        plain.handle(now, now, faces)
+
+        start = time.perf_counter()
+        check = gate.needs_detection(gray, now)
+        gate_seconds += time.perf_counter() - start
+        if check:
+            detector_calls += 1
+            gate.update(faces, now)
+            gated.handle(now, now, faces)
+        else:
+            carried, seen_at = gate.carried(now)
+            gated.handle(seen_at, now, carried)
+        if gated.away and state in ("still", "fidget"):
+            false_away += 1
+
+    frames = gate.stats["frames"]
+    print(f"Synthetic {minutes:g} min at {fps:g} fps, max age {max_age:g} s, threshold {threshold:g}")
+    print(f"Detector calls: {frames} ungated, {detector_calls} gated "
+          f"({gate.stats['skipped'] / frames:.0%} skipped; {gate.stats['motion']} on motion, "
+          f"{gate.stats['max_age']} on age)")
+    print(f"Gate cost: {gate_seconds / frames * 1000:.3f} ms/frame")
+
+    ok = True
+    print(f"{'departure':>10s} {'ungated away':>13s} {'gated away':>11s}")
+    for left in departures:
+        plain_at = next((t for t in plain.away_starts if t >= left), None)
+        gated_at = next((t for t in gated.away_starts if t >= left), None)
+        if plain_at is None or gated_at is None:
+            continue  # the run ended before the grace period ran out
+        print(f"{left:9.1f}s {plain_at - left:12.1f}s {gated_at - left:10.1f}s")
+        if gated_at > plain_at + 1e-9:
+            print("  FAIL: the gate delayed the Away transition")
+            ok = False
+    if false_away:
+        print(f"FAIL: gated path reported Away on {false_away} frames while the user was at the desk")
+        ok = False
+    return ok
+
+
+def recording(path, fps, max_age, threshold):
+    from bench_face_detector import load_frames
+
+    frames = load_frames(path)
+    if not frames:
+        sys.exit(f"No frames found in {path}")
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    plain_detector = FaceDetector(face_cascade)
+    gated_detector = FaceDetector(face_cascade)
+    gate = MotionGate(threshold, max_age)
+    agree = 0
+    cpu = [0.0, 0.0]
+    for index, gray in enumerate(frames):
+        now = index / fps
+        start = time.process_time()
+        plain = plain_detector.detect(gray)
+        cpu[0] += time.process_time() - start
+        start = time.process_time()
+        if gate.needs_detection(gray, now):
+            gated = gated_detector.detect(gray)
+            gate.update(gated, now)
+        else:
+            gated = gate.carried(now)[0]
+        cpu[1] += time.process_time() - start
+        agree += bool(plain) == bool(gated)
+    count = len(frames)
+    print(f"Recording {path}: {count} frames, {gate.stats['skipped'] / count:.0%} skipped")
+    print(f"CPU: {cpu[0] / count * 1000:.2f} ms/frame ungated, {cpu[1] / count * 1000:.2f} ms/frame gated")
+    print(f"Presence agreement: {agree / count:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=6)
+    parser.add_argument("--fps", type=float, default=10)
+    parser.add_argument("--max-age", type=float, default=GRACE_PERIOD / 2)
+    parser.add_argument("--threshold", type=float, default=MotionGate().threshold)
+    parser.add_argument("--frames", help="also run the real cascade over this recording")
+    args = parser.parse_args()
+
+    ok = synthetic(args.minutes, args.fps, args.max_age, args.threshold)
+    if args.frames:
+        recording(args.frames, args.fps, args.max_age, args.threshold)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Compare camera-only presence with the fused presence policy on replayed traces.
+
+A trace is a day at the desk: ground-truth segments (typing, reading,
+looking down at notes, away), the keyboard/mouse input times, foreground
+window switches and the face detector's hit or miss for every 100 ms
+camera frame (Haar misses a turned or lowered head now and then and fires
+on an empty chair very rarely). Each policy replays the same trace through
+TrackerEngine on a VirtualClock and is scored on:
+
+* camera frames processed: the detector runs once per frame, so this is
+  the camera's share of the app's CPU time
+* accuracy: the share of seconds whose present/away state matches the
+  ground truth
+* false away: seconds reported away while the user was at the desk
+* away latency: how long after each departure "Away" was reported
+
+It fails (exit status 1) when the default fused policy is less accurate
+than the camera alone, raises more false away seconds, or reports
+departures later, beyond ``--tolerance`` seconds of misplaced absence time
+per hour (a slowed camera places a departure to within half a frame). The policy that stops the camera while input confirms
+presence is reported alongside; it saves a few more frames but cannot tell
+when a user left during the time the camera was off, so it can miss a few
+seconds of each absence.
+
+``--save-trace`` writes the synthetic trace as JSON lines and ``--trace``
+replays one (e.g. recorded from a real session) instead:
+
+    {"type": "segment", "t": 0.0, "state": "typing"}   # or reading/looking_down/away
+    {"type": "input", "t": 0.8}
+    {"type": "window", "t": 12.0, "title": "main.py - visual studio code"}
+    {"type": "face", "t": 0.1, "seen": true}           # one per camera frame
+
+    python benchmarks/bench_presence.py --hours 8
+"""
+import argparse
+import bisect
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import EngineListener, TrackerEngine, VirtualClock  # noqa: E402
+from presence import PresencePolicy  # noqa: E402
+from simulation import SIMULATED_FACE, ScriptedInput, ScriptedWindowSource, run_simulation  # noqa: E402
+from tracking import SessionTracker  # noqa: E402
+
+FRAME = 0.1  # seconds between frames in a trace
+GRACE_PERIOD = 5.0
+START = 1_700_000_000.0
+
+# activity: (mean seconds, mean seconds between inputs or None, face hit rate, mean seconds per window switch)
+ACTIVITIES = {
+    "typing": (600, 1.0, 0.93, 90),
+    "reading": (400, 25.0, 0.93, 300),
+    "looking_down": (90, None, 0.6, None),
+    "away": (600, None, 0.001, 600),  # an empty chair; a playlist still changes the title
+}
+
+
+class Trace:
+    def __init__(self, segments, inputs, switches, faces):
+        self.segments = segments  # [(start, activity)], offsets from the trace start
+        self.inputs = inputs
+        self.switches = switches  # [(time, title)]
+        self.faces = faces        # bytearray, one hit flag per FRAME
+        self.duration = len(faces) * FRAME
+
+    def away_at(self, t):
+        index = bisect.bisect_right(self.segments, (t, "\uffff")) - 1
+        return self.segments[index][1] == "away"
+
+    def away_spans(self):
+        spans = []
+        bounds = self.segments + [(self.duration, None)]
+        for (start, activity), (end, _) in zip(bounds, bounds[1:]):
+            if activity != "away":
+                continue
+            if spans and spans[-1][1] == start:
+                spans[-1] = (spans[-1][0], end)
+            else:
+                spans.append((start, end))
+        return spans
+
+    def departures(self):
+        return [start for index, (start, activity) in enumerate(self.segments)
+                if activity == "away" and index > 0 and self.segments[index - 1][1] != "away"]
+
+
+def synthetic_trace(hours, seed=0):
+    rng = random.Random(seed)
+    duration = hours * 3600
+    segments, inputs, switches = [], [], []
+    faces = bytearray(int(duration / FRAME))
+    t = 0.0
+    previous = "away"
+    while t < duration:
+        choices = [name for name in ACTIVITIES if name != previous]
+        activity = rng.choice(choices)
+        length, input_gap, hit_rate, switch_gap = ACTIVITIES[activity]
+        end = min(duration, t + max(20.0, rng.expovariate(1 / length)))
+        segments.append((t, activity))
+        if input_gap is not None:
+            moment = t + rng.expovariate(1 / input_gap)
+            while moment < end:
+                inputs.append(moment)
+                # Bursts of typing with the odd pause to think
+                gap = input_gap if rng.random() < 0.9 else input_gap * 8
+                moment += rng.expovariate(1 / gap)
+        if switch_gap is not None:
+            moment = t + rng.expovariate(1 / switch_gap)
+            while moment < end:
+                switches.append((moment, f"{activity} window {rng.randrange(40)}"))
+                moment += rng.expovariate(1 / switch_gap)
+        for frame in range(int(t / FRAME), min(len(faces), int(end / FRAME))):
+            faces[frame] = rng.random() < hit_rate
+        t = end
+        previous = activity
+    return Trace(segments, inputs, switches, faces)
+
+
+def save_trace(trace, path):
+    with open(path, "w") as f:
+        for start, activity in trace.segments:
+            f.write(json.dumps({"type": "segment", "t": start, "state": activity}) + "\n")
+        for moment in trace.inputs:
+            f.write(json.dumps({"type": "input", "t": moment}) + "\n")
+        for moment, title in trace.switches:
+            f.write(json.dumps({"type": "window", "t": moment, "title": title}) + "\n")
+        for frame, seen in enumerate(trace.faces):
+            f.write(json.dumps({"type": "face", "t": round(frame * FRAME, 3), "seen": bool(seen)}) + "\n")
+
+
+def load_trace(path):
+    segments, inputs, switches, frames = [], [], [], []
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            kind = record["type"]
+            if kind == "segment":
+                segments.append((record["t"], record["state"]))
+            elif kind == "input":
+                inputs.append(record["t"])
+            elif kind == "window":
+                switches.append((record["t"], record["title"]))
+            elif kind == "face":
+                frames.append((record["t"], record["seen"]))
+    frames.sort()
+    faces = bytearray(int(frames[-1][0] / FRAME) + 1 if frames else 0)
+    for moment, seen in frames:
+        faces[int(moment / FRAME + 1e-6)] = seen
+    return Trace(sorted(segments), sorted(inputs), sorted(switches), faces)
+
+
+class TraceCamera:
+    """Face results from a trace; counts the frames the policy asked for"""
+
+    def __init__(self, trace):
+        self.faces = trace.faces
+        self.frames = 0
+
+    def faces_at(self, timestamp):
+        self.frames += 1
+        frame = int((timestamp - START) / FRAME + 1e-6)
+        return (SIMULATED_FACE,) if frame < len(self.faces) and self.faces[frame] else ()
+
+
+class AwayListener(EngineListener):
+    """Records when each absence was first reported, as trace offsets"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.away = False
+        self.reported = []
+
+    def on_presence(self, state):
+        if state == "away" and not self.away:
+            self.reported.append(self.clock.time() - START)
+        self.away = state == "away"
+
+
+def replay(trace, policy):
+    clock = VirtualClock(START)
+    listener = AwayListener(clock)
+    switches = [(START + moment, title) for moment, title in trace.switches]
+    engine = TrackerEngine(
+        SessionTracker([]),
+        ScriptedWindowSource(clock, switches or [(START, "desktop")]),
+        clock=clock,
+        listener=listener,
+        presence_policy=policy,
+        input_source=ScriptedInput(clock, [START + moment for moment in trace.inputs])
+    )
+    camera = TraceCamera(trace)
+    engine.start()
+    started = time.perf_counter()
+    run_simulation(engine, clock, trace.duration, camera)
+    seconds = time.perf_counter() - started
+    engine.stop()
+    return engine, listener.reported, camera.frames, seconds
+
+
+def overlap(spans, others):
+    """Total time two sorted lists of (start, end) spans have in common"""
+    total = 0.0
+    index = 0
+    for start, end in spans:
+        while index < len(others) and others[index][1] <= start:
+            index += 1
+        scan = index
+        while scan < len(others) and others[scan][0] < end:
+            total += max(0.0, min(end, others[scan][1]) - max(start, others[scan][0]))
+            scan += 1
+    return total
+
+
+def score(trace, away_spans, reported_at):
+    """Return (accuracy, seconds falsely away, departure latencies)"""
+    truth = trace.away_spans()
+    spans = sorted((start - START, (end if end is not None else START + trace.duration) - START)
+                   for start, end in away_spans)
+    common = overlap(truth, spans)
+    false_away = sum(end - start for start, end in spans) - common
+    missed = sum(end - start for start, end in truth) - common
+    # Spans are backdated to the last sign of the user, so latency uses when Away was reported
+    latencies = []
+    for left in trace.departures():
+        index = bisect.bisect_left(reported_at, left)
+        if index < len(reported_at) and trace.away_at(reported_at[index]):
+            latencies.append(reported_at[index] - left)
+    return 1 - (false_away + missed) / trace.duration, false_away, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", help="replay this JSON-lines trace instead of a synthetic one")
+    parser.add_argument("--save-trace", help="write the synthetic trace here")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="seconds of absence time per hour the fused policy may misplace")
+    parser.add_argument("--frame-ms", type=float, default=12.0,
+                        help="detector CPU per frame, for the CPU estimate (see bench_face_detector.py)")
+    args = parser.parse_args()
+
+    trace = load_trace(args.trace) if args.trace else synthetic_trace(args.hours, args.seed)
+    if args.save_trace:
+        save_trace(trace, args.save_trace)
+    present = sum(1 for second in range(int(trace.duration)) if not trace.away_at(second + 0.5))
+    print(f"Trace: {trace.duration / 3600:.1f} h, {present / trace.duration:.0%} at the desk, "
+          f"{len(trace.departures())} departures, {len(trace.inputs):,} inputs, "
+          f"{len(trace.switches):,} window switches")
+
+    policies = [
+        ("camera only", PresencePolicy.camera_only(GRACE_PERIOD), False),
+        ("fused", PresencePolicy(GRACE_PERIOD), True),
+        ("fused, stop", PresencePolicy(GRACE_PERIOD, confirmed_camera_interval=None), False),
+    ]
+    print(f"{'policy':12s} {'frames':>9s} {'camera CPU':>11s} {'accuracy':>9s} {'false away':>11s} "
+          f"{'latency avg/max':>16s} {'replay':>8s}")
+    results = {}
+    for name, policy, checked in policies:
+        engine, reported_at, frames, seconds = replay(trace, policy)
+        accuracy, false_away, latencies = score(trace, engine.away_spans, reported_at)
+        cpu = frames * args.frame_ms / 1000 / trace.duration
+        mean = sum(latencies) / len(latencies) if latencies else 0.0
+        worst = max(latencies, default=0.0)
+        results[name] = (checked, frames, accuracy, false_away, mean)
+        print(f"{name:12s} {frames:9,d} {cpu:10.2%} {accuracy:9.3%} {false_away:10.1f}s "
+              f"{mean:7.1f}/{worst:4.1f} s {seconds:7.2f}s")
+
+    baseline = results["camera only"]
+    slack = args.tolerance * trace.duration / 3600
+    failures = []
+    for name, (checked, frames, accuracy, false_away, mean) in results.items():
+        if name == "camera only":
+            continue
+        print(f"{name}: {1 - frames / baseline[1]:.0%} fewer camera frames")
+        if not checked:
+            continue
+        if (baseline[2] - accuracy) * trace.duration > slack:
+            failures.append(f"{name} is less accurate ({accuracy:.3%} vs {baseline[2]:.3%})")
+        if false_away > baseline[3] + slack:
+            failures.append(f"{name} reports more false away seconds ({false_away:.1f} s vs {baseline[3]:.1f} s)")
+        if mean > baseline[4] + 0.5:
+            failures.append(f"{name} reports departures later ({mean:.1f} s vs {baseline[4]:.1f} s)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
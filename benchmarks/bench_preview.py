@@ -0,0 +1,160 @@
+"""Measure per-frame allocations and time of the camera preview, before and after.
+
+Runs the same synthetic 640x480 camera frames through three preview paths:
+
+* before: capture, grayscale, resize and BGR->RGB conversion into new
+  arrays, a new PIL image and a new ImageTk.PhotoImage per frame
+* after: CameraWorker.process_frame into reused capture and preview
+  buffers, then PreviewDisplay pasting into one persistent PhotoImage
+* off: the preview switched off; capture and detection only
+
+For each path it reports the time per frame, the transient memory
+allocated per frame (tracemalloc peak above the steady state; NumPy
+buffers are traced, Tk's own pixel copies are not), the blocks still held
+afterwards, and the gen-0 garbage collections per 1000 frames. The
+PhotoImage steps need a display; without one they are left out of both
+paths and the report says so.
+
+    python benchmarks/bench_preview.py --frames 500
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from camera_worker import CameraWorker  # noqa: E402
+
+PREVIEW_SIZE = (320, 240)
+FACES = ((200, 120, 180, 220),)
+
+
+class SyntheticCamera:
+    """VideoCapture stand-in cycling through a few noisy frames"""
+
+    def __init__(self, count=8):
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(count)]
+        self.index = 0
+
+    def read(self, image=None):
+        frame = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        if image is None:
+            return True, frame.copy()
+        image[...] = frame
+        return True, image
+
+
+class FixedDetector:
+    stats = {}
+
+    def detect(self, gray):
+        return FACES
+
+
+def open_tk():
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        return root
+    except Exception:
+        return None
+
+
+def legacy_path(camera, root):
+    from PIL import Image, ImageTk
+    detector = FixedDetector()
+    label = [None]
+
+    def frame_step():
+        ret, frame = camera.read()
+        detector.detect(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        for (x, y, w, h) in FACES:
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        preview = cv2.resize(frame, PREVIEW_SIZE)
+        preview = cv2.cvtColor(preview, cv2.COLOR_BGR2RGB)
+        image = Image.fromarray(preview)
+        if root is not None:
+            label[0] = ImageTk.PhotoImage(image=image)
+    return frame_step
+
+
+def buffered_path(camera, root, preview_enabled=True):
+    worker = CameraWorker(camera, FixedDetector())
+    worker.preview_enabled = preview_enabled
+    display = None
+    if root is not None:
+        import tkinter as tk
+        from preview import PreviewDisplay
+        display = PreviewDisplay(tk.Label(root), PREVIEW_SIZE)
+    else:
+        from preview import _block_image
+        image = _block_image("RGBA", PREVIEW_SIZE)
+
+    def frame_step():
+        worker.process_frame()
+        worker.results.get_latest()
+        frame = worker.preview.take()
+        if frame is None:
+            return
+        if display is not None:
+            display.show(frame)
+        else:
+            image.frombytes(frame)
+    return frame_step
+
+
+def measure(frame_step, frames):
+    for _ in range(20):  # warm up caches and buffers
+        frame_step()
+    gc.collect()
+    collections = gc.get_stats()[0]["collections"]
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame_step()
+    seconds = time.perf_counter() - start
+    collections = gc.get_stats()[0]["collections"] - collections
+
+    tracemalloc.start()
+    frame_step()
+    baseline = tracemalloc.get_traced_memory()[0]
+    transient = 0
+    for _ in range(min(frames, 100)):
+        tracemalloc.reset_peak()
+        frame_step()
+        current, peak = tracemalloc.get_traced_memory()
+        transient = max(transient, peak - baseline)
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return seconds / frames, transient, held, collections * 1000 / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=500)
+    args = parser.parse_args()
+
+    root = open_tk()
+    if root is None:
+        print("No display: PhotoImage creation and paste are left out of both paths")
+    print(f"{'path':8s} {'ms/frame':>9s} {'alloc/frame':>12s} {'held':>9s} {'gen0 GCs/1k':>12s}")
+    for name, step in (("before", legacy_path(SyntheticCamera(), root)),
+                       ("after", buffered_path(SyntheticCamera(), root)),
+                       ("off", buffered_path(SyntheticCamera(), root, preview_enabled=False))):
+        seconds, transient, held, collections = measure(step, args.frames)
+        print(f"{name:8s} {seconds * 1000:9.3f} {transient / 1024:9.1f} KiB {held / 1024:5.1f} KiB "
+              f"{collections:12.1f}")
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Measure session-store memory per hour of tracking and check it stays in budget.
+
+Feeds synthetic 1 Hz samples into SessionStore and into the old list-of-dicts
+layout, measures both with tracemalloc, checks that per-app durations and the
+unproductive total derived from the run-length encoded intervals match the
+old per-tick accounting exactly, and fails (exit status 1) if either check
+fails or the store exceeds the per-hour budget documented in
+session_store.SessionStore.
+
+    python benchmarks/bench_session_store.py --hours 8
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_window_replay import synthetic_trace  # noqa: E402
+from session_store import MEMORY_BUDGET_PER_HOUR, SessionStore  # noqa: E402
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def fill_store(samples):
+    store = SessionStore()
+    for sample in samples:
+        store.append(sample.timestamp, sample.title, "youtube" not in sample.title)
+    return store
+
+
+def fill_dicts(samples):
+    return [
+        {
+            "time": sample.timestamp,
+            "app": sample.title,
+            "productive": "youtube" not in sample.title,
+            "unproductive": "youtube" in sample.title
+        }
+        for sample in samples
+    ]
+
+
+def accounting_matches(store, entries, tick=1.0):
+    """Compare interval-derived totals with the old per-entry accounting"""
+    per_app = {}
+    for entry in entries:
+        per_app[entry["app"]] = per_app.get(entry["app"], 0) + tick
+    unproductive = sum(1 for entry in entries if entry["unproductive"]) * tick
+
+    interval_per_app = {}
+    interval_unproductive = 0
+    for start, end, title, productive, ticks, phase in store:
+        interval_per_app[title] = interval_per_app.get(title, 0) + ticks * tick
+        if not productive:
+            interval_unproductive += ticks * tick
+    return (per_app == interval_per_app
+            and unproductive == interval_unproductive
+            and {title: count * tick for title, count in store.app_totals().items()} == per_app
+            and store.unproductive_count * tick == unproductive)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=8)
+    args = parser.parse_args()
+
+    samples = synthetic_trace(int(args.hours * 3600))
+    store, store_bytes = measure(lambda: fill_store(samples))
+    entries, dict_bytes = measure(lambda: fill_dicts(samples))
+
+    store_per_hour = store_bytes / args.hours
+    print(f"Samples:            {store.sample_count} -> {len(store)} intervals "
+          f"({len(store.titles)} distinct titles)")
+    print(f"List of dicts:      {dict_bytes / args.hours / 1024:,.1f} KiB/hour")
+    print(f"SessionStore:       {store_per_hour / 1024:,.1f} KiB/hour "
+          f"(memory_usage() reports {store.memory_usage() / args.hours / 1024:,.1f} KiB/hour)")
+    print(f"Budget:             {MEMORY_BUDGET_PER_HOUR / 1024:,.1f} KiB/hour")
+
+    matches = accounting_matches(store, entries)
+    print(f"Accounting matches: {matches}")
+    if not matches:
+        print("FAIL: interval totals differ from per-tick accounting")
+        sys.exit(1)
+    if store_per_hour > MEMORY_BUDGET_PER_HOUR:
+        print("FAIL: session store is over its memory budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
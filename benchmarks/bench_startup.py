@@ -0,0 +1,100 @@
+"""Measure WorkWise cold-import cost with ``python -X importtime``.
+
+Imports ``main`` in fresh interpreters, reports the median wall time and the
+cumulative import time attributed to each top-level module, and lists the
+slowest imports. It flags heavy modules on the startup path: the vision and
+plotting stacks, and stdlib packages such as urllib.request (which pulls in
+http.client, email and ssl) or asyncio that the GUI does not need to start.
+With ``--max-ms`` it exits with status 1 when the median import of ``main``
+is slower than the given budget or any heavy module is imported, so it can
+gate regressions (e.g. a heavy module creeping back into the startup path).
+
+    python benchmarks/bench_startup.py --runs 5 --max-ms 300
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that cost tens of milliseconds to import and are not needed to show the window
+HEAVY_MODULES = (
+    "cv2", "numpy", "matplotlib", "PIL",
+    "urllib.request", "http.client", "email.parser", "ssl", "asyncio",
+    "multiprocessing", "concurrent.futures", "xml.etree.ElementTree",
+)
+
+
+def import_profile(module="main"):
+    """Return (wall_seconds, {module: (depth, cumulative_us)}) for one cold import"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", where
+        # nested imports are indented by two extra spaces per level
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        cumulative[name.strip()] = (depth, int(cumulative_us))
+    return wall, cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports to list")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if the median import exceeds this")
+    args = parser.parse_args()
+
+    walls = []
+    profiles = []
+    for _ in range(args.runs):
+        wall, cumulative = import_profile()
+        walls.append(wall)
+        profiles.append(cumulative)
+
+    median_wall = statistics.median(walls) * 1000
+    main_import = statistics.median(profile.get("main", (0, 0))[1] for profile in profiles) / 1000
+    print(f"Interpreter + import main: {median_wall:.1f} ms (median of {args.runs})")
+    print(f"import main (cumulative):  {main_import:.1f} ms")
+
+    # Modules imported directly by main (one level below it)
+    direct = {}
+    for profile in profiles:
+        for name, (depth, us) in profile.items():
+            if depth == 1:
+                direct.setdefault(name, []).append(us)
+    slowest = sorted(direct.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    print("\nSlowest imports made by main:")
+    for name, timings in slowest[:args.top]:
+        print(f"  {name:28s} {statistics.median(timings) / 1000:8.1f} ms")
+
+    heavy = [name for name in HEAVY_MODULES if name in profiles[0]]
+    print(f"\nHeavy modules on the startup path: {', '.join(heavy) if heavy else 'none'}")
+
+    if args.max_ms is not None:
+        failed = False
+        if main_import > args.max_ms:
+            print(f"FAIL: import main took {main_import:.1f} ms, budget is {args.max_ms:.1f} ms")
+            failed = True
+        if heavy:
+            print(f"FAIL: heavy modules imported at startup: {', '.join(heavy)}")
+            failed = True
+        if failed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Time the NumPy binning behind the analytics chart and check it against per-sample sums.
+
+Fills a SessionStore with ``--days`` of 1 Hz samples. Typical switching
+gives a new title every ~30 s; with ``--worst-case`` the title changes every
+sample, so each sample becomes its own interval. The benchmark then times
+SessionTimeline (per-minute bins and the hourly heatmap) and checks the bins
+against per-minute sums of the samples, the way the old loops over dicts
+would add them up. It also times the Agg render, which the app runs on a
+background thread.
+
+It fails (exit status 1) if any bin differs, or if the best binning run is
+slower than ``--budget-ms``.
+
+    python benchmarks/bench_timeline.py --days 7 --worst-case
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from session_store import SessionStore  # noqa: E402
+from timeline import SessionTimeline  # noqa: E402
+
+START = 1_700_000_000.0
+
+
+def fill_store(seconds, worst_case, seed=0):
+    rng = random.Random(seed)
+    store = SessionStore()
+    minute_productive = {}
+    title, productive = "editor", True
+    for tick in range(1, seconds + 1):
+        if worst_case or rng.random() < 1 / 30:
+            productive = rng.random() < 0.7
+            title = f"{'editor' if productive else 'video'} {tick if worst_case else rng.randrange(20)}"
+        timestamp = START + tick
+        store.append(timestamp, title, productive, seconds=1.0)
+        if productive:
+            minute = int((timestamp - 1 - START) // 60)  # the sample covers the second before it
+            minute_productive[minute] = minute_productive.get(minute, 0) + 1
+    return store, minute_productive
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--worst-case", action="store_true", help="a new title on every sample")
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seconds = int(args.days * 86400)
+    store, expected = fill_store(seconds, args.worst_case)
+    away_spans = [[START + hour * 3600 + 600, START + hour * 3600 + 900] for hour in range(int(seconds / 3600))]
+    print(f"{seconds} samples in {len(store)} intervals")
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        timeline = SessionTimeline.from_session(store, away_spans, now=START + seconds)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"Binning: {best * 1000:.1f} ms best of {args.repeat} "
+          f"({len(timeline.productive)} minute bins, {timeline.heatmap.shape[0]}x24 heatmap)")
+
+    ok = True
+    binned = np.rint(timeline.productive).astype(int)
+    counted = np.zeros(len(binned), dtype=int)
+    for minute, count in expected.items():
+        counted[minute] = count
+    if not np.array_equal(binned, counted):
+        print(f"FAIL: {int(np.count_nonzero(binned != counted))} minute bins differ from the per-sample sums")
+        ok = False
+    tracked = timeline.productive.sum() + timeline.unproductive.sum()
+    if abs(tracked - seconds) > 1e-3 or abs(timeline.hour_tracked.sum() - seconds) > 1e-3:
+        print(f"FAIL: binned {tracked:.3f} s and {timeline.hour_tracked.sum():.3f} s of {seconds} s")
+        ok = False
+    if abs(timeline.away.sum() - 300 * len(away_spans)) > 1e-3:
+        print(f"FAIL: binned {timeline.away.sum():.3f} s away of {300 * len(away_spans)} s")
+        ok = False
+
+    renders = []
+    for _ in range(2):  # the first one includes importing matplotlib
+        start = time.perf_counter()
+        image = timeline.render()
+        renders.append(time.perf_counter() - start)
+    print(f"Render (chart thread): {renders[0] * 1000:.0f} ms cold, {renders[1] * 1000:.0f} ms warm, "
+          f"{image.size[0]}x{image.size[1]} px")
+
+    if best * 1000 > args.budget_ms:
+        print(f"FAIL: binning took {best * 1000:.1f} ms, budget {args.budget_ms:g} ms")
+        ok = False
+    if not ok:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Count event-loop wakeups for the old after() loops and the coalesced Scheduler.
+
+Both designs run on a simulated Tk timer loop over a VirtualClock, so the
+comparison is deterministic and takes no wall time. Every callback advances
+the clock by a typical cost (``--camera-ms`` for a preview frame, 1-2 ms for
+the timer and window check), and a 500 ms warning beep blocks the window
+check once a minute.
+
+* before: the camera (100 ms), timer (1 s) and window check (1 s) each
+  re-arm their own after() when they finish, so their periods stretch by
+  their own cost and they drift apart; every window check credits 1 s
+* after: one Scheduler wakeup runs whatever is due; window checks credit
+  the real time since the previous one (SessionTracker)
+
+Reports wakeups per minute and how far the credited time is from the real
+session length, for an active session and a backed-off (minimized or away)
+one.
+
+    python benchmarks/bench_wakeups.py --minutes 30
+"""
+import argparse
+import heapq
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import VirtualClock  # noqa: E402
+from scheduler import Scheduler  # noqa: E402
+from tracking import SessionTracker  # noqa: E402
+from window_sampler import WindowSample  # noqa: E402
+
+START = 1_700_000_000.0
+BEEP_SECONDS = 0.5
+
+
+class SimulatedTk:
+    """Tk's timer queue on a VirtualClock: after(), after_cancel() and wakeup counting"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.timers = []
+        self.cancelled = set()
+        self.next_id = 0
+        self.wakeups = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        heapq.heappush(self.timers, (self.clock.time() + ms / 1000, self.next_id, callback))
+        return self.next_id
+
+    def after_cancel(self, job):
+        self.cancelled.add(job)
+
+    def run(self, until):
+        while self.timers and self.timers[0][0] <= until:
+            # Timers fire late when earlier callbacks overran them
+            self.clock.set(max(self.clock.time(), self.timers[0][0]))
+            now = self.clock.time()
+            ran = False
+            # One wakeup handles every timer that is due by now
+            while self.timers and self.timers[0][0] <= now:
+                _, job, callback = heapq.heappop(self.timers)
+                if job in self.cancelled:
+                    self.cancelled.discard(job)
+                    continue
+                callback()
+                ran = True
+            self.wakeups += ran
+
+
+class Workload:
+    """Callback costs shared by both designs"""
+
+    def __init__(self, clock, camera_cost):
+        self.clock = clock
+        self.camera_cost = camera_cost
+        self.window_checks = 0
+        self.tracker = SessionTracker(["youtube"])
+        self.next_beep = START + 60
+
+    def camera(self):
+        self.clock.advance(self.camera_cost)
+
+    def timer(self):
+        self.clock.advance(0.001)
+
+    def window(self):
+        now = self.clock.time()
+        self.window_checks += 1
+        self.tracker.process(WindowSample(now, "editor", ""))
+        self.clock.advance(0.002)
+        if now >= self.next_beep:  # a blocking warning beep
+            self.clock.advance(BEEP_SECONDS)
+            self.next_beep += 60
+
+
+def run_legacy(minutes, camera_cost, idle):
+    clock = VirtualClock(START)
+    loop = SimulatedTk(clock)
+    work = Workload(clock, camera_cost)
+
+    def loop_every(ms, job):
+        def run():
+            job()
+            loop.after(ms, run)
+        loop.after(0, run)
+
+    # The old loops had no back-off; minimized or not they ran the same
+    loop_every(100, work.camera)
+    loop_every(1000, work.timer)
+    loop_every(1000, work.window)
+    loop.run(START + minutes * 60)
+    return loop.wakeups, work.window_checks * 1.0, clock.time() - START
+
+
+def run_scheduler(minutes, camera_cost, idle):
+    clock = VirtualClock(START)
+    loop = SimulatedTk(clock)
+    work = Workload(clock, camera_cost)
+    scheduler = Scheduler(clock.time)
+    job = [None]
+
+    # Same driver as ProductivityApp.wake_scheduler/run_scheduler
+    def wake():
+        if job[0] is not None:
+            loop.after_cancel(job[0])
+            job[0] = None
+        delay = scheduler.next_delay()
+        if delay is not None:
+            job[0] = loop.after(int(delay * 1000), run)
+
+    def run():
+        job[0] = None
+        scheduler.run_due()
+        wake()
+
+    scheduler.add("camera", 0.1, work.camera, idle_interval=0.5)
+    scheduler.add("timer", 1.0, work.timer, idle_interval=5.0)
+    scheduler.add("window", 1.0, work.window, idle_interval=2.0)
+    scheduler.set_idle(idle)
+    wake()
+    loop.run(START + minutes * 60)
+    return loop.wakeups, work.tracker.analytics.tracked_time, clock.time() - START
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=30)
+    parser.add_argument("--camera-ms", type=float, default=12, help="cost of one preview frame")
+    args = parser.parse_args()
+
+    camera_cost = args.camera_ms / 1000
+    print(f"{'':24s} {'wakeups/min':>12s} {'credited':>10s} {'real':>10s} {'error':>8s}")
+    for idle in (False, True):
+        for name, run in (("after() loops", run_legacy), ("Scheduler", run_scheduler)):
+            wakeups, credited, real = run(args.minutes, camera_cost, idle)
+            label = f"{name}{' (idle)' if idle else ''}"
+            print(f"{label:24s} {wakeups * 60 / real:12.0f} {credited:9.0f}s {real:9.0f}s "
+                  f"{(credited - real) / real * 100:+7.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Compare event-driven foreground tracking with 1 Hz polling.
+
+Simulated mode (default) scripts an hour of window switches: the usual
+~30 s dwell plus bursts of sub-second alt-tab switches. It feeds the same
+script to a 1 Hz poller (ScriptedWindowSource) and to the simulated focus
+event feed (ScriptedWindowWatcher, flushed once a second). Both go through
+SessionTracker, and the benchmark reports per mode:
+
+* misattributed time: seconds credited to the wrong app, as a share of
+  the session
+* error in the unproductive total
+* switches observed, and apps visited but never seen
+* CPU time per simulated hour for the accounting pipeline
+
+With ``--live SECONDS`` it also runs the real platform backends side by
+side for that long: the poller sampling every second against the
+watcher flushed every second. It reports the CPU both used, including
+xprop child processes. This needs a desktop session.
+
+    python benchmarks/bench_window_events.py --hours 1
+    python benchmarks/bench_window_events.py --live 60
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import VirtualClock  # noqa: E402
+from simulation import ScriptedWindowSource, ScriptedWindowWatcher  # noqa: E402
+from tracking import SessionTracker  # noqa: E402
+from window_sampler import create_sampler  # noqa: E402
+from window_watcher import create_window_source  # noqa: E402
+
+APPS = [f"project {n} - visual studio code" for n in range(10)] + \
+       [f"youtube - video {n} - google chrome" for n in range(5)] + \
+       [f"slack - channel {n}" for n in range(5)] + ["terminal"]
+UNPRODUCTIVE_APPS = ["youtube"]
+START = 1_700_000_000.0
+
+
+def synthetic_switches(hours, seed=0):
+    """Return (switches, end): (time, title) pairs with ~30 s dwells and sub-second bursts"""
+    rng = random.Random(seed)
+    end = START + hours * 3600
+    switches = []
+    t = START
+    while t < end:
+        if rng.random() < 0.2:
+            # alt-tab through a few windows before settling
+            for _ in range(rng.randint(2, 4)):
+                switches.append((t, rng.choice(APPS)))
+                t += rng.uniform(0.15, 0.9)
+        switches.append((t, rng.choice(APPS)))
+        t += rng.expovariate(1 / 30)
+    return switches, end
+
+
+def ground_truth(switches, end):
+    totals = {}
+    for (start, title), (next_start, _) in zip(switches, switches[1:] + [(end, None)]):
+        totals[title] = totals.get(title, 0) + min(next_start, end) - start
+    return totals
+
+
+def run_mode(source_class, switches, end, interval=1.0):
+    clock = VirtualClock(START)
+    source = source_class(clock, switches)
+    tracker = SessionTracker(UNPRODUCTIVE_APPS, interval)
+    source.skip_to_now()
+    seen = 0
+    last_title = None
+    cpu = time.process_time()
+    ticks = 0
+    while START + ticks * interval <= end:
+        clock.set(START + ticks * interval)
+        for sample in source.samples():
+            tracker.process(sample)
+            if sample.title != last_title:
+                seen += 1
+                last_title = sample.title
+        ticks += 1
+    cpu = time.process_time() - cpu
+    return tracker, seen, cpu
+
+
+def compare(truth, tracker, classifier):
+    attributed = tracker.analytics.app_times
+    apps = set(truth) | set(attributed)
+    # Every misplaced second is over-credited to one app and missing from another
+    misattributed = sum(abs(attributed.get(app, 0) - truth.get(app, 0)) for app in apps) / 2
+    true_unproductive = sum(seconds for app, seconds in truth.items() if classifier.is_unproductive(app))
+    return misattributed, tracker.analytics.unproductive_time - true_unproductive
+
+
+def simulated(hours):
+    switches, end = synthetic_switches(hours)
+    truth = ground_truth(switches, end)
+    total = end - START
+    real_switches = sum(1 for a, b in zip(switches, switches[1:]) if a[1] != b[1])
+    visited = {title for _, title in switches}
+    print(f"Simulated {hours:g} h: {real_switches} switches, "
+          f"{sum(1 for a, b in zip(switches, switches[1:]) if b[0] - a[0] < 1)} shorter than 1 s")
+    print(f"{'':10s} {'misattributed':>14s} {'unproductive err':>17s} {'switches seen':>14s} "
+          f"{'apps missed':>12s} {'CPU/hour':>10s}")
+    for name, source_class in (("poll 1 Hz", ScriptedWindowSource), ("events", ScriptedWindowWatcher)):
+        tracker, seen, cpu = run_mode(source_class, switches, end)
+        misattributed, unproductive_error = compare(truth, tracker, tracker.classifier)
+        missed = len(visited - set(tracker.analytics.app_times))
+        print(f"{name:10s} {misattributed:8.0f} s {misattributed / total * 100:4.1f}% "
+              f"{unproductive_error:+15.1f} s {seen - 1:14d} {missed:12d} "
+              f"{cpu / hours * 1000:8.1f} ms")
+
+
+def live(seconds):
+    watcher = create_window_source(mode="events")
+    poller = create_sampler()
+    print(f"Live for {seconds:g} s: events via {type(watcher).__name__}, polling via {type(poller).__name__}")
+    for name, source in (("poll 1 Hz", poller), ("events", watcher)):
+        source.skip_to_now()
+        before = os.times()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            samples += len(source.samples())
+            time.sleep(1.0)
+        after = os.times()
+        cpu = sum(after[:4]) - sum(before[:4])  # user + system, including children
+        print(f"{name:10s} {cpu * 1000 / seconds * 60:8.1f} ms CPU/min, {samples} samples")
+    watcher.close()
+    poller.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=1)
+    parser.add_argument("--live", type=float, default=None, metavar="SECONDS",
+                        help="also measure the real backends for this long")
+    args = parser.parse_args()
+
+    simulated(args.hours)
+    if args.live:
+        live(args.live)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""Run the headless benchmark suite and write the results as JSON for comparison between runs.
+
+Needs no webcam, display or win32, so it runs the same on a Linux CI box as
+on a desk. Every input is either recorded or generated from a fixed seed:
+
+* detection: per-frame cost of the adaptive FaceDetector and of the
+  full-frame cascade scan, over a recorded frame set (``--frames``, a
+  directory of images or a video file, see bench_face_detector.py) or
+  synthetic 640x480 desk frames with a moving head-sized blob
+* classification: AppClassifier titles/s (cached and uncached) for the
+  default block list and a 5,000-entry one, and the whole tracking
+  pipeline (SessionTracker) in samples/s, over a window-title trace
+  (``--trace``, see window_sampler.save_trace) or a synthetic one
+* session store: SessionStore memory per hour of 1 Hz samples at 1 h and
+  8 h, measured with tracemalloc
+* analytics: what the analytics dialog computes (the chart's
+  SessionTimeline binning and heatmap, and the history queries) over 1 h,
+  8 h and 30 days of tracked activity
+
+Timings are medians of ``--repeat`` runs. ``--compare`` prints each metric
+against an earlier results file; with ``--max-regression`` it also fails
+(exit status 1) when a timing, throughput or memory figure got worse by
+more than that fraction.
+
+    python benchmarks/run_suite.py --output results.json
+    python benchmarks/run_suite.py --output new.json --compare results.json --max-regression 0.2
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_classifier import DEFAULT_UNPRODUCTIVE_APPS, AppClassifier  # noqa: E402
+from bench_classifier import synthetic_block_list  # noqa: E402
+from bench_face_detector import load_frames  # noqa: E402
+from bench_history import synthetic_intervals  # noqa: E402
+from bench_session_store import fill_store, measure  # noqa: E402
+from bench_window_replay import synthetic_trace  # noqa: E402
+from face_detector import FaceDetector, detect_full_frame  # noqa: E402
+from history_store import HistoryStore  # noqa: E402
+from session_store import SessionStore  # noqa: E402
+from timeline import SessionTimeline  # noqa: E402
+from tracking import SessionTracker, replay  # noqa: E402
+from window_sampler import ReplaySampler, load_trace  # noqa: E402
+
+SCALES = {"1h": 3600, "8h": 8 * 3600, "30d": 30 * 8 * 3600}  # tracked seconds; 30 working days of 8 h
+MEMORY_HOURS = (1, 8)
+SECTIONS = ["detection", "classification", "session_store", "analytics"]
+
+
+def median_seconds(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def synthetic_frames(count, seed=0):
+    """Grayscale desk frames with a head-sized blob drifting across them"""
+    rng = np.random.default_rng(seed)
+    base = np.full((480, 640), 90, np.uint8)
+    cv2.rectangle(base, (0, 360), (640, 480), 60, -1)  # the desk edge
+    frames = []
+    for index in range(count):
+        frame = base.copy()
+        x = 320 + int(60 * math.sin(index / 15))
+        cv2.ellipse(frame, (x, 220), (70, 95), 0, 0, 360, 185, -1)
+        cv2.ellipse(frame, (x - 25, 200), (12, 6), 0, 0, 360, 70, -1)
+        cv2.ellipse(frame, (x + 25, 200), (12, 6), 0, 0, 360, 70, -1)
+        frames.append(cv2.add(frame, rng.integers(0, 20, frame.shape, dtype=np.uint8)))
+    return frames
+
+
+def bench_detection(frames, source):
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    results = {"source": source, "frames": len(frames)}
+    detector = FaceDetector(face_cascade)
+    paths = [("full_scan", lambda gray: detect_full_frame(face_cascade, gray)), ("adaptive", detector.detect)]
+    for name, detect in paths:
+        timings = []
+        hits = 0
+        for gray in frames:
+            start = time.perf_counter()
+            faces = detect(gray)
+            timings.append(time.perf_counter() - start)
+            hits += bool(len(faces))
+        timings.sort()
+        results[name] = {
+            "median_ms": statistics.median(timings) * 1000,
+            "p95_ms": timings[int(len(timings) * 0.95)] * 1000,
+            "frames_with_face": hits,
+        }
+    results["adaptive"]["stats"] = dict(detector.stats)
+    return results
+
+
+def classify_seconds(build, titles, repeat):
+    """Median time for a freshly built classifier, cache still cold, to classify ``titles``"""
+    timings = []
+    for _ in range(repeat):
+        classifier = build()
+        start = time.perf_counter()
+        classifier.classify(titles)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def bench_classification(samples, source, repeat):
+    titles = [sample.title for sample in samples]
+    results = {"source": source, "titles": len(titles)}
+    for name, apps in (("default_list", DEFAULT_UNPRODUCTIVE_APPS), ("5000_entries", synthetic_block_list(5000))):
+        build = median_seconds(lambda: AppClassifier(apps), repeat)
+        cached = classify_seconds(lambda: AppClassifier(apps), titles, repeat)
+        uncached = classify_seconds(lambda: AppClassifier(apps, cache_size=0), titles, repeat)
+        results[name] = {
+            "entries": len(apps),
+            "build_ms": build * 1000,
+            "cached_titles_per_s": len(titles) / cached,
+            "uncached_titles_per_s": len(titles) / uncached,
+        }
+
+    def track():
+        return replay(ReplaySampler(samples), SessionTracker(DEFAULT_UNPRODUCTIVE_APPS))[1]
+
+    results["tracking_samples_per_s"] = len(samples) / statistics.median(track() for _ in range(repeat))
+    return results
+
+
+def bench_session_store(samples_for):
+    results = {}
+    for hours in MEMORY_HOURS:
+        samples = samples_for(hours * 3600)  # built first so only the store is measured
+        store, used = measure(lambda: fill_store(samples))
+        results[f"{hours}h"] = {"intervals": len(store), "bytes": used, "bytes_per_hour": used / hours}
+    return results
+
+
+def repeat_trace(samples, count):
+    """``count`` samples from a recorded trace, replayed end to end with shifted times as often as needed"""
+    span = samples[-1].timestamp - samples[0].timestamp + 1.0
+    repeated = []
+    for index in range(count):
+        loop, position = divmod(index, len(samples))
+        sample = samples[position]
+        repeated.append(sample._replace(timestamp=sample.timestamp + loop * span))
+    return repeated
+
+
+def scale_intervals(tracked, now):
+    """The synthetic working-day intervals holding ``tracked`` seconds and ending before ``now``"""
+    days = max(1, math.ceil(tracked / (8 * 3600)))
+    intervals = []
+    total = 0
+    for session_id, interval in synthetic_intervals(days, now):
+        if total >= tracked:
+            break
+        intervals.append((session_id, interval))
+        total += interval[4]
+    return days, intervals
+
+
+def bench_analytics(repeat, directory):
+    results = {}
+    now = time.time()
+    for scale, tracked in SCALES.items():
+        days, intervals = scale_intervals(tracked, now)
+        store = SessionStore()
+        for _, (start, end, title, productive, ticks, phase) in intervals:
+            store.add_interval(start, end, title, productive, ticks, phase)
+
+        def chart():
+            return SessionTimeline.from_session(store, now=now).heatmap
+
+        history = HistoryStore(os.path.join(directory, f"history-{scale}.db"), batch_size=5000)
+        history.start()
+        for session_id, interval in intervals:
+            history.add(session_id, interval)
+        history.close(timeout=None)
+
+        def queries():
+            # The queries history_analytics_text() runs, over the span this scale covers
+            history.daily_totals(days=min(days, 7), now=now)
+            history.top_apps(days=days, limit=5, now=now)
+            history.productive_ratio_by_hour(days=days, now=now)
+
+        results[scale] = {
+            "intervals": len(intervals),
+            "timeline_ms": median_seconds(chart, repeat) * 1000,
+            "history_ms": median_seconds(queries, repeat) * 1000,
+        }
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def worse_by(name, old, new):
+    """How much worse ``new`` is than ``old`` as a fraction, or None for a metric that is not a cost"""
+    if not old:
+        return None
+    if name.endswith("_per_s"):
+        return old / new - 1 if new else math.inf
+    if name.endswith(("_ms", "bytes", "bytes_per_hour")):
+        return new / old - 1
+    return None
+
+
+def compare(previous, current, max_regression):
+    """Print every metric against ``previous``; returns the ones past ``max_regression``"""
+    old, new = flatten(previous["results"]), flatten(current["results"])
+    print(f"\nAgainst {previous['meta'].get('revision') or 'an earlier run'} "
+          f"({previous['meta'].get('date', '?')}):")
+    for section in ("detection", "classification"):
+        sources = [document["results"].get(section, {}).get("source") for document in (previous, current)]
+        if None not in sources and sources[0] != sources[1]:
+            print(f"  note: {section} ran on {sources[0]} before and {sources[1]} now")
+    regressions = []
+    for name in sorted(old.keys() & new.keys()):
+        worse = worse_by(name, old[name], new[name])
+        if worse is None:
+            continue
+        flag = ""
+        if max_regression is not None and worse > max_regression:
+            flag = "  REGRESSION"
+            regressions.append(f"{name} is {worse:.0%} worse ({old[name]:,.3f} -> {new[name]:,.3f})")
+        print(f"  {name:52s} {old[name]:14,.3f} {new[name]:14,.3f} {-worse:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="benchmark-results.json", help="where to write the JSON results")
+    parser.add_argument("--frames", help="recorded frame set: a directory of images or a video file")
+    parser.add_argument("--frame-count", type=int, default=200, help="frames to use (synthetic or recorded)")
+    parser.add_argument("--trace", help="recorded window-title trace (newline-delimited JSON)")
+    parser.add_argument("--titles", type=int, default=28_800, help="synthetic trace samples (default: 8 h at 1 Hz)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", action="append", choices=SECTIONS, help="run just this section (repeatable)")
+    parser.add_argument("--compare", help="an earlier results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=None,
+                        help="with --compare, fail if a metric got worse by more than this fraction")
+    args = parser.parse_args()
+    sections = args.only or SECTIONS
+
+    if args.trace:
+        recorded = load_trace(args.trace)
+        samples, trace_source = recorded, os.path.basename(args.trace)
+    else:
+        recorded = None
+        samples, trace_source = synthetic_trace(args.titles), "synthetic"
+
+    results = {}
+    started = time.perf_counter()
+    if "detection" in sections:
+        if args.frames:
+            frames, source = load_frames(args.frames, args.frame_count), os.path.basename(args.frames)
+        else:
+            frames, source = synthetic_frames(args.frame_count), "synthetic"
+        if not frames:
+            print(f"Error loading frames from {args.frames}")
+            sys.exit(1)
+        results["detection"] = detection = bench_detection(frames, source)
+        print(f"Detection ({source}, {len(frames)} frames): "
+              f"full scan {detection['full_scan']['median_ms']:.2f} ms/frame, "
+              f"adaptive {detection['adaptive']['median_ms']:.2f} ms/frame")
+    if "classification" in sections:
+        results["classification"] = classification = bench_classification(samples, trace_source, args.repeat)
+        for name in ("default_list", "5000_entries"):
+            stats = classification[name]
+            print(f"Classification ({stats['entries']} apps): {stats['cached_titles_per_s']:,.0f} titles/s cached, "
+                  f"{stats['uncached_titles_per_s']:,.0f} uncached")
+        print(f"Tracking pipeline: {classification['tracking_samples_per_s']:,.0f} samples/s")
+    if "session_store" in sections:
+        def samples_for(count):
+            if recorded is None:
+                return synthetic_trace(count)
+            return repeat_trace(recorded, count)
+        results["session_store"] = memory = bench_session_store(samples_for)
+        print("Session store: " + ", ".join(f"{scale} {stats['bytes_per_hour'] / 1024:.1f} KiB/h"
+                                            for scale, stats in memory.items()))
+    if "analytics" in sections:
+        with tempfile.TemporaryDirectory() as directory:
+            results["analytics"] = analytics = bench_analytics(args.repeat, directory)
+        for scale, stats in analytics.items():
+            print(f"Analytics {scale:>3s}: timeline {stats['timeline_ms']:7.2f} ms, "
+                  f"history {stats['history_ms']:7.2f} ms ({stats['intervals']:,} intervals)")
+
+    document = {
+        "meta": {
+            "revision": git_revision(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "repeat": args.repeat,
+            "seconds": round(time.perf_counter() - started, 1),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        regressions = compare(previous, document, args.max_regression)
+        for regression in regressions:
+            print(f"FAIL: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
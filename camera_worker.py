@@ -0,0 +1,289 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+
+from instrumentation import SKIPPED
+
+# Result handed from the worker thread to the Tk thread; ``timestamp`` is when
+# ``faces`` were last confirmed, which a MotionGate may carry forward. Preview
+# pixels travel separately through PreviewBuffers.
+CameraResult = namedtuple("CameraResult", ["timestamp", "faces"])
+
+# Stages of one frame, in order; PipelineMetrics.record_frame() takes their bounds
+STAGES = ("read", "gate", "detect", "resize", "draw", "convert")
+STAGE_SPANS = tuple("camera." + stage for stage in STAGES)
+
+
+class LatestQueue:
+    """Bounded queue that drops the oldest item when full"""
+
+    def __init__(self, maxsize=2):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._lock:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+
+    def get_latest(self):
+        """Return the newest item and discard anything older, or None if empty"""
+        with self._lock:
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class PreviewBuffers:
+    """Preallocated preview frames handed from the worker to the Tk thread
+
+    A triple buffer of RGBA frames: the worker fills ``back`` and publish()
+    swaps it with the ready slot; take() on the Tk thread swaps the ready
+    slot into ``front`` and returns it. Each side only ever touches its own
+    slot, the lock is held just for the index swap, and no frame memory is
+    allocated after construction. ``bgr`` is the worker's scratch buffer for
+    the resized frame and the face boxes.
+    """
+
+    def __init__(self, size):
+        width, height = size
+        self.size = size
+        self.bgr = np.empty((height, width, 3), np.uint8)
+        self._slots = [np.empty((height, width, 4), np.uint8) for _ in range(3)]
+        self._back, self._ready, self._front = 0, 1, 2
+        self._fresh = False
+        self._lock = threading.Lock()
+        self.published = 0
+
+    @property
+    def back(self):
+        return self._slots[self._back]
+
+    def publish(self):
+        """Make the frame in ``back`` the newest one (worker thread)"""
+        with self._lock:
+            self._back, self._ready = self._ready, self._back
+            self._fresh = True
+            self.published += 1
+
+    def take(self):
+        """Return the newest unseen frame, or None (Tk thread)
+
+        The array stays valid until the next take().
+        """
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._ready, self._front = self._front, self._ready
+            self._fresh = False
+            return self._slots[self._front]
+
+
+class PipelineMetrics:
+    """Per-stage latency and frame counters for the camera pipeline
+
+    The worker reports each frame once, through record_frame(), so a frame
+    takes one lock here and one in the Instrumentation, where its stages
+    are recorded as "camera.<stage>" while it is enabled.
+    """
+
+    def __init__(self, instrumentation=None):
+        self.instrumentation = instrumentation
+        self._lock = threading.Lock()
+        self.stages = {}  # stage -> [count, total, max, last] in seconds
+        self.frames_processed = 0
+        self.read_failures = 0
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._add(stage, seconds)
+        instrumentation = self.instrumentation
+        if instrumentation is not None and instrumentation.enabled:
+            instrumentation.record("camera." + stage, seconds)
+
+    def record_frame(self, marks):
+        """Record one frame's STAGES from the perf_counter ``marks`` bounding them
+
+        ``marks`` has one more entry than STAGES; a SKIPPED mark means its
+        stage did not run (see Instrumentation.record_stages).
+        """
+        with self._lock:
+            start = marks[0]
+            for stage, end in zip(STAGES, marks[1:]):
+                if end == end:  # not SKIPPED (NaN)
+                    self._add(stage, end - start)
+                    start = end
+        instrumentation = self.instrumentation
+        if instrumentation is not None and instrumentation.enabled:
+            instrumentation.record_stages(STAGE_SPANS, marks)
+
+    def _add(self, stage, seconds):
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = [0, 0.0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += seconds
+        if seconds > stats[2]:
+            stats[2] = seconds
+        stats[3] = seconds
+
+    def snapshot(self, frames_dropped=0):
+        """Return a copy of the metrics with latencies in milliseconds"""
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": count,
+                    "avg_ms": total / count * 1000 if count else 0.0,
+                    "max_ms": peak * 1000,
+                    "last_ms": last * 1000,
+                }
+                for stage, (count, total, peak, last) in self.stages.items()
+            }
+            return {
+                "stages": stages,
+                "frames_processed": self.frames_processed,
+                "frames_dropped": frames_dropped,
+                "read_failures": self.read_failures,
+            }
+
+
+class CameraWorker(threading.Thread):
+    """Reads camera frames and runs face detection off the Tk thread
+
+    With a MotionGate, frames that have not changed since the last
+    detection reuse its result instead of running the detector. Preview
+    frames are resized, annotated and converted into PreviewBuffers without
+    allocating; with ``preview_enabled`` off that work is skipped entirely
+    and only detection runs. set_interval() changes the frame rate at once;
+    an interval of None pauses capture until a rate is set again.
+    """
+
+    def __init__(self, cap, detector, interval=0.1, preview_size=(320, 240), queue_size=2, gate=None,
+                 instrumentation=None):
+        super().__init__(name="CameraWorker", daemon=True)
+        self.cap = cap
+        self.detector = detector
+        self.gate = gate
+        self.interval = interval
+        self.preview = PreviewBuffers(preview_size)
+        self.preview_enabled = True
+        self._frame = None
+        self._gray = None
+        self.results = LatestQueue(queue_size)
+        self.metrics = PipelineMetrics(instrumentation)
+        self.error = None
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+
+    def set_interval(self, interval):
+        """Seconds between frames from now on; None pauses capture"""
+        self.interval = interval
+        self._wake.set()
+
+    def stop(self, timeout=1.0):
+        """Ask the worker to finish and wait for the current frame to complete"""
+        self._stop_event.set()
+        self._wake.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def get_metrics(self):
+        metrics = self.metrics.snapshot(frames_dropped=self.results.dropped)
+        metrics["detector"] = dict(self.detector.stats)
+        metrics["gate"] = dict(self.gate.stats) if self.gate is not None else None
+        return metrics
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if self.interval is None:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            tick_start = time.perf_counter()
+            try:
+                self.process_frame()
+                self.error = None
+            except Exception as e:
+                self.error = e
+            interval = self.interval
+            if interval is not None:
+                self._wake.wait(max(0.0, interval - (time.perf_counter() - tick_start)))
+            self._wake.clear()
+
+    def process_frame(self):
+        """Capture and detect one frame, then resize, annotate and convert its preview"""
+        metrics = self.metrics
+
+        t0 = time.perf_counter()
+        # Capture and grayscale conversion reuse the previous frame's buffers
+        ret, frame = self.cap.read(self._frame)
+        t1 = time.perf_counter()
+        if not ret:
+            metrics.read_failures += 1
+            metrics.record_frame((t0, t1, SKIPPED, SKIPPED, SKIPPED, SKIPPED, SKIPPED))
+            return
+        self._frame = frame
+
+        # Convert frame to grayscale for face detection
+        now = time.time()
+        gray = self._gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        gate = self.gate
+        if gate is None:
+            gate_end = SKIPPED  # the grayscale conversion counts towards detection
+            faces = self.detector.detect(gray)
+            seen_at = now
+            t2 = time.perf_counter()
+        elif gate.needs_detection(gray, now):
+            gate_end = time.perf_counter()
+            faces = self.detector.detect(gray)
+            seen_at = now
+            gate.update(faces, now)
+            t2 = time.perf_counter()
+        else:
+            faces, seen_at = gate.carried(now)
+            gate_end = time.perf_counter()
+            t2 = SKIPPED
+
+        if self.preview_enabled:
+            marks = (t0, t1, gate_end, t2) + self.render_preview(frame, faces)
+        else:
+            marks = (t0, t1, gate_end, t2, SKIPPED, SKIPPED, SKIPPED)
+        self.results.put(CameraResult(seen_at, faces))
+        metrics.frames_processed += 1
+        metrics.record_frame(marks)
+
+    def render_preview(self, frame, faces):
+        """Resize, annotate and convert ``frame`` into the preview buffers
+
+        Returns the perf_counter times at which each of the three steps ended.
+        """
+        preview = self.preview
+        # Shrink first so drawing and the color conversion only touch preview pixels
+        cv2.resize(frame, preview.size, dst=preview.bgr)
+        t3 = time.perf_counter()
+
+        # Draw rectangles around faces
+        scale_x = preview.size[0] / frame.shape[1]
+        scale_y = preview.size[1] / frame.shape[0]
+        for (x, y, w, h) in faces:
+            cv2.rectangle(preview.bgr, (int(x * scale_x), int(y * scale_y)),
+                          (int((x + w) * scale_x), int((y + h) * scale_y)), (0, 255, 0), 2)
+        t4 = time.perf_counter()
+
+        cv2.cvtColor(preview.bgr, cv2.COLOR_BGR2RGBA, dst=preview.back)
+        preview.publish()
+        return t3, t4, time.perf_counter()
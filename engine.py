@@ -0,0 +1,330 @@
+import time
+
+from presence import AWAY, PresenceFusion, PresencePolicy
+
+WORK = "Work"
+BREAK = "Break"
+LONG_BREAK = "Long Break"
+
+# Seconds per focus phase
+PHASE_DURATIONS = {WORK: 25 * 60, BREAK: 5 * 60, LONG_BREAK: 15 * 60}
+
+
+class SystemClock:
+    """Wall-clock time for the live app"""
+
+    def time(self):
+        return time.time()
+
+
+class VirtualClock:
+    """Clock that only moves when told to, for simulations and replays"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def set(self, now):
+        self.now = now
+
+
+class EngineListener:
+    """Receives TrackerEngine events; the view overrides what it shows"""
+
+    def on_window(self, sample, is_unproductive):
+        pass
+
+    def on_presence(self, state):
+        """``state`` is one of ("present", "break", "away")"""
+        pass
+
+    def on_warning(self, reason):
+        """A distraction during a Work phase; ``reason`` is one of ("window", "away")"""
+        pass
+
+    def on_phase_change(self, phase, completed_sessions):
+        pass
+
+    def on_camera_interval(self, interval):
+        """Seconds between camera frames the presence policy wants; None stops the camera"""
+        pass
+
+
+class TrackerEngine:
+    """Session timing, focus phases and presence without any UI
+
+    The engine owns everything that used to live in the Tk callbacks: the
+    session clock, the Pomodoro phase machine, window accounting through a
+    SessionTracker, the face grace period and the journal records. It never
+    reads the time itself; every timestamp comes from the injected ``clock``,
+    so a VirtualClock can push a whole day of ticks through it in a moment.
+    Events (window verdicts, presence changes, warnings, phase changes) go
+    to ``listener``, which is the only thing a view needs to implement.
+
+    The window source is a WindowSampler (polled) or a WindowWatcher
+    (event-driven); both hand poll_window() the samples to account.
+    Drivers call poll_window() once per window check, update_timer() once
+    per timer tick and handle_faces() for every camera result.
+
+    Presence is decided by a PresenceFusion from the camera results, the
+    foreground window switches and, with an ``input_source``, the keyboard
+    and mouse idle time read on each timer tick. Whenever the camera rate
+    the policy wants changes, the listener's on_camera_interval() is told.
+    """
+
+    def __init__(self, tracker, window_source, clock=None, journal=None, listener=None,
+                 sessions_before_long_break=4, phase_durations=None, presence_policy=None,
+                 input_source=None):
+        self.tracker = tracker
+        self.window_source = window_source
+        self.clock = clock or SystemClock()
+        self.journal = journal
+        self.listener = listener or EngineListener()
+        self.sessions_before_long_break = sessions_before_long_break
+        self.phase_durations = dict(phase_durations or PHASE_DURATIONS)
+        self.presence = PresenceFusion(presence_policy or PresencePolicy())
+        self.input_source = input_source
+        self.camera_interval = self.presence.policy.camera_interval
+
+        self.running = False
+        self.focus_mode = False
+        self.start_time = 0
+        self.stop_time = 0
+        self.current_phase = WORK
+        self.phase_start_time = 0
+        self.phase_time_left = self.phase_durations[WORK]
+        self.consecutive_work_sessions = 0
+        self.away_spans = []  # [start, end] per absence; end is None while away
+        self.current_sample = None
+
+    # Session lifecycle
+
+    def start(self, focus=False, restore=None):
+        """Start a session, or resume one from journal records"""
+        now = self.clock.time()
+        self.focus_mode = focus
+        if restore:
+            self.tracker.restore(restore)
+            # Leave out the time the app was not running
+            self.start_time = now - (restore[-1]["t"] - restore[0]["start_time"])
+        else:
+            self.tracker.reset(int(now * 1000))
+            self.start_time = now
+        self.current_phase = WORK
+        self.phase_start_time = now
+        self.consecutive_work_sessions = 0
+        if restore and focus:
+            self._restore_phase(restore, now)
+        self.phase_time_left = self.phase_durations[self.current_phase] - (now - self.phase_start_time)
+        self.tracker.phase = self.current_phase if focus else ""
+        self.away_spans = []
+        self.current_sample = None
+        self.presence.reset(now)
+        self._update_camera(now)
+        self.window_source.skip_to_now()
+        self.running = True
+        if self.journal is not None:
+            self.journal.compact(self.snapshot("snapshot" if restore else "start"))
+
+    def _restore_phase(self, records, now):
+        """Resume the focus phase the journal last recorded, less the time the app was not running"""
+        for record in reversed(records):
+            if "focus_phase" in record:
+                self.current_phase = record["focus_phase"]
+                self.phase_start_time = now - (records[-1]["t"] - record["phase_start_time"])
+                self.consecutive_work_sessions = record["consecutive_work_sessions"]
+                return
+
+    def stop(self):
+        """End the session and close its open interval"""
+        if not self.running:
+            return
+        self.running = False
+        self.focus_mode = False
+        self.stop_time = self.clock.time()
+        self._end_absence(self.stop_time)
+        self.tracker.finish()
+        if self.journal is not None:
+            self.journal.write({"type": "stop", "t": self.stop_time})
+
+    def snapshot(self, kind):
+        """Journal record holding the whole current session state"""
+        record = {
+            "type": kind,
+            "t": self.clock.time(),
+            "mode": "focus" if self.focus_mode else "normal",
+            "start_time": self.start_time
+        }
+        if self.focus_mode:
+            record.update(self._phase_state())
+        record.update(self.tracker.snapshot())
+        return record
+
+    # Event sources
+
+    def poll_window(self):
+        """Account the foreground window since the last call
+
+        A polling source yields one sample; an event-driven watcher also
+        yields the switches in between, each stamped with its exact time.
+        """
+        if not self.running:
+            return None
+        previous = self.current_sample
+        sample = None
+        is_unproductive = False
+        for sample in self.window_source.samples():
+            if previous is not None and sample.title != previous.title:
+                self.presence.observe_window(sample.timestamp)
+            previous = sample
+            is_unproductive = self.tracker.process(sample)
+            if self.journal is not None:
+                self.journal.write({
+                    "type": "sample",
+                    "t": sample.timestamp,
+                    "app": sample.title,
+                    "unproductive": is_unproductive,
+                    "phase": self.tracker.phase
+                })
+        self.current_sample = sample
+        if sample is not None:
+            self._presence_changed()
+            self.listener.on_window(sample, is_unproductive)
+            if is_unproductive and self.in_work_phase:
+                self.listener.on_warning("window")
+        if self.journal is not None and self.journal.compaction_due:
+            self.journal.compact(self.snapshot("snapshot"))
+        return sample
+
+    def update_timer(self):
+        """Read the input idle time and advance the focus phase machine to the current time"""
+        if not self.running:
+            return
+        now = self.clock.time()
+        self.poll_input(now)
+        if not self.focus_mode:
+            return
+        duration = self.phase_durations[self.current_phase]
+        self.phase_time_left = duration - (now - self.phase_start_time)
+        if self.phase_time_left > 0:
+            return
+
+        if self.current_phase == WORK:
+            self.consecutive_work_sessions += 1
+            if self.consecutive_work_sessions == self.sessions_before_long_break:
+                self.current_phase = LONG_BREAK
+                self.consecutive_work_sessions = 0
+            else:
+                self.current_phase = BREAK
+        else:
+            self.current_phase = WORK
+        # A late tick must not stretch the schedule, so the new phase starts
+        # at the old one's deadline, unless the stall outlasted it (a suspend)
+        deadline = self.phase_start_time + duration
+        next_duration = self.phase_durations[self.current_phase]
+        self.phase_start_time = deadline if now - deadline < next_duration else now
+        self.phase_time_left = next_duration - (now - self.phase_start_time)
+        self.tracker.phase = self.current_phase
+        if self.journal is not None:
+            record = {"type": "phase", "t": now}
+            record.update(self._phase_state())
+            self.journal.write(record)
+        self.listener.on_phase_change(self.current_phase, self.consecutive_work_sessions)
+
+    def _phase_state(self):
+        return {
+            "focus_phase": self.current_phase,
+            "phase_start_time": self.phase_start_time,
+            "consecutive_work_sessions": self.consecutive_work_sessions
+        }
+
+    def handle_faces(self, timestamp, faces):
+        """Update presence from one camera result"""
+        if not self.running:
+            return
+        seen = len(faces) > 0
+        presence = self.presence
+        presence.observe_face(timestamp, seen)
+        if presence.state == AWAY:
+            self._presence_changed(report=False)
+            self.listener.on_presence("away")
+            if self.in_work_phase:
+                self.listener.on_warning("away")
+        else:
+            if self.away_spans and self.away_spans[-1][1] is None:
+                self._presence_changed(report=False)
+            if seen:
+                self.listener.on_presence(self.present_state)
+        # Runs for every frame, so the common no-change case stays inline
+        if presence.camera_interval_at(timestamp) != self.camera_interval:
+            self._update_camera(timestamp)
+
+    def poll_input(self, now=None):
+        """Feed the input source's idle time to the presence policy"""
+        if not self.running:
+            return
+        if now is None:
+            now = self.clock.time()
+        if self.input_source is not None:
+            idle = self.input_source.idle_seconds()
+            if idle is not None:
+                self.presence.observe_input(now - idle)
+                self._presence_changed()
+        self._update_camera(now)
+
+    def _presence_changed(self, report=True):
+        """Record absences as the fused state flips; announce returns not seen by the camera"""
+        away = self.presence.state == AWAY
+        if away == (bool(self.away_spans) and self.away_spans[-1][1] is None):
+            return
+        if away:
+            # The absence began when the policy last had a sign of the user
+            self.away_spans.append([self.presence.away_since, None])
+        else:
+            self._end_absence(self.presence.returned_at)
+            if report:
+                self.listener.on_presence(self.present_state)
+
+    def _update_camera(self, now):
+        interval = self.presence.camera_interval_at(now)
+        if interval != self.camera_interval:
+            self.camera_interval = interval
+            self.listener.on_camera_interval(interval)
+
+    def _end_absence(self, timestamp):
+        if self.away_spans and self.away_spans[-1][1] is None:
+            self.away_spans[-1][1] = timestamp
+
+    # Session state for the view
+
+    @property
+    def face_grace_period(self):
+        """Seconds without any sign of the user before they are marked away"""
+        return self.presence.policy.away_after
+
+    @property
+    def present_state(self):
+        return "break" if self.focus_mode and self.current_phase == BREAK else "present"
+
+    @property
+    def in_work_phase(self):
+        return self.focus_mode and self.current_phase == WORK
+
+    @property
+    def elapsed(self):
+        """Seconds since the session started, up to when it stopped"""
+        end = self.clock.time() if self.running else self.stop_time
+        return end - self.start_time
+
+    @property
+    def distracted_time(self):
+        return self.tracker.distracted_time
+
+    @property
+    def productive_time(self):
+        return max(0, self.elapsed - self.tracker.distracted_time)  # Ensure no negative time
@@ -0,0 +1,167 @@
+import cv2
+
+# Cascade parameters in full-resolution pixels, as used by the original full-frame scan
+SCALE_FACTOR = 1.2
+MIN_NEIGHBORS = 6
+MIN_FACE_SIZE = 50
+MAX_FACE_SIZE = 300
+
+
+# Motion gate defaults
+MOTION_THUMB_SIZE = (32, 24)  # downscaled frame the difference is taken on
+MOTION_THRESHOLD = 5.0        # mean absolute difference in gray levels (0-255)
+
+
+def detect_full_frame(face_cascade, gray):
+    """Run the cascade over the whole full-resolution frame (the reference path)"""
+    faces = face_cascade.detectMultiScale(
+        gray,
+        scaleFactor=SCALE_FACTOR,
+        minNeighbors=MIN_NEIGHBORS,
+        minSize=(MIN_FACE_SIZE, MIN_FACE_SIZE),
+        maxSize=(MAX_FACE_SIZE, MAX_FACE_SIZE)
+    )
+    return tuple(tuple(int(v) for v in face) for face in faces)
+
+
+class FaceDetector:
+    """Face detector that downsamples frames and tracks a region around the last face
+
+    Most frames only scan a padded box around the previous detection on a
+    downsampled copy of the frame. A full-frame scan runs every
+    ``full_scan_every`` frames and whenever the tracked region comes up empty,
+    so a miss in the region is never reported without checking the whole
+    frame first. Returned boxes are in full-resolution frame coordinates.
+    """
+
+    def __init__(self, face_cascade, detect_width=320, full_scan_every=10, roi_padding=0.5):
+        self.face_cascade = face_cascade
+        self.detect_width = detect_width
+        self.full_scan_every = full_scan_every
+        self.roi_padding = roi_padding
+        self.last_faces = ()
+        self.frames_since_full_scan = 0
+        self.stats = {"frames": 0, "full_scans": 0, "roi_scans": 0, "roi_misses": 0}
+
+    def reset(self):
+        self.last_faces = ()
+        self.frames_since_full_scan = 0
+
+    def detect(self, gray):
+        """Return face boxes (x, y, w, h) for a full-resolution grayscale frame"""
+        self.stats["frames"] += 1
+        height, width = gray.shape[:2]
+        scale = min(1.0, self.detect_width / width)
+        if scale < 1.0:
+            small = cv2.resize(gray, (int(width * scale), int(height * scale)),
+                               interpolation=cv2.INTER_AREA)
+        else:
+            small = gray
+
+        faces = ()
+        if self.last_faces and self.frames_since_full_scan < self.full_scan_every:
+            faces = self._scan_roi(small, scale)
+            self.stats["roi_scans"] += 1
+            if not faces:
+                self.stats["roi_misses"] += 1
+
+        if faces:
+            self.frames_since_full_scan += 1
+        else:
+            # Periodic refresh, lost track, or nothing tracked yet
+            faces = self._scan(small, scale, 0, 0)
+            self.stats["full_scans"] += 1
+            self.frames_since_full_scan = 0
+
+        self.last_faces = faces
+        return faces
+
+    def _scan_roi(self, small, scale):
+        x, y, w, h = max(self.last_faces, key=lambda face: face[2] * face[3])
+        pad_x = int(w * self.roi_padding)
+        pad_y = int(h * self.roi_padding)
+        height, width = small.shape[:2]
+        x0 = max(0, int((x - pad_x) * scale))
+        y0 = max(0, int((y - pad_y) * scale))
+        x1 = min(width, int((x + w + pad_x) * scale) + 1)
+        y1 = min(height, int((y + h + pad_y) * scale) + 1)
+        return self._scan(small[y0:y1, x0:x1], scale, x0, y0)
+
+    def _scan(self, image, scale, offset_x, offset_y):
+        min_size = max(1, int(round(MIN_FACE_SIZE * scale)))
+        max_size = int(round(MAX_FACE_SIZE * scale))
+        if image.shape[0] < min_size or image.shape[1] < min_size:
+            return ()
+        faces = self.face_cascade.detectMultiScale(
+            image,
+            scaleFactor=SCALE_FACTOR,
+            minNeighbors=MIN_NEIGHBORS,
+            minSize=(min_size, min_size),
+            maxSize=(max_size, max_size)
+        )
+        return tuple(
+            (int((fx + offset_x) / scale), int((fy + offset_y) / scale),
+             int(fw / scale), int(fh / scale))
+            for (fx, fy, fw, fh) in faces
+        )
+
+
+class MotionGate:
+    """Decides when a camera frame needs face detection at all
+
+    Each frame is shrunk to a tiny thumbnail and compared with the thumbnail
+    of the last frame that went through the detector. While the mean
+    absolute difference stays under ``threshold`` the picture has not
+    changed (the user is sitting still, or the chair is empty), so the
+    previous result is carried forward instead of re-running the cascade.
+    Detection still runs at least every ``max_age`` seconds.
+
+    Carried-forward faces keep the time they were actually seen
+    (``detected_at``), while a carried-forward "no face" is true as of now,
+    so the grace period still counts from the last real sighting. With
+    ``max_age`` below the grace period, even a departure that causes no
+    visible motion is re-checked before the grace period runs out, and
+    "Away!" fires no later than it would without the gate.
+    """
+
+    def __init__(self, threshold=MOTION_THRESHOLD, max_age=2.0, thumb_size=MOTION_THUMB_SIZE):
+        self.threshold = threshold
+        self.max_age = max_age
+        self.thumb_size = thumb_size
+        self.faces = ()
+        self.detected_at = None
+        self.last_score = None
+        self._reference = None
+        self._thumb = None
+        self.stats = {"frames": 0, "skipped": 0, "motion": 0, "max_age": 0}
+
+    def reset(self):
+        self.faces = ()
+        self.detected_at = None
+        self._reference = None
+
+    def needs_detection(self, gray, now):
+        """Return whether ``gray`` (taken at ``now``) must go through the detector"""
+        self.stats["frames"] += 1
+        self._thumb = cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA)
+        if self._reference is None:
+            return True
+        if now - self.detected_at >= self.max_age:
+            self.stats["max_age"] += 1
+            return True
+        self.last_score = cv2.norm(self._thumb, self._reference, cv2.NORM_L1) / self._thumb.size
+        if self.last_score >= self.threshold:
+            self.stats["motion"] += 1
+            return True
+        self.stats["skipped"] += 1
+        return False
+
+    def update(self, faces, now):
+        """Record the detector's result for the frame just checked"""
+        self._reference = self._thumb
+        self.faces = faces
+        self.detected_at = now
+
+    def carried(self, now):
+        """Return (faces, seen_at) to report for a skipped frame"""
+        return self.faces, self.detected_at if self.faces else now
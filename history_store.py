@@ -0,0 +1,263 @@
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apps (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS activity (
+    session_id INTEGER NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    duration REAL NOT NULL,
+    app_id INTEGER NOT NULL REFERENCES apps(id),
+    productive INTEGER NOT NULL,
+    phase TEXT NOT NULL,
+    day TEXT NOT NULL,
+    week TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    UNIQUE (session_id, start)
+);
+CREATE INDEX IF NOT EXISTS activity_time ON activity (start, app_id, productive, duration, hour, phase);
+CREATE INDEX IF NOT EXISTS activity_day ON activity (day, week, productive, duration);
+CREATE INDEX IF NOT EXISTS activity_app ON activity (app_id, start, duration);
+"""
+# PRAGMA user_version of a database with the current schema; 1 moved weeks to ISO weeks
+SCHEMA_VERSION = 1
+
+
+def split_by_hour(start, end):
+    """Yield (start, end, local_time) pieces of an interval cut at local hour boundaries"""
+    while start < end:
+        local = time.localtime(start)
+        hour_start = time.mktime(local[:4] + (0, 0, 0, 0, -1))
+        piece_end = min(end, hour_start + 3600)
+        if piece_end <= start:  # DST fold; step past it
+            piece_end = min(end, start + 3600)
+        yield start, piece_end, local
+        start = piece_end
+
+
+def read_sessions(path):
+    """Yield (session_id, [(start, end, app, productive, phase)]) from a history database
+
+    Opens ``path`` read-only, so databases copied from other machines are
+    left untouched. Intervals come back in time order, cut at local hour
+    boundaries as they were stored.
+    """
+    import pathlib  # only batch analysis reads databases this way; keep it off the startup path
+
+    uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        cursor = conn.execute(
+            "SELECT session_id, start, end, apps.name, productive, phase FROM activity"
+            " JOIN apps ON apps.id = activity.app_id ORDER BY session_id, start"
+        )
+        session_id = None
+        intervals = []
+        for row in cursor:
+            if row[0] != session_id:
+                if intervals:
+                    yield session_id, intervals
+                session_id = row[0]
+                intervals = []
+            intervals.append((row[1], row[2], row[3], bool(row[4]), row[5]))
+        if intervals:
+            yield session_id, intervals
+    finally:
+        conn.close()
+
+
+class HistoryStore:
+    """SQLite history of activity intervals across sessions
+
+    Closed intervals from SessionStore are queued with add() and written by
+    a background thread in batched transactions, so the Tk loop never waits
+    on SQLite. Each interval is cut at local hour boundaries on the way in,
+    so per-day and per-hour-of-day queries are exact sums over indexed
+    columns. The (session_id, start) key makes re-adding an interval a no-op,
+    which lets journal recovery replay a session without double counting.
+
+    Query methods open their own connection and can be called from the Tk
+    thread while the writer is running (the database is in WAL mode). The
+    writer refreshes the planner statistics (ANALYZE) as data accumulates so
+    short time ranges keep using the time index instead of a full scan.
+    With an Instrumentation, each batch transaction is timed as
+    "history.write".
+    """
+
+    def __init__(self, path, batch_size=256, flush_interval=2.0, analyze_every=50000, instrumentation=None):
+        self.path = path
+        self.instrumentation = instrumentation
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.analyze_every = analyze_every
+        self.rows_written = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._reader = None
+        with sqlite3.connect(path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._migrate(conn)
+
+    @staticmethod
+    def _migrate(conn):
+        """Recompute the week column as ISO weeks, which earlier versions split at New Year"""
+        import datetime
+
+        days = [row[0] for row in conn.execute("SELECT DISTINCT day FROM activity")]
+        conn.executemany(
+            "UPDATE activity SET week = ? WHERE day = ?",
+            [("%d-W%02d" % datetime.date.fromisoformat(day).isocalendar()[:2], day) for day in days]
+        )
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # Writing
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="HistoryStore", daemon=True)
+        self._thread.start()
+
+    def add(self, session_id, interval):
+        """Queue one (start, end, title, productive, ticks, phase) interval for writing"""
+        self._queue.put((session_id, interval))
+
+    def close(self, timeout=5.0):
+        """Write everything queued so far and stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _run(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        app_ids = dict(conn.execute("SELECT name, id FROM apps"))
+        batch = []
+        batch_started = 0.0
+        analyzed_at = 0
+        stopping = False
+        while not stopping:
+            try:
+                if batch:
+                    wait = self.flush_interval - (time.monotonic() - batch_started)
+                    item = self._queue.get(timeout=max(0.0, wait))
+                else:
+                    item = self._queue.get()
+                if item is None:
+                    stopping = True
+                else:
+                    if not batch:
+                        batch_started = time.monotonic()
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            if batch and (stopping or len(batch) >= self.batch_size
+                          or time.monotonic() - batch_started >= self.flush_interval):
+                try:
+                    write_start = time.perf_counter()
+                    self._write_batch(conn, app_ids, batch)
+                    if self.instrumentation is not None:
+                        self.instrumentation.record("history.write", time.perf_counter() - write_start)
+                    if self.rows_written - analyzed_at >= self.analyze_every or stopping:
+                        conn.execute("ANALYZE")
+                        analyzed_at = self.rows_written
+                except Exception as e:
+                    print(f"Error writing history: {e}")
+                batch = []
+        conn.close()
+
+    def _write_batch(self, conn, app_ids, batch):
+        rows = []
+        for session_id, (start, end, title, productive, ticks, phase) in batch:
+            app_id = app_ids.get(title)
+            if app_id is None:
+                conn.execute("INSERT OR IGNORE INTO apps (name) VALUES (?)", (title,))
+                app_id = conn.execute("SELECT id FROM apps WHERE name = ?", (title,)).fetchone()[0]
+                app_ids[title] = app_id
+            for piece_start, piece_end, local in split_by_hour(start, end):
+                rows.append((session_id, piece_start, piece_end, piece_end - piece_start,
+                             app_id, int(productive), phase, time.strftime("%Y-%m-%d", local),
+                             time.strftime("%G-W%V", local), local.tm_hour))
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO activity "
+                "(session_id, start, end, duration, app_id, productive, phase, day, week, hour) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        self.rows_written += len(rows)
+
+    # Queries
+
+    def _query(self, sql, params=()):
+        if self._reader is None:
+            self._reader = sqlite3.connect(self.path, check_same_thread=False)
+        return self._reader.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _since(days, now=None):
+        return (now if now is not None else time.time()) - days * 86400
+
+    def top_apps(self, days=30, limit=10, now=None):
+        """[(app, seconds)] for the most used apps over the last ``days`` days"""
+        return self._query(
+            "SELECT apps.name, totals.seconds FROM ("
+            "  SELECT app_id, SUM(duration) AS seconds FROM activity"
+            "  WHERE start >= ? GROUP BY app_id ORDER BY seconds DESC LIMIT ?"
+            ") AS totals JOIN apps ON apps.id = totals.app_id ORDER BY totals.seconds DESC",
+            (self._since(days, now), limit)
+        )
+
+    def productive_ratio_by_hour(self, days=30, now=None):
+        """[(hour_of_day, productive_ratio, seconds)] over the last ``days`` days"""
+        return self._query(
+            "SELECT hour, SUM(duration * productive) / SUM(duration), SUM(duration)"
+            " FROM activity WHERE start >= ? GROUP BY hour ORDER BY hour",
+            (self._since(days, now),)
+        )
+
+    def daily_totals(self, days=7, now=None):
+        """[(day, productive_seconds, unproductive_seconds)] per local day"""
+        since = time.strftime("%Y-%m-%d", time.localtime(self._since(days, now)))
+        return self._query(
+            "SELECT day, SUM(duration * productive), SUM(duration * (1 - productive))"
+            " FROM activity WHERE day >= ? GROUP BY day ORDER BY day",
+            (since,)
+        )
+
+    def weekly_totals(self, weeks=12, now=None):
+        """[(ISO year-week, productive_seconds, unproductive_seconds)] per week"""
+        since = time.strftime("%Y-%m-%d", time.localtime(self._since(weeks * 7, now)))
+        return self._query(
+            "SELECT week, SUM(duration * productive),"
+            " SUM(duration * (1 - productive))"
+            " FROM activity WHERE day >= ? GROUP BY week ORDER BY week",
+            (since,)
+        )
+
+    def app_daily_usage(self, app, days=30, now=None):
+        """[(day, seconds)] for a single app"""
+        return self._query(
+            "SELECT day, SUM(duration) FROM activity"
+            " WHERE app_id = (SELECT id FROM apps WHERE name = ?) AND start >= ?"
+            " GROUP BY day ORDER BY day",
+            (app, self._since(days, now))
+        )
+
+    def phase_totals(self, days=30, now=None):
+        """[(phase, productive_seconds, unproductive_seconds)] per focus phase"""
+        return self._query(
+            "SELECT phase, SUM(duration * productive), SUM(duration * (1 - productive))"
+            " FROM activity WHERE start >= ? GROUP BY phase ORDER BY phase",
+            (self._since(days, now),)
+        )
@@ -0,0 +1,96 @@
+import shutil
+import subprocess
+import sys
+import time
+
+
+class InputIdleSource:
+    """Seconds since the last keyboard or mouse input; None when it cannot be read"""
+
+    def idle_seconds(self):
+        return None
+
+    def close(self):
+        pass
+
+
+class Win32IdleSource(InputIdleSource):
+    """GetLastInputInfo on Windows"""
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class LASTINPUTINFO(ctypes.Structure):
+            _fields_ = [("cbSize", wintypes.UINT), ("dwTime", wintypes.DWORD)]
+
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._info = LASTINPUTINFO()
+        self._info.cbSize = ctypes.sizeof(LASTINPUTINFO)
+        self._byref = ctypes.byref
+
+    def idle_seconds(self):
+        if not self._user32.GetLastInputInfo(self._byref(self._info)):
+            return None
+        # Both tick counts wrap after 49.7 days; the difference stays right
+        return ((self._kernel32.GetTickCount() - self._info.dwTime) & 0xFFFFFFFF) / 1000
+
+
+class X11IdleSource(InputIdleSource):
+    """The MIT-SCREEN-SAVER idle counter on X11
+
+    Uses python-xlib when the extension is available; otherwise runs
+    ``xprintidle``, at most once every ``min_interval`` seconds since it
+    costs a process spawn.
+    """
+
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self._display = None
+        self._cached = None
+        self._cached_at = None
+        try:
+            from Xlib import display as xdisplay
+            self._display = xdisplay.Display()
+            if not self._display.has_extension("MIT-SCREEN-SAVER"):
+                self._display.close()
+                self._display = None
+        except Exception:
+            self._display = None
+        if self._display is None and shutil.which("xprintidle") is None:
+            raise RuntimeError("no X11 idle time source (python-xlib or xprintidle)")
+
+    def idle_seconds(self):
+        if self._display is not None:
+            try:
+                root = self._display.screen().root
+                return root.screensaver_query_info().idle / 1000
+            except Exception:
+                return None
+        now = time.monotonic()
+        if self._cached_at is not None and now - self._cached_at < self.min_interval:
+            return self._cached + (now - self._cached_at)
+        try:
+            output = subprocess.run(["xprintidle"], capture_output=True, text=True, timeout=1).stdout
+            self._cached = int(output.strip()) / 1000
+        except (OSError, ValueError, subprocess.SubprocessError):
+            return None
+        self._cached_at = now
+        return self._cached
+
+    def close(self):
+        if self._display is not None:
+            self._display.close()
+            self._display = None
+
+
+def create_idle_source():
+    """Pick an input-idle backend for this platform, or a null source"""
+    try:
+        if sys.platform == "win32":
+            return Win32IdleSource()
+        return X11IdleSource()
+    except Exception as e:
+        print(f"Input idle time unavailable, using the camera alone: {e}")
+        return InputIdleSource()
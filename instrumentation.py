@@ -0,0 +1,311 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+# Histogram buckets split each power of two (in microseconds) into this many steps
+SUB_BUCKETS = 4
+# record() only appends; a name's samples go into its Histogram this many at a time
+FOLD_SAMPLES = 4096
+# A record_stages() mark for a stage that did not run
+SKIPPED = math.nan
+
+
+class Histogram:
+    """Log-scale latency histogram, filled in batches
+
+    Bucket edges grow by 2**(1/SUB_BUCKETS) (about 19%), so percentiles read
+    from it are within one bucket of the exact value whatever the range,
+    without keeping the samples.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, samples):
+        """Fold a batch of durations, in seconds, into the buckets"""
+        import numpy as np  # deferred so numpy stays off the startup path
+
+        values = np.asarray(samples, dtype=float)
+        if not values.size:
+            return
+        mantissa, exponent = np.frexp(values * 1e6)
+        indexes = exponent * SUB_BUCKETS + ((mantissa - 0.5) * (2 * SUB_BUCKETS)).astype(int)
+        indexes[mantissa <= 0] = 0
+        low = int(indexes.min())
+        counts = np.bincount(indexes - low)
+        buckets = self.buckets
+        for offset in np.flatnonzero(counts).tolist():
+            index = offset + low
+            buckets[index] = buckets.get(index, 0) + int(counts[offset])
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def percentile(self, fraction):
+        """Upper edge of the bucket holding the ``fraction`` quantile, in seconds"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                exponent, step = divmod(index, SUB_BUCKETS)
+                edge = math.ldexp(0.5 + (step + 1) / (2 * SUB_BUCKETS), exponent) / 1e6
+                return min(edge, self.max)
+        return self.max
+
+    def summary(self):
+        """Count and latencies in milliseconds"""
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+            "total_ms": self.total * 1000,
+        }
+
+
+class _Span:
+    __slots__ = ("instrumentation", "name", "start")
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        self.instrumentation.record(self.name, end - self.start, end)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def stage_spans(names, marks):
+    """Yield (name, start, seconds) for the stages of one record_stages() call"""
+    start = marks[0]
+    for name, end in zip(names, marks[1:]):
+        if not math.isnan(end):
+            yield name, start, end - start
+            start = end
+
+
+class Instrumentation:
+    """Timing histograms, counters and a trace of recent spans for the hot paths
+
+    Code under measurement either wraps a block in ``with span(name):`` or
+    reports a duration it already measured with record(). Each name gets a
+    Histogram, and the last ``trace_events`` records (a record_stages()
+    call counts as one) are kept, with their thread, in a ring buffer that chrome_trace() exports in the Chrome
+    trace-event format (chrome://tracing, Perfetto). count() keeps plain
+    counters. A pipeline that times several consecutive stages hands them
+    all to record_stages() as one tuple of perf_counter marks.
+
+    record() and record_stages() sit on the camera thread's per-frame path,
+    so they only append under the lock; samples are bucketed FOLD_SAMPLES
+    at a time, or when snapshot() reads them, and a record_stages() tuple
+    is split into its spans only then.
+
+    ``enabled`` can be flipped at any time from any thread. While it is
+    off, span() hands back a shared no-op context and record() and count()
+    return at once, so the instrumented code costs one attribute check.
+    """
+
+    def __init__(self, enabled=False, trace_events=50000):
+        self.enabled = enabled
+        self.trace_events = trace_events
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+            self._samples = {}
+            self._stages = {}  # names tuple -> flat list of marks, len(names) + 1 per call
+            self._trace = deque(maxlen=self.trace_events)
+            self.origin = time.perf_counter()
+            self.started_at = time.time()
+
+    def span(self, name):
+        """Context manager timing its block as ``name``"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, seconds, end=None):
+        """Add one ``seconds``-long span of ``name`` that ended at ``end`` (perf_counter; default now)"""
+        if not self.enabled:
+            return
+        if end is None:
+            end = time.perf_counter()
+        # acquire()/release() cost half of a with block, which shows at camera frame rates
+        lock = self._lock
+        lock.acquire()
+        try:
+            self._trace.append((name, threading.get_ident(), end - seconds, seconds))
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = []
+            samples.append(seconds)
+            if len(samples) >= FOLD_SAMPLES:
+                self._fold(name)
+        finally:
+            lock.release()
+
+    def record_stages(self, names, marks):
+        """Add consecutive spans: ``names[i]`` runs from ``marks[i]`` to ``marks[i + 1]``
+
+        ``marks`` holds non-decreasing perf_counter times, one more than
+        ``names``. A SKIPPED (NaN) mark skips its stage, and the next stage
+        starts at the last mark that was set. The whole tuple is stored as
+        one entry, so a frame's stages cost one lock and two appends.
+        """
+        if not self.enabled:
+            return
+        lock = self._lock
+        lock.acquire()
+        try:
+            self._trace.append((names, threading.get_ident(), marks, None))
+            batch = self._stages.get(names)
+            if batch is None:
+                batch = self._stages[names] = []
+            batch.extend(marks)
+            if len(batch) >= FOLD_SAMPLES * (len(names) + 1):
+                self._fold_stages(names)
+        finally:
+            lock.release()
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def _fold(self, name):
+        self._histogram(name).add(self._samples.pop(name))
+
+    def _fold_stages(self, names):
+        import numpy as np
+
+        # Marks only increase, so the running fmax of the marks so far
+        # (which skips NaNs) is where each stage started
+        marks = np.array(self._stages.pop(names), dtype=float).reshape(-1, len(names) + 1)
+        durations = marks[:, 1:] - np.fmax.accumulate(marks[:, :-1], axis=1)
+        for index, name in enumerate(names):
+            seconds = durations[:, index]
+            seconds = seconds[~np.isnan(seconds)]
+            if seconds.size:
+                self._histogram(name).add(seconds)
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """Histogram summaries and counters, for the diagnostics view"""
+        with self._lock:
+            for name in list(self._samples):
+                self._fold(name)
+            for names in list(self._stages):
+                self._fold_stages(names)
+            return {
+                "enabled": self.enabled,
+                "seconds": time.perf_counter() - self.origin,
+                "spans": {name: histogram.summary() for name, histogram in sorted(self.histograms.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def chrome_trace(self):
+        """The trace buffer, counters and summaries as a Chrome trace-event document"""
+        snapshot = self.snapshot()
+        pid = os.getpid()
+        with self._lock:
+            entries = list(self._trace)
+            origin = self.origin
+        trace = []
+        for name, thread, start, seconds in entries:
+            if seconds is None:  # one record_stages() call
+                trace.extend((stage, thread, stage_start, stage_seconds)
+                             for stage, stage_start, stage_seconds in stage_spans(name, start))
+            else:
+                trace.append((name, thread, start, seconds))
+        # Threads are named as they are now; ones that have exited keep their id
+        threads = {thread.ident: thread.name for thread in threading.enumerate()}
+        threads.update((tid, f"Thread {tid}") for _, tid, _, _ in trace if tid not in threads)
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "WorkWise"}}]
+        for thread, name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread, "args": {"name": name}})
+        for name, thread, start, seconds in trace:
+            events.append({
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": round((start - origin) * 1e6, 1),
+                "dur": round(seconds * 1e6, 1),
+                "pid": pid,
+                "tid": thread,
+            })
+        end = round(snapshot["seconds"] * 1e6, 1)
+        for name, value in snapshot["counters"].items():
+            events.append({"name": name, "ph": "C", "ts": end, "pid": pid, "args": {"value": value}})
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"started_at": self.started_at, "summary": snapshot},
+        }
+
+    def export_chrome_trace(self, path):
+        """Write chrome_trace() to ``path``; returns the number of spans written"""
+        document = self.chrome_trace()
+        with open(path, "w") as f:
+            json.dump(document, f)
+        return sum(1 for event in document["traceEvents"] if event["ph"] == "X")
+
+
+def format_summary(snapshot):
+    """Plain-text table of a snapshot() for the diagnostics view and benchmarks"""
+    if not snapshot["spans"] and not snapshot["counters"]:
+        state = "on" if snapshot["enabled"] else "off"
+        return f"Recording is {state}; nothing recorded yet.\n"
+    seconds = max(snapshot["seconds"], 1e-9)
+    lines = [f"{'span':22s} {'count':>8s} {'avg ms':>8s} {'p50':>8s} {'p95':>8s} "
+             f"{'p99':>8s} {'max':>8s} {'% time':>7s}"]
+    for name, stats in snapshot["spans"].items():
+        lines.append(f"{name:22s} {stats['count']:8d} {stats['avg_ms']:8.2f} {stats['p50_ms']:8.2f} "
+                     f"{stats['p95_ms']:8.2f} {stats['p99_ms']:8.2f} {stats['max_ms']:8.2f} "
+                     f"{stats['total_ms'] / 10 / seconds:6.2f}%")
+    if snapshot["counters"]:
+        lines.append("")
+        for name, value in snapshot["counters"].items():
+            lines.append(f"{name:22s} {value:8d} ({value / seconds:.1f}/s)")
+    lines.append("")
+    lines.append(f"Recorded over {seconds:.0f} s; % time is the share of wall time spent in each span")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,221 @@
+import contextlib
+import json
+import os
+import queue
+import threading
+import time
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".ndjson"
+
+_FLUSH = object()  # queue timeout: sync whatever is pending
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Compact:
+    """Writer command: start a fresh segment with ``record`` and drop older ones"""
+
+    def __init__(self, record):
+        self.record = record
+
+
+class SessionJournal:
+    """Append-only, newline-delimited JSON journal of session events
+
+    write() only puts the record on a queue, so Tk callbacks never wait on
+    the disk. A writer thread serializes records into the current segment
+    file and fsyncs in batches (every ``batch_size`` records or
+    ``flush_interval`` seconds, whichever comes first), so a crash loses at
+    most one batch.
+
+    When a segment grows past ``segment_bytes``, or past twice the last
+    snapshot once snapshots outgrow that, the writer moves on to a new one
+    and sets ``compaction_due``. The owner then calls compact() with a
+    snapshot of the live session. The snapshot starts a fresh segment and
+    every older segment is deleted, so the journal stays a bounded size
+    however long the session runs. Scaling the limit with the snapshot keeps
+    a session with many intervals from compacting on every other tick, so
+    the bytes rewritten by compaction stay proportional to those appended. Starting a new session compacts the same
+    way, with its "start" record as the snapshot.
+
+    With an Instrumentation, the writer times each fsync as "journal.sync"
+    and each compaction as "journal.compact".
+
+    Record types: "start" and "snapshot" open a session's replayable tail,
+    "sample" is one window tick, "phase" is a focus-phase change, and
+    "stop" marks a clean end. recover() returns the tail of a session that
+    never reached "stop".
+    """
+
+    def __init__(self, directory, segment_bytes=1 << 20, flush_interval=1.0, batch_size=64,
+                 instrumentation=None):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.instrumentation = instrumentation
+        self.compaction_due = False
+        self.records_written = 0
+        self.fsyncs = 0
+        self.compactions = 0
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._segment_index = 0
+        self._snapshot_bytes = 0  # size of the snapshot that opened the current segment
+        self._thread = None
+
+    # Owner (Tk thread) side
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        segments = list_segments(self.directory)
+        self._segment_index = segments[-1][0] if segments else 0
+        self._thread = threading.Thread(target=self._run, name="SessionJournal", daemon=True)
+        self._thread.start()
+
+    def write(self, record):
+        self._queue.put(record)
+
+    def compact(self, record):
+        """Start a new segment beginning with ``record`` and delete older segments"""
+        self.compaction_due = False
+        self._queue.put(_Compact(record))
+
+    def close(self, timeout=2.0):
+        """Flush everything queued so far and stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    @staticmethod
+    def recover(directory):
+        """Return the records of an interrupted session, or None if the last one ended cleanly"""
+        records = []
+        for _, path in list_segments(directory):
+            records.extend(read_segment(path))
+        tail_start = None
+        for index, record in enumerate(records):
+            kind = record.get("type")
+            if kind in ("start", "snapshot"):
+                tail_start = index
+            elif kind == "stop":
+                tail_start = None
+        if tail_start is None:
+            return None
+        return records[tail_start:]
+
+    # Writer thread side
+
+    def _run(self):
+        pending = 0
+        last_sync = time.monotonic()
+        while True:
+            try:
+                if pending:
+                    wait = self.flush_interval - (time.monotonic() - last_sync)
+                    item = self._queue.get(timeout=max(0.0, wait))
+                else:
+                    item = self._queue.get()
+            except queue.Empty:
+                item = _FLUSH
+            try:
+                if item is None:
+                    self._sync()
+                    self._close_segment()
+                    return
+                if isinstance(item, _Compact):
+                    with self._span("journal.compact"):
+                        self._compact(item.record)
+                    pending = 0
+                    last_sync = time.monotonic()
+                    continue
+                if item is not _FLUSH:
+                    self._append(item)
+                    pending += 1
+                if pending >= self.batch_size or time.monotonic() - last_sync >= self.flush_interval:
+                    self._sync()
+                    pending = 0
+                    last_sync = time.monotonic()
+                    if self._file is not None and self._file.tell() >= self._segment_limit():
+                        self._close_segment()
+                        self.compaction_due = True
+            except Exception as e:
+                print(f"Error writing session journal: {e}")
+
+    def _segment_limit(self):
+        return max(self.segment_bytes, 2 * self._snapshot_bytes)
+
+    def _append(self, record):
+        if self._file is None:
+            self._open_segment()
+        self._file.write(json.dumps(record, separators=(",", ":")))
+        self._file.write("\n")
+        self.records_written += 1
+
+    def _sync(self):
+        if self._file is not None:
+            with self._span("journal.sync"):
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self.fsyncs += 1
+
+    def _span(self, name):
+        return self.instrumentation.span(name) if self.instrumentation is not None else _NULL_SPAN
+
+    def _open_segment(self):
+        self._segment_index += 1
+        path = segment_path(self.directory, self._segment_index)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _compact(self, record):
+        self._sync()
+        self._close_segment()
+        self._open_segment()
+        current = self._segment_index
+        if record is not None:
+            self._append(record)
+        self._snapshot_bytes = self._file.tell()
+        self._sync()
+        self.compactions += 1
+        for index, path in list_segments(self.directory):
+            if index < current:
+                os.remove(path)
+
+
+def segment_path(directory, index):
+    return os.path.join(directory, f"{SEGMENT_PREFIX}{index:06d}{SEGMENT_SUFFIX}")
+
+
+def list_segments(directory):
+    """Return [(index, path)] for the journal segments in ``directory``, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    segments = []
+    for name in os.listdir(directory):
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+            try:
+                index = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            except ValueError:
+                continue
+            segments.append((index, os.path.join(directory, name)))
+    return sorted(segments)
+
+
+def read_segment(path):
+    """Read the records of one segment, stopping at a torn trailing line"""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+    return records
@@ -1,14 +1,25 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import time
-import win32gui
-import cv2
-import matplotlib.pyplot as plt
-import numpy as np
 import json
 import os
-from PIL import Image, ImageTk
-import winsound
+import threading
+from app_classifier import DEFAULT_UNPRODUCTIVE_APPS
+from engine import BREAK, LONG_BREAK, WORK, TrackerEngine
+from history_store import HistoryStore
+from input_idle import create_idle_source
+from instrumentation import Instrumentation, format_summary
+from journal import SessionJournal
+from presence import PresencePolicy
+from scheduler import Scheduler
+from tracking import SessionTracker
+from vision_loader import VisionLoader
+from window_watcher import create_window_source
+
+try:
+    import winsound
+except ImportError:  # Not available outside Windows
+    winsound = None
 
 class ProductivityApp:
     def __init__(self):
@@ -17,36 +28,69 @@ class ProductivityApp:
         self.root.geometry("800x600")  # Increased size for camera feed
         self.root.configure(bg="#f0f0f0")
         
+        # Timing histograms and a span trace for the diagnostics view; toggled there
+        # at runtime, or on from the start with WORKWISE_INSTRUMENT=1
+        self.instrumentation = Instrumentation(enabled=os.environ.get("WORKWISE_INSTRUMENT") == "1")
+        
         # Load or create app settings
         self.settings_file = "app_settings.json"
         self.load_settings()
         
         # Initialize variables
-        self.timer_running = False
-        self.start_time = 0
-        self.distracted_time = 0
         self.check_interval = 1000  # Check every second
         self.camera_interval = 100  # Camera check interval (ms)
         
-        # Focus mode variables
-        self.focus_mode = False
-        self.work_duration = 25 * 60  # 25 minutes in seconds
-        self.break_duration = 5 * 60  # 5 minutes in seconds
-        self.current_phase = "Work"
-        self.phase_start_time = 0
-        self.phase_time_left = self.work_duration
-        self.consecutive_work_sessions = 0
+        # Every periodic job runs from one coalesced after() wakeup; it backs
+        # off while the window is minimized or the user is away
+        self.scheduler = Scheduler()
+        self.scheduler_job = None
+        self.minimized = False
+        self.user_away = False
         
         # Analytics data
-        self.session_data = []
-        self.unproductive_apps = set()
-        self.app_usage_times = {}
+        self.history = HistoryStore("workwise_history.db", instrumentation=self.instrumentation)
+        self.history.start()
+        self.tracker = SessionTracker(self.unproductive_apps, self.check_interval / 1000, self.history)
+        # Focus-change events where the platform offers them, polling otherwise
+        self.window_sampler = create_window_source(os.environ.get("WORKWISE_WINDOW_TRACE"))
+        
+        # Crash-safe session journal; look for an interrupted session before writing
+        self.journal_dir = "session_journal"
+        self.recovered_session = SessionJournal.recover(self.journal_dir)
+        self.journal = SessionJournal(self.journal_dir, instrumentation=self.instrumentation)
+        self.journal.start()
+        
+        # Presence fuses the camera with input idle time and window switches; recent
+        # input slows the camera down (see "presence" in the settings file)
+        self.input_source = create_idle_source()
+        presence_options = {"away_after": 5, "camera_interval": self.camera_interval / 1000}
+        known = vars(PresencePolicy())
+        for name, value in self.presence_settings.items():
+            if name in known:
+                presence_options[name] = value
+            else:
+                print(f"Error in presence settings: unknown setting {name!r}")
+        presence_policy = PresencePolicy(**presence_options)
+        
+        # Session timing, focus phases and presence live in the engine; this window displays them.
+        # The grace period before "Away" is the policy's away_after.
+        self.engine = TrackerEngine(self.tracker, self.window_sampler, journal=self.journal, listener=self,
+                                    presence_policy=presence_policy, input_source=self.input_source)
         
-        # Face detection setup
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        # Face detection setup; OpenCV and the cascade load in the background on first use
+        self.vision = VisionLoader()
         self.cap = None
-        self.last_face_time = time.time()
-        self.face_grace_period = 5  # seconds before marking as distracted
+        self.camera_worker = None
+        self.preview_display = None
+        
+        # Figures from the last session, kept for the diagnostics view
+        self.camera_pipeline_metrics = None
+        self.session_wakeups_per_minute = None
+        
+        # Analytics chart drawn on a background thread (see render_analytics_chart)
+        self.chart_thread = None
+        self.chart_result = None
+        self.chart_started = 0.0
         
         # Create main frame
         main_frame = ttk.Frame(self.root, padding="10")
@@ -87,6 +131,8 @@ class ProductivityApp:
         self.analytics_button = ttk.Button(button_frame, text="Show Analytics", command=self.show_analytics)
         self.analytics_button.pack(side="left", padx=5)
         
+        ttk.Button(button_frame, text="Diagnostics", command=self.show_diagnostics).pack(side="left", padx=5)
+        
         # App management section
         app_frame = ttk.LabelFrame(left_frame, text="App Management", padding="10")
         app_frame.pack(fill="both", expand=True, pady=10)
@@ -126,10 +172,30 @@ class ProductivityApp:
         self.camera_label = ttk.Label(right_frame, text="Initializing camera...")
         self.camera_label.pack(pady=10)
         
+        # With the preview off the camera worker only runs detection
+        self.show_preview = tk.BooleanVar(value=True)
+        ttk.Checkbutton(right_frame, text="Show camera preview", variable=self.show_preview,
+                        command=self.update_preview_state).pack()
+        
         self.camera_status = ttk.Label(right_frame, text="Face Detection: Not started", foreground="gray")
         self.camera_status.pack(pady=5)
         
+        self.camera_metrics = ttk.Label(right_frame, text="", foreground="gray", font=("Arial", 9))
+        self.camera_metrics.pack(pady=2)
+        
         self.update_app_list()
+        
+        # Warm up the vision stack and camera while the user is configuring apps
+        for widget in (self.start_button, self.focus_button):
+            widget.bind("<Enter>", self.preopen_camera, add="+")
+        for widget in (self.app_entry, self.app_listbox):
+            widget.bind("<FocusIn>", self.preopen_camera, add="+")
+        
+        self.root.bind("<Map>", self.update_idle_state, add="+")
+        self.root.bind("<Unmap>", self.update_idle_state, add="+")
+        
+        if self.recovered_session:
+            self.root.after(100, self.offer_recovery)
     
     def load_settings(self):
         """Load app settings from JSON file"""
@@ -138,13 +204,16 @@ class ProductivityApp:
                 with open(self.settings_file, 'r') as f:
                     settings = json.load(f)
                     self.unproductive_apps = set(settings.get('unproductive_apps', []))
+                    self.presence_settings = settings.get('presence', {})
             else:
                 # Default settings
-                self.unproductive_apps = set(['chrome', 'firefox', 'edge'])
+                self.unproductive_apps = set(DEFAULT_UNPRODUCTIVE_APPS)
+                self.presence_settings = {}
                 self.save_settings()
         except Exception as e:
             print(f"Error loading settings: {e}")
-            self.unproductive_apps = set(['chrome', 'firefox', 'edge'])
+            self.unproductive_apps = set(DEFAULT_UNPRODUCTIVE_APPS)
+            self.presence_settings = {}
 
     def save_settings(self):
         """Save app settings to JSON file"""
@@ -152,72 +221,78 @@ class ProductivityApp:
             settings = {
                 'unproductive_apps': list(self.unproductive_apps)
             }
-            with open(self.settings_file, 'w') as f:
-                json.dump(settings, f, indent=4)
+            if self.presence_settings:
+                settings['presence'] = self.presence_settings
+            with self.instrumentation.span("settings.save"):
+                with open(self.settings_file, 'w') as f:
+                    json.dump(settings, f, indent=4)
         except Exception as e:
             print(f"Error saving settings: {e}")
 
-    def log_app_usage(self, window_title, duration):
-        """Log duration of app usage, excluding WorkWise itself"""
-        if window_title and "workwise" not in window_title:
-            if window_title not in self.app_usage_times:
-                self.app_usage_times[window_title] = 0
-            self.app_usage_times[window_title] += duration
-
-    def save_session_data(self):
-        """Save current window data to session history"""
-        if self.timer_running:
-            try:
-                window = win32gui.GetForegroundWindow()
-                window_title = win32gui.GetWindowText(window).lower()
-                if window_title and "workwise" not in window_title:  # Skip logging WorkWise itself
-                    is_unproductive = any(app in window_title for app in self.unproductive_apps)
-                    
-                    self.session_data.append({
-                        "time": time.time(),
-                        "app": window_title,
-                        "productive": not is_unproductive,
-                        "unproductive": is_unproductive
-                    })
-                    
-                    # Log app usage duration
-                    self.log_app_usage(window_title, self.check_interval / 1000)
-            except Exception as e:
-                print(f"Error saving session data: {e}")
-
+    def session_analytics_text(self):
+        """Format the live session stats from the running aggregates"""
+        analytics = self.tracker.analytics
+        total_time = max(self.engine.elapsed, 1e-9)
+        unproductive_time = analytics.unproductive_time
+        productive_time = total_time - unproductive_time
+        
+        # Format analytics message
+        analytics_msg = "Analytics\n\n"
+        analytics_msg += f"Total Time: {self.format_time(total_time)}\n"
+        analytics_msg += f"Productive Time: {self.format_time(productive_time)} ({productive_time/total_time*100:.1f}%)\n"
+        analytics_msg += f"Unproductive Time: {self.format_time(unproductive_time)} ({unproductive_time/total_time*100:.1f}%)\n\n"
+        
+        analytics_msg += "Most Used Apps:\n"
+        for app, duration in analytics.top_apps(3):
+            analytics_msg += f"- {app}: {self.format_time(duration)}\n"
+        
+        phases = {phase: times for phase, times in analytics.phase_times.items() if phase}
+        if phases:
+            analytics_msg += "\nBy Phase:\n"
+            for phase, (productive, unproductive) in sorted(phases.items()):
+                analytics_msg += (f"- {phase}: {self.format_time(productive)} productive, "
+                                  f"{self.format_time(unproductive)} unproductive\n")
+        return analytics_msg
+    
+    def history_analytics_text(self):
+        """Format the cross-session history stats"""
+        analytics_msg = "\nLast 7 Days:\n"
+        for day, productive, unproductive in self.history.daily_totals(days=7):
+            analytics_msg += (f"- {day}: {self.format_time(productive)} productive, "
+                              f"{self.format_time(unproductive)} unproductive\n")
+        
+        analytics_msg += "\nMost Used Apps (30 days):\n"
+        for app, duration in self.history.top_apps(days=30, limit=5):
+            analytics_msg += f"- {app}: {self.format_time(duration)}\n"
+        
+        by_hour = [row for row in self.history.productive_ratio_by_hour(days=30) if row[2] >= 600]
+        if by_hour:
+            best_hour, best_ratio, _ = max(by_hour, key=lambda row: row[1])
+            analytics_msg += f"\nMost productive hour (30 days): {best_hour:02d}:00 ({best_ratio*100:.0f}%)\n"
+        return analytics_msg
+    
     def show_analytics(self):
-        """Display session analytics"""
-        if not self.session_data:
+        """Display session analytics, refreshing live while the session runs"""
+        if not self.tracker.session_data:
             messagebox.showinfo("Analytics", "Start a session first")
             return
         
         try:
-            # Calculate basic stats
-            total_time = time.time() - self.start_time
-            unproductive_time = sum(1 for entry in self.session_data if entry["unproductive"]) * (self.check_interval / 1000)
-            productive_time = total_time - unproductive_time
-            
-            # Get top apps by usage
-            sorted_apps = sorted(self.app_usage_times.items(), key=lambda x: x[1], reverse=True)
-            top_apps = sorted_apps[:3] if sorted_apps else []
-            
-            # Format analytics message
-            analytics_msg = "Analytics\n\n"
-            analytics_msg += f"Total Time: {self.format_time(total_time)}\n"
-            analytics_msg += f"Productive Time: {self.format_time(productive_time)} ({productive_time/total_time*100:.1f}%)\n"
-            analytics_msg += f"Unproductive Time: {self.format_time(unproductive_time)} ({unproductive_time/total_time*100:.1f}%)\n\n"
-            
-            analytics_msg += "Most Used Apps:\n"
-            for app, duration in top_apps:
-                analytics_msg += f"- {app}: {self.format_time(duration)}\n"
+            # History only changes between sessions, so query it once per dialog
+            with self.instrumentation.span("analytics.history"):
+                history_msg = self.history_analytics_text()
             
             # Show analytics in a custom dialog
             dialog = tk.Toplevel(self.root)
             dialog.title("WorkWise Analytics")
-            dialog.geometry("400x500")
+            dialog.geometry("660x860")
             dialog.transient(self.root)
             dialog.grab_set()
             
+            # Timeline and heatmap; drawn off the Tk thread, shown when ready
+            chart_label = ttk.Label(dialog, text="Drawing chart...", anchor="center")
+            chart_label.pack(padx=10, pady=(10, 0))
+            
             # Add text widget with scrollbar
             text_frame = ttk.Frame(dialog)
             text_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -227,21 +302,167 @@ class ProductivityApp:
             
             text_widget = tk.Text(text_frame, wrap="word", yscrollcommand=scrollbar.set)
             text_widget.pack(fill="both", expand=True)
-            text_widget.insert("1.0", analytics_msg)
-            text_widget.config(state="disabled")
             
             scrollbar.config(command=text_widget.yview)
             
             # Close button
             ttk.Button(dialog, text="Close", command=dialog.destroy).pack(pady=10)
             
+            self.render_analytics_chart(chart_label)
+            self.refresh_analytics(dialog, text_widget, history_msg, chart_label)
+            if self.engine.running:
+                self.schedule("analytics", 1.0,
+                              lambda: self.refresh_analytics(dialog, text_widget, history_msg, chart_label),
+                              idle_interval=5.0, delay=1.0)
+            
         except Exception as e:
             messagebox.showerror("Error", f"Error showing analytics: {e}")
+    
+    def refresh_analytics(self, dialog, text_widget, history_msg, chart_label):
+        """Redraw the analytics text; scheduled every second while the dialog is open"""
+        if not dialog.winfo_exists():
+            self.unschedule("analytics")
+            return
+        scroll_position = text_widget.yview()[0]
+        text_widget.config(state="normal")
+        text_widget.delete("1.0", tk.END)
+        with self.instrumentation.span("analytics.session"):
+            session_msg = self.session_analytics_text()
+        text_widget.insert("1.0", session_msg + history_msg)
+        text_widget.config(state="disabled")
+        text_widget.yview_moveto(scroll_position)
+        # The chart has one bar per minute, so redraw it once a minute at most
+        if self.engine.running and time.monotonic() - self.chart_started >= 60:
+            self.render_analytics_chart(chart_label)
+    
+    def render_analytics_chart(self, chart_label):
+        """Copy the session columns here and bin and draw them on a background thread"""
+        if self.chart_thread is not None and self.chart_thread.is_alive():
+            # Show the drawing already in flight once it lands
+            self.schedule("chart", 0.05, lambda: self.show_chart(chart_label), idle_interval=0.5)
+            return
+        columns = self.tracker.session_data.copy_columns()
+        away_spans = [list(span) for span in self.engine.away_spans]
+        now = self.engine.clock.time() if self.engine.running else self.engine.stop_time
+        self.chart_result = None
+        self.chart_started = time.monotonic()
+        self.chart_thread = threading.Thread(target=self.draw_chart, args=(columns, away_spans, now),
+                                             name="AnalyticsChart", daemon=True)
+        self.chart_thread.start()
+        self.schedule("chart", 0.05, lambda: self.show_chart(chart_label), idle_interval=0.5)
+    
+    def draw_chart(self, columns, away_spans, now):
+        """Runs on the chart thread; show_chart picks up the image or the error"""
+        try:
+            from timeline import SessionTimeline
+            with self.instrumentation.span("analytics.chart"):
+                self.chart_result = SessionTimeline(*columns, away_spans, now).render()
+        except Exception as e:
+            self.chart_result = e
+    
+    def show_chart(self, chart_label):
+        """Put the finished chart in the dialog; polled until the chart thread is done"""
+        result = self.chart_result
+        if not chart_label.winfo_exists():
+            self.unschedule("chart")
+            return
+        if result is None:
+            return
+        self.unschedule("chart")
+        if isinstance(result, Exception):
+            print(f"Error drawing analytics chart: {result}")
+            chart_label.config(text=f"Chart unavailable: {result}")
+            return
+        from PIL import ImageTk
+        chart_label.chart = ImageTk.PhotoImage(result)
+        chart_label.config(image=chart_label.chart, text="")
+
+    def show_diagnostics(self):
+        """Show the hot-path timings and counters, with the runtime switch and trace export"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("WorkWise Diagnostics")
+        dialog.geometry("760x520")
+        dialog.transient(self.root)
+        
+        enabled = tk.BooleanVar(value=self.instrumentation.enabled)
+        text_widget = tk.Text(dialog, wrap="none", font=("Courier", 10))
+        
+        def toggle():
+            self.instrumentation.enabled = enabled.get()
+            self.refresh_diagnostics(dialog, text_widget)
+        
+        def reset():
+            self.instrumentation.reset()
+            self.refresh_diagnostics(dialog, text_widget)
+        
+        ttk.Checkbutton(dialog, text="Record timings", variable=enabled, command=toggle).pack(
+            anchor="w", padx=10, pady=(10, 0))
+        text_widget.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Export Trace...", command=self.export_trace).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Reset", command=reset).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Close", command=dialog.destroy).pack(side="left", padx=5)
+        
+        self.refresh_diagnostics(dialog, text_widget)
+        self.schedule("diagnostics", 1.0, lambda: self.refresh_diagnostics(dialog, text_widget),
+                      idle_interval=5.0, delay=1.0)
+    
+    def refresh_diagnostics(self, dialog, text_widget):
+        """Redraw the timing table; scheduled every second while the dialog is open"""
+        if not dialog.winfo_exists():
+            self.unschedule("diagnostics")
+            return
+        text_widget.config(state="normal")
+        text_widget.delete("1.0", tk.END)
+        text_widget.insert("1.0", format_summary(self.instrumentation.snapshot()) + self.pipeline_diagnostics())
+        text_widget.config(state="disabled")
+    
+    def pipeline_diagnostics(self):
+        """Camera pipeline and scheduler figures, live or from the last session"""
+        lines = [""]
+        if self.engine.running:
+            lines.append(f"Scheduler: {self.scheduler.wakeups_per_minute():.0f} wakeups/min this session")
+        elif self.session_wakeups_per_minute is not None:
+            lines.append(f"Scheduler: {self.session_wakeups_per_minute:.0f} wakeups/min last session")
+        
+        if self.camera_worker is not None:
+            metrics, when = self.camera_worker.get_metrics(), "this session"
+        else:
+            metrics, when = self.camera_pipeline_metrics, "last session"
+        if metrics is not None:
+            lines.append(f"Camera pipeline ({when}): {metrics['frames_processed']} frames processed, "
+                         f"{metrics['frames_dropped']} dropped, {metrics['read_failures']} read failures")
+            for stage, stats in metrics["stages"].items():
+                lines.append(f"  {stage:12s} {stats['avg_ms']:8.2f} ms avg {stats['max_ms']:8.2f} ms max")
+            detector = metrics["detector"]
+            lines.append(f"  detector: {detector['full_scans']} full scans, {detector['roi_scans']} region scans, "
+                         f"{detector['roi_misses']} region misses")
+            gate = metrics["gate"]
+            if gate is not None:
+                lines.append(f"  motion gate: {gate['skipped']} of {gate['frames']} frames skipped, "
+                             f"{gate['motion']} re-checked on motion, {gate['max_age']} on age")
+        return "\n".join(lines) + "\n"
+    
+    def export_trace(self):
+        """Save the recorded spans as a Chrome trace (chrome://tracing or ui.perfetto.dev)"""
+        path = filedialog.asksaveasfilename(title="Export Trace", defaultextension=".json",
+                                            initialfile="workwise-trace.json",
+                                            filetypes=[("Chrome trace", "*.json")])
+        if not path:
+            return
+        try:
+            spans = self.instrumentation.export_chrome_trace(path)
+            messagebox.showinfo("Diagnostics", f"Wrote {spans} spans to {path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error exporting trace: {e}")
 
     def add_app(self, app_name):
         app_name = app_name.lower().strip()
         if app_name and app_name not in self.unproductive_apps:
             self.unproductive_apps.add(app_name)
+            self.tracker.classifier.update(self.unproductive_apps)
             self.save_settings()
             self.update_app_list()
             self.app_entry.delete(0, tk.END)
@@ -253,6 +474,7 @@ class ProductivityApp:
             app_name = self.app_listbox.get(selection[0])
             if app_name in self.unproductive_apps:
                 self.unproductive_apps.remove(app_name)
+                self.tracker.classifier.update(self.unproductive_apps)
                 self.save_settings()
                 self.update_app_list()
                 messagebox.showinfo("", f"Removed '{app_name}' from unproductive apps")
@@ -263,6 +485,7 @@ class ProductivityApp:
         app_name = app_name.lower().strip()
         if app_name in self.unproductive_apps:
             self.unproductive_apps.remove(app_name)
+            self.tracker.classifier.update(self.unproductive_apps)
             self.save_settings()
             self.update_app_list()
             self.app_entry.delete(0, tk.END)
@@ -275,52 +498,74 @@ class ProductivityApp:
         for app in sorted(self.unproductive_apps):
             self.app_listbox.insert(tk.END, app)
     
-    def start_timer(self):
-        """Start timer and initialize session"""
-        if not self.timer_running:
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
-                messagebox.showerror("Error", "Could not open camera.")
+    def offer_recovery(self):
+        """Offer to resume a session that was interrupted before it was stopped"""
+        records = self.recovered_session
+        self.recovered_session = None
+        if messagebox.askyesno("WorkWise", "The last session was interrupted. Resume it?"):
+            if records[0].get("mode") == "focus":
+                self.start_focus_mode(restore=records)
+            else:
+                self.start_timer(restore=records)
+        else:
+            # The session ends where the journal left off. Its open interval (and any
+            # closed ones the history writer had not flushed) only exist in the journal.
+            try:
+                tracker = SessionTracker(self.unproductive_apps, self.check_interval / 1000, self.history)
+                tracker.restore(records)
+                tracker.finish()
+            except Exception as e:
+                print(f"Error saving the interrupted session to history: {e}")
+            self.journal.compact(None)
+    
+    def preopen_camera(self, event=None):
+        """Speculatively load OpenCV and open the camera before Start is pressed"""
+        if not self.engine.running:
+            self.vision.preopen_camera()
+    
+    def acquire_camera(self, retry):
+        """Claim the camera, calling ``retry`` again later if it is still opening"""
+        try:
+            cap = self.vision.take_camera()
+        except Exception as e:
+            self.start_button.state(['!disabled'])
+            self.focus_button.state(['!disabled'])
+            self.status_label.config(text="Not Monitoring", foreground="gray")
+            messagebox.showerror("Error", str(e))
+            return False
+        if cap is None:
+            # Keep the window responsive while OpenCV loads and the camera opens
+            self.start_button.state(['disabled'])
+            self.focus_button.state(['disabled'])
+            self.status_label.config(text="Starting camera...", foreground="gray")
+            self.root.after(50, retry)
+            return False
+        self.cap = cap
+        return True
+    
+    def start_timer(self, restore=None):
+        """Start timer and initialize session, or resume a journaled one"""
+        if not self.engine.running:
+            if not self.acquire_camera(lambda: self.start_timer(restore)):
                 return
             
-            # Reset session data
-            self.session_data = []
-            self.app_usage_times = {}
-            self.start_time = time.time()
-            self.last_face_time = time.time()
-            self.distracted_time = 0
-            self.timer_running = True
+            self.engine.start(restore=restore)
             
             # Update UI
             self.start_button.state(['disabled'])
             self.stop_button.state(['!disabled'])
             
             # Start monitoring
-            self.update_camera()
-            self.update_timer()
-            self.check_active_window()
-            self.save_session_data()  # Start logging session data
+            self.start_camera_worker()
+            self.schedule_session_tasks()
 
-    def start_focus_mode(self):
+    def start_focus_mode(self, restore=None):
         """Start Pomodoro focus mode with work/break intervals"""
-        if not self.timer_running:
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
-                messagebox.showerror("Error", "Could not open camera")
+        if not self.engine.running:
+            if not self.acquire_camera(lambda: self.start_focus_mode(restore)):
                 return
             
-            # Initialize focus mode
-            self.focus_mode = True
-            self.timer_running = True
-            self.start_time = time.time()
-            self.phase_start_time = time.time()
-            self.phase_time_left = self.work_duration
-            self.current_phase = "Work"
-            self.distracted_time = 0
-            self.consecutive_work_sessions = 0
-            self.last_face_time = time.time()
-            self.session_data = []
-            self.app_usage_times = {}
+            self.engine.start(focus=True, restore=restore)
             
             # Update UI
             self.start_button.state(['disabled'])
@@ -329,166 +574,237 @@ class ProductivityApp:
             self.camera_label.config(text="Starting camera...")
             
             # Start monitoring - Important: Start camera update before showing dialog
-            self.update_camera()
-            self.check_active_window()
-            self.update_focus_timer()
-            self.save_session_data()
+            self.start_camera_worker()
+            self.schedule_session_tasks()
             
             # Play sound and show message
-            winsound.Beep(800, 500)
-            messagebox.showinfo("Focus Mode", "Work session started - Focus for 25 minutes")
+            self.beep(800, 500)
+            if restore:
+                messagebox.showinfo("Focus Mode", f"{self.engine.current_phase} resumed - "
+                                    f"{self.format_time(self.engine.phase_time_left)} left")
+            else:
+                minutes = self.engine.phase_durations[WORK] // 60
+                messagebox.showinfo("Focus Mode", f"Work session started - Focus for {minutes} minutes")
 
+    def schedule(self, name, interval, callback, idle_interval=None, delay=0.0):
+        """Add a periodic job to the scheduler (intervals in seconds)"""
+        self.scheduler.add(name, interval, callback, idle_interval, delay)
+        self.wake_scheduler()
+    
+    def unschedule(self, name):
+        self.scheduler.remove(name)
+        self.wake_scheduler()
+    
+    def schedule_session_tasks(self):
+        self.scheduler.reset_stats()
+        self.schedule("camera", self.camera_interval / 1000, self.update_camera, idle_interval=0.5)
+        self.schedule("timer", 1.0, self.update_timer, idle_interval=5.0)
+        self.schedule("window", self.check_interval / 1000, self.check_active_window, idle_interval=2.0)
+    
+    def wake_scheduler(self):
+        """Arm the single after() wakeup for the next due job"""
+        if self.scheduler_job is not None:
+            self.root.after_cancel(self.scheduler_job)
+            self.scheduler_job = None
+        delay = self.scheduler.next_delay()
+        if delay is not None:
+            self.scheduler_job = self.root.after(int(delay * 1000), self.run_scheduler)
+    
+    def run_scheduler(self):
+        self.scheduler_job = None
+        self.instrumentation.count("scheduler.wakeups")
+        self.scheduler.run_due()
+        self.wake_scheduler()
+    
+    def update_idle_state(self, event=None):
+        """Back the scheduler off while the window is minimized or the user is away"""
+        if event is not None:
+            if event.widget is not self.root:
+                return
+            self.minimized = self.root.state() == "iconic"
+            self.update_preview_state()
+        if self.scheduler.set_idle(self.minimized or self.user_away):
+            self.wake_scheduler()
+    
+    def update_preview_state(self):
+        """Skip all preview work while it is switched off or nobody can see it"""
+        if self.camera_worker is not None:
+            self.camera_worker.preview_enabled = self.show_preview.get() and not self.minimized
+        if not self.show_preview.get():
+            if self.preview_display is not None:
+                self.preview_display.hide("Preview off")
+            else:
+                self.camera_label.config(text="Preview off")
+    
     def update_timer(self):
-        if self.timer_running:
-            current_time = time.time()
-            total_time = current_time - self.start_time
-            productive_time = max(0, total_time - self.distracted_time)  # Ensure no negative time
-            
+        """Advance the focus phase and refresh the timer display"""
+        engine = self.engine
+        if not engine.running:
+            return
+        engine.update_timer()
+        
+        if not engine.focus_mode:
             self.time_label.config(
-                text=f"Productive: {self.format_time(productive_time)}\n"
-                     f"Distracted: {self.format_time(self.distracted_time)}"
+                text=f"Productive: {self.format_time(engine.productive_time)}\n"
+                     f"Distracted: {self.format_time(engine.distracted_time)}"
+            )
+        elif engine.current_phase == WORK:
+            self.time_label.config(
+                text=f"Work Phase: {self.format_time(engine.phase_time_left)}\n"
+                     f"Productive: {self.format_time(engine.productive_time)}\n"
+                     f"Distracted: {self.format_time(engine.distracted_time)}"
+            )
+        else:
+            self.time_label.config(
+                text=f"{engine.current_phase} Time: {self.format_time(engine.phase_time_left)}\n"
+                     f"Sessions Completed: {engine.consecutive_work_sessions}"
             )
-            self.root.after(1000, self.update_timer)
-    
-    def update_focus_timer(self):
-        """Update timer for focus mode"""
-        if self.timer_running and self.focus_mode:
-            current_time = time.time()
-            elapsed = current_time - self.phase_start_time
-            self.phase_time_left = (self.work_duration if self.current_phase == "Work" 
-                                  else self.break_duration) - elapsed
-            
-            # Check if current phase is complete
-            if self.phase_time_left <= 0:
-                if self.current_phase == "Work":
-                    self.consecutive_work_sessions += 1
-                    if self.consecutive_work_sessions == 4:  # After 4 work sessions
-                        self.current_phase = "Long Break"
-                        self.phase_time_left = 15 * 60  # 15 minute break
-                        winsound.Beep(1000, 800)
-                        messagebox.showinfo("Long Break", 
-                            "Great job! Take a 15-minute break")
-                        self.consecutive_work_sessions = 0
-                    else:
-                        self.current_phase = "Break"
-                        self.phase_time_left = self.break_duration
-                        winsound.Beep(600, 500)
-                        messagebox.showinfo("Break Time", 
-                            "Good work! Take a 5-minute break")
-                else:
-                    self.current_phase = "Work"
-                    self.phase_time_left = self.work_duration
-                    winsound.Beep(800, 500)
-                    messagebox.showinfo("Work Time", 
-                        "Break over - Focus for 25 minutes")
-                
-                self.phase_start_time = time.time()
-            
-            # Update display
-            if self.current_phase == "Work":
-                productive_time = max(0, total_time - self.distracted_time)
-                self.time_label.config(
-                    text=f"Work Phase: {self.format_time(self.phase_time_left)}\n"
-                         f"Productive: {self.format_time(productive_time)}\n"
-                         f"Distracted: {self.format_time(self.distracted_time)}"
-                )
-            else:
-                self.time_label.config(
-                    text=f"{self.current_phase} Time: {self.format_time(self.phase_time_left)}\n"
-                         f"Sessions Completed: {self.consecutive_work_sessions}"
-                )
-            
-            self.root.after(1000, self.update_focus_timer)
+
+    def on_phase_change(self, phase, completed_sessions):
+        """Announce the focus phase the engine just switched to"""
+        # The dialogs open from the idle queue so the scheduler keeps running behind them
+        minutes = self.engine.phase_durations[phase] // 60
+        if phase == LONG_BREAK:
+            self.beep(1000, 800)
+            self.root.after_idle(messagebox.showinfo, "Long Break", f"Great job! Take a {minutes}-minute break")
+        elif phase == BREAK:
+            self.beep(600, 500)
+            self.root.after_idle(messagebox.showinfo, "Break Time", f"Good work! Take a {minutes}-minute break")
+        else:
+            self.beep(800, 500)
+            self.root.after_idle(messagebox.showinfo, "Work Time", f"Break over - Focus for {minutes} minutes")
 
     def check_active_window(self):
-        """Monitor active window and update session data"""
-        if self.timer_running:
+        """Sample the active window once and update session data"""
+        if self.engine.running:
             try:
-                window = win32gui.GetForegroundWindow()
-                window_title = win32gui.GetWindowText(window).lower()
-                
-                is_unproductive = any(app in window_title for app in self.unproductive_apps)
-                
-                if is_unproductive:
-                    self.distracted_time += self.check_interval / 1000
-                    self.status_label.config(text=f"Unproductive - {window_title}", foreground="red")
-                    if self.focus_mode and self.current_phase == "Work":
-                        winsound.Beep(300, 200)  # Warning beep
-                else:
-                    self.status_label.config(text=f"Productive - {window_title}", foreground="green")
-                
-                self.save_session_data()
-                self.root.after(self.check_interval, self.check_active_window)
-                
+                with self.instrumentation.span("window.check"):
+                    self.engine.poll_window()
             except Exception as e:
                 print(f"Error checking window: {e}")
-                self.root.after(self.check_interval, self.check_active_window)
+    
+    def on_window(self, sample, is_unproductive):
+        if is_unproductive:
+            self.status_label.config(text=f"Unproductive - {sample.title}", foreground="red")
+        else:
+            self.status_label.config(text=f"Productive - {sample.title}", foreground="green")
+    
+    def on_presence(self, state):
+        self.user_away = state == "away"
+        self.update_idle_state()
+        if state == "present":
+            self.camera_status.config(text="Face Detection: Present", foreground="green")
+        elif state == "break":
+            self.camera_status.config(text="On Break", foreground="blue")
+        else:
+            self.camera_status.config(text="Face Detection: Away!", foreground="red")
+    
+    def on_warning(self, reason):
+        self.beep(300, 200)  # Warning beep
+    
+    def on_camera_interval(self, interval):
+        """Follow the presence policy's camera rate; None pauses capture while input shows the user is here"""
+        if self.camera_worker is None:
+            return
+        self.camera_worker.set_interval(interval)
+        if "camera" in self.scheduler.tasks:
+            poll = max(interval or 1.0, self.camera_interval / 1000)
+            self.schedule("camera", poll, self.update_camera, idle_interval=max(poll, 0.5))
+        if interval is None:
+            self.camera_status.config(text="Camera paused: keyboard/mouse active", foreground="green")
+    
+    def start_camera_worker(self):
+        """Hand the open camera to a background capture/detection thread"""
+        from camera_worker import CameraWorker
+        from face_detector import FaceDetector, MotionGate
+        
+        # Still frames reuse the last detection; re-check within the grace period
+        self.camera_worker = CameraWorker(
+            self.cap,
+            FaceDetector(self.vision.face_cascade),
+            interval=self.engine.camera_interval,
+            gate=MotionGate(max_age=self.engine.face_grace_period / 2),
+            instrumentation=self.instrumentation
+        )
+        self.update_preview_state()
+        self.camera_worker.start()
     
     def update_camera(self):
-        """Update camera feed and face detection"""
-        if self.timer_running and self.cap is not None:
+        """Show the latest frame and presence state from the camera worker"""
+        if self.engine.running and self.camera_worker is not None:
             try:
-                ret, frame = self.cap.read()
-                if ret:
-                    # Convert frame to grayscale for face detection
-                    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    
-                    # Detect faces with optimized parameters
-                    faces = self.face_cascade.detectMultiScale(
-                        gray,
-                        scaleFactor=1.2,
-                        minNeighbors=6,
-                        minSize=(50, 50),
-                        maxSize=(300, 300)
-                    )
-                    
-                    # Draw rectangles around faces
-                    for (x, y, w, h) in faces:
-                        cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
-                    
+                if self.camera_worker.error is not None:
+                    raise self.camera_worker.error
+                
+                result = self.camera_worker.results.get_latest()
+                if result is not None:
                     # Update face detection status
-                    current_time = time.time()
-                    if len(faces) > 0:
-                        self.last_face_time = current_time
-                        self.camera_status.config(text="Face Detection: Present", foreground="green")
-                        if self.focus_mode and self.current_phase == "Break":
-                            self.camera_status.config(text="On Break", foreground="blue")
-                    else:
-                        time_without_face = current_time - self.last_face_time
-                        if time_without_face > 5:  # 5 seconds threshold
-                            self.camera_status.config(text="Face Detection: Away!", foreground="red")
-                            if self.focus_mode and self.current_phase == "Work":
-                                winsound.Beep(300, 200)  # Warning beep
+                    with self.instrumentation.span("camera.presence"):
+                        self.engine.handle_faces(result.timestamp, result.faces)
                     
-                    # Convert frame for display
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    frame = cv2.resize(frame, (320, 240))  # Maintain consistent size
-                    img = Image.fromarray(frame)
-                    imgtk = ImageTk.PhotoImage(image=img)
-                    self.camera_label.imgtk = imgtk
-                    self.camera_label.config(image=imgtk, text="")
-                
-                # Schedule next update before any potential delays
-                self.root.after(self.camera_interval, self.update_camera)
+                    # The worker only renders previews while one is shown (not minimized or off)
+                    frame = self.camera_worker.preview.take()
+                    if frame is not None and self.show_preview.get():
+                        display_start = time.perf_counter()
+                        if self.preview_display is None:
+                            from preview import PreviewDisplay
+                            self.preview_display = PreviewDisplay(self.camera_label,
+                                                                  self.camera_worker.preview.size)
+                        self.preview_display.show(frame)
+                        self.camera_worker.metrics.record("display", time.perf_counter() - display_start)
+                    
+                    if not self.minimized:
+                        self.update_camera_metrics()
             except Exception as e:
                 print(f"Camera error: {e}")
                 self.camera_status.config(text=f"Camera Error: {str(e)}", foreground="red")
-                self.root.after(self.camera_interval, self.update_camera)
+    
+    def update_camera_metrics(self):
+        """Show detection latency and frame counters under the camera feed"""
+        metrics = self.camera_worker.get_metrics()
+        detect = metrics["stages"].get("detect", {})
+        gate = metrics["gate"]
+        skipped = f", {gate['skipped']} still" if gate is not None else ""
+        self.camera_metrics.config(
+            text=f"Detect: {detect.get('avg_ms', 0):.1f} ms avg, {detect.get('max_ms', 0):.1f} ms max | "
+                 f"Frames: {metrics['frames_processed']} processed, {metrics['frames_dropped']} dropped"
+                 f"{skipped}"
+        )
+    
+    def stop_camera_worker(self):
+        """Stop the capture thread, keeping its pipeline metrics for the diagnostics view"""
+        if self.camera_worker is not None:
+            self.camera_worker.stop()
+            self.camera_pipeline_metrics = self.camera_worker.get_metrics()
+            self.camera_worker = None
     
     def stop_timer(self):
         """Stop timer and clean up"""
-        self.timer_running = False
-        self.focus_mode = False
+        self.engine.stop()
         self.start_button.state(['!disabled'])
         self.focus_button.state(['!disabled'])
         self.stop_button.state(['disabled'])
         self.status_label.config(text="Not Monitoring", foreground="gray")
         self.camera_status.config(text="Face Detection: Stopped", foreground="gray")
+        self.session_wakeups_per_minute = self.scheduler.wakeups_per_minute()
+        for name in ("camera", "timer", "window", "analytics"):
+            self.scheduler.remove(name)
+        self.wake_scheduler()
+        self.user_away = False
+        self.update_idle_state()
         
+        self.stop_camera_worker()
         if self.cap is not None:
             self.cap.release()
             self.cap = None
     
+    def beep(self, frequency, duration):
+        """Play a tone, falling back to the Tk bell where winsound is unavailable"""
+        if winsound is not None:
+            winsound.Beep(frequency, duration)
+        else:
+            self.root.bell()
+    
     def format_time(self, seconds):
         total_minutes = int(seconds) // 60
         hours = total_minutes // 60
@@ -498,6 +814,12 @@ class ProductivityApp:
     
     def run(self):
         self.root.mainloop()
+        # A session still running here resumes on the next launch
+        self.journal.close()
+        self.history.close()
+        self.window_sampler.close()
+        self.input_source.close()
+        self.vision.release_idle_camera()
 
 if __name__ == "__main__":
     app = ProductivityApp()
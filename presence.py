@@ -0,0 +1,152 @@
+PRESENT = "present"
+AWAY = "away"
+
+# Idle times are read against a different clock than the engine's; readings
+# this close to the last input time are the same input
+INPUT_RESOLUTION = 0.25
+
+
+class PresencePolicy:
+    """How PresenceFusion weighs its signals; all times are in seconds
+
+    away_after: with no face, input or window activity for this long, a
+        camera check that sees nobody marks the user away (the face grace
+        period)
+    return_window: hysteresis on the way back; an absence ends on a second
+        face hit within this long of the first, so a lone spurious hit on an
+        empty chair does not end it. 0 ends it on the first hit. Keyboard
+        or mouse input ends it at once. A window change never does (a
+        playlist or a notification changes titles with nobody there); it
+        only holds off the away verdict while the user is present.
+    use_input / use_window: whether input-idle time and foreground-window
+        changes count as evidence of presence
+    input_confirms: input this recent confirms presence on its own, so the
+        camera drops to ``confirmed_camera_interval``. With input_confirms
+        plus camera_warmup no longer than away_after, the camera is back at
+        full rate before anyone can be marked away.
+    camera_interval: seconds between camera frames otherwise
+    confirmed_camera_interval: seconds between frames while input confirms
+        presence; None stops the camera until input goes quiet
+    camera_warmup: a stopped camera must run this long again before it
+        can mark anyone away
+    """
+
+    def __init__(self, away_after=5.0, return_window=1.0, use_input=True, use_window=True,
+                 input_confirms=3.0, camera_interval=0.1, confirmed_camera_interval=1.0,
+                 camera_warmup=1.0):
+        self.away_after = away_after
+        self.return_window = return_window
+        self.use_input = use_input
+        self.use_window = use_window
+        self.input_confirms = input_confirms
+        self.camera_interval = camera_interval
+        self.confirmed_camera_interval = confirmed_camera_interval
+        self.camera_warmup = camera_warmup
+
+    @classmethod
+    def camera_only(cls, away_after=5.0, camera_interval=0.1):
+        """The original rule: a face hit means present, ``away_after`` without one means away"""
+        return cls(away_after, return_window=0, use_input=False, use_window=False,
+                   camera_interval=camera_interval, confirmed_camera_interval=camera_interval)
+
+
+class PresenceFusion:
+    """Decides present/away from camera, input-idle and window signals
+
+    Every signal that shows the user is there (a detected face, keyboard or
+    mouse input, a foreground window change) is evidence, and the latest
+    one is kept. The user goes away only when a camera check finds nobody
+    and there has been no evidence for ``away_after`` seconds. Absences
+    end as described by the policy's ``return_window``.
+
+    Since input proves presence far more cheaply than a Haar cascade,
+    camera_interval_at() asks for fewer camera frames (or none) while input
+    is recent. away_since and returned_at estimate when the user actually
+    left and came back, for the session's absence records.
+    """
+
+    def __init__(self, policy=None):
+        self.policy = policy or PresencePolicy()
+        self.reset(0.0)
+
+    def reset(self, now):
+        self.state = PRESENT
+        self.last_evidence = now
+        self.last_input = None
+        self.away_since = None
+        self.returned_at = None
+        self.first_miss = None
+        self.miss_interval = None
+        self.camera_interval = self.policy.camera_interval
+        self.camera_on_since = now
+        self._last_hit = None
+        self.stats = {"face": 0, "input": 0, "window": 0, "camera_changes": 0}
+
+    def observe_face(self, timestamp, seen):
+        """A camera result: ``seen`` is whether a face was found"""
+        policy = self.policy
+        if seen:
+            self._evidence(timestamp, "face")
+            return
+        if self.first_miss is None:
+            self.first_miss = timestamp
+            self.miss_interval = self.camera_interval or policy.camera_interval
+        if (self.state == PRESENT and timestamp - self.last_evidence > policy.away_after
+                and self.camera_on_since is not None
+                and timestamp - self.camera_on_since >= policy.camera_warmup):
+            self.state = AWAY
+            # The user left between the last frame that saw them and the first
+            # that did not: the frame before at full rate, halfway for a slowed
+            # camera, and never before a stopped camera's restart
+            gap = max(policy.camera_interval, self.miss_interval / 2)
+            self.away_since = max(self.last_evidence, self.first_miss - gap)
+            self._last_hit = None
+
+    def observe_input(self, last_input_time):
+        """The time of the latest keyboard or mouse input, from an idle source"""
+        if last_input_time is None:
+            return
+        if self.last_input is not None and last_input_time <= self.last_input + INPUT_RESOLUTION:
+            return
+        self.last_input = last_input_time
+        if self.policy.use_input:
+            self._evidence(last_input_time, "input")
+
+    def observe_window(self, timestamp):
+        """The foreground window or its title changed"""
+        if self.policy.use_window:
+            self._evidence(timestamp, "window")
+
+    def _evidence(self, timestamp, source):
+        self.stats[source] += 1
+        if timestamp > self.last_evidence:
+            self.last_evidence = timestamp
+        self.first_miss = None
+        if self.state != AWAY or source == "window":
+            return
+        if source == "input" or self.policy.return_window <= 0:
+            self._return(timestamp)
+        elif self._last_hit is not None and timestamp - self._last_hit <= self.policy.return_window:
+            self._return(self._last_hit)
+        else:
+            self._last_hit = timestamp
+
+    def _return(self, timestamp):
+        self.state = PRESENT
+        self.returned_at = timestamp
+        self._last_hit = None
+
+    def camera_interval_at(self, now):
+        """Seconds between camera frames the policy wants now; None means stopped"""
+        policy = self.policy
+        confirmed = (policy.use_input and self.state == PRESENT and self.last_input is not None
+                     and now - self.last_input <= policy.input_confirms)
+        interval = policy.confirmed_camera_interval if confirmed else policy.camera_interval
+        if interval != self.camera_interval:
+            if self.camera_interval is None:
+                self.camera_on_since = now
+            elif interval is None:
+                self.camera_on_since = None
+            self.camera_interval = interval
+            self.stats["camera_changes"] += 1
+        return interval
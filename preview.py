@@ -0,0 +1,40 @@
+from PIL import Image, ImageTk
+
+
+def _block_image(mode, size):
+    """A PIL image stored as one block, which PhotoImage.paste() copies without converting"""
+    try:
+        return Image.Image()._new(Image.core.new_block(mode, size))
+    except AttributeError:
+        return Image.new(mode, size)
+
+
+class PreviewDisplay:
+    """Shows camera preview frames in a label through one persistent PhotoImage
+
+    Building a PIL Image and a new ImageTk.PhotoImage for every frame
+    allocates the pixels twice and a Tk image each tick. Here the RGBA frame
+    from PreviewBuffers is decoded into a preallocated PIL image and pasted
+    into the same PhotoImage, which Tk redraws in place.
+    """
+
+    def __init__(self, label, size):
+        self.label = label
+        self.size = size
+        self.image = _block_image("RGBA", size)
+        self.photo = ImageTk.PhotoImage("RGBA", size)
+        self.visible = False
+        self.frames_shown = 0
+
+    def show(self, frame):
+        """Display an RGBA frame of ``size`` (any buffer, e.g. a NumPy array)"""
+        self.image.frombytes(frame)
+        self.photo.paste(self.image)
+        if not self.visible:
+            self.label.config(image=self.photo, text="")
+            self.visible = True
+        self.frames_shown += 1
+
+    def hide(self, text=""):
+        self.label.config(image="", text=text)
+        self.visible = False
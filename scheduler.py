@@ -0,0 +1,114 @@
+import time
+
+
+class ScheduledTask:
+    """One periodic job in a Scheduler"""
+
+    def __init__(self, name, interval, callback, idle_interval=None):
+        self.name = name
+        self.interval = interval
+        self.idle_interval = idle_interval if idle_interval is not None else interval
+        self.callback = callback
+        self.next_due = 0.0
+        self.last_run = None
+        self.runs = 0
+
+    def period(self, idle):
+        return self.idle_interval if idle else self.interval
+
+
+class Scheduler:
+    """Runs every periodic job from a single coalesced wakeup
+
+    Replaces one self-rescheduling ``after()`` loop per job. run_due() runs
+    every task due within ``slack`` seconds of now in one pass and returns
+    the delay until the next one, so jobs with related intervals (the 100 ms
+    camera and the 1 s window check) share wakeups instead of drifting
+    apart. Due times advance by whole periods from when a task was due, not
+    from when it happened to run, so a late callback does not push the rest
+    of the schedule back; a task that falls more than a period behind skips
+    the missed runs instead of firing a burst to catch up.
+
+    Times come from ``clock`` (time.monotonic by default), so wall-clock
+    adjustments do not stall or rush the schedule. With set_idle(True)
+    each task runs at its ``idle_interval`` instead, e.g. while the window
+    is minimized or the user is away.
+    """
+
+    def __init__(self, clock=time.monotonic, slack=0.05):
+        self.clock = clock
+        self.slack = slack  # run tasks due this soon in the same wakeup
+        self.tasks = {}
+        self.idle = False
+        self.wakeups = 0
+        self.started_at = clock()
+        self._next_due = None
+
+    def add(self, name, interval, callback, idle_interval=None, delay=0.0):
+        """Schedule ``callback`` every ``interval`` seconds, first run after ``delay``"""
+        task = ScheduledTask(name, interval, callback, idle_interval)
+        task.next_due = self.clock() + delay
+        self.tasks[name] = task
+        self._update_next_due()
+        return task
+
+    def remove(self, name):
+        self.tasks.pop(name, None)
+        self._update_next_due()
+
+    def set_idle(self, idle):
+        """Switch every task between its normal and idle interval; returns whether it changed"""
+        if idle == self.idle:
+            return False
+        self.idle = idle
+        now = self.clock()
+        for task in self.tasks.values():
+            base = task.last_run if task.last_run is not None else now
+            task.next_due = base + task.period(idle)
+        self._update_next_due()
+        return True
+
+    def next_due(self):
+        """Clock time the next task is due, or None when nothing is scheduled"""
+        return self._next_due
+
+    def next_delay(self):
+        """Seconds until the next task is due, or None when nothing is scheduled"""
+        if self._next_due is None:
+            return None
+        return max(0.0, self._next_due - self.clock())
+
+    def run_due(self):
+        """Run every task that is due and return next_delay()"""
+        now = self.clock()
+        self.wakeups += 1
+        horizon = now + self.slack
+        idle = self.idle
+        for task in [task for task in self.tasks.values() if task.next_due <= horizon]:
+            if self.tasks.get(task.name) is not task:  # removed by an earlier callback
+                continue
+            period = task.idle_interval if idle else task.interval
+            task.next_due += period
+            if task.next_due <= now:
+                task.next_due = now + period
+            task.last_run = now
+            task.runs += 1
+            try:
+                task.callback()
+            except Exception as e:
+                print(f"Error in scheduled task {task.name}: {e}")
+        self._update_next_due()
+        return self.next_delay()
+
+    def _update_next_due(self):
+        self._next_due = min((task.next_due for task in self.tasks.values()), default=None)
+
+    def reset_stats(self):
+        self.wakeups = 0
+        self.started_at = self.clock()
+        for task in self.tasks.values():
+            task.runs = 0
+
+    def wakeups_per_minute(self):
+        elapsed = self.clock() - self.started_at
+        return self.wakeups * 60 / elapsed if elapsed > 0 else 0.0
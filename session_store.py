@@ -0,0 +1,165 @@
+import sys
+from array import array
+
+# Seconds of clock noise tolerated between a sample's span and the interval it extends
+CONTIGUOUS = 1e-3
+
+# Bytes per hour of typical 1 Hz tracking the store is expected to stay under
+MEMORY_BUDGET_PER_HOUR = 16 * 1024
+
+
+class SessionStore:
+    """Append-only columnar log of activity intervals for one session
+
+    Consecutive samples with the same title, verdict and focus phase are
+    merged into one run-length encoded interval
+    (start, end, app_id, productive, ticks, phase), so a
+    20-minute stretch in one editor is a single record instead of 1200. A
+    sample at ``t`` credited ``seconds`` (one tick unless the caller measured
+    the real gap) covers ``[t - seconds, t]``, so a sample taken at an exact
+    window switch closes the previous app's interval at that instant. A
+    sample only extends an interval it is contiguous with, so intervals
+    never span untracked time (for example across a suspend) and
+    ``end - start`` is the sum of their credits.
+
+    Columns are ``array('d')`` start/end times, ``array('I')`` app ids and tick
+    counts, ``array('B')`` phase ids and a productive flag packed eight to a
+    byte. Titles and phase names are interned, so each distinct title is
+    stored once however often it repeats.
+
+    Memory per hour of tracking at the default 1 Hz tick:
+        each interval costs 25 bytes plus one bit, so with the typical
+        switch every 30 s (~120 intervals/hour) the columns take ~3 KiB/hour.
+        Distinct titles are stored once each (usually a few KiB per hour of
+        new titles). The worst case, a different title every tick, is
+        3600 intervals * 25.125 bytes ~= 88 KiB/hour plus the titles.
+    The old list of dicts took ~650 KiB/hour regardless of switching.
+    tests/test_session_store.py and benchmarks/bench_session_store.py check
+    the typical case against MEMORY_BUDGET_PER_HOUR (16 KiB).
+
+    Aggregate counters (total ticks, unproductive ticks, ticks per app) are
+    updated on append, so reading them is O(1); multiplied by the tick they
+    give the old per-tick accounting, while interval lengths give real time.
+    """
+
+    def __init__(self, tick=1.0):
+        self.tick = tick        # seconds covered by one sample
+        self.titles = []        # app id -> title
+        self._title_ids = {}    # title -> app id
+        self.phase_names = []   # phase id -> phase name
+        self._phase_ids = {}    # phase name -> phase id
+        self.starts = array("d")
+        self.ends = array("d")
+        self.app_ids = array("I")
+        self.ticks = array("I")
+        self.phases = array("B")
+        self._productive_bits = bytearray()
+        self.app_counts = array("I")  # app id -> number of ticks
+        self.sample_count = 0
+        self.unproductive_count = 0
+
+    def __len__(self):
+        """Number of intervals"""
+        return len(self.starts)
+
+    def __bool__(self):
+        return self.sample_count > 0
+
+    def intern(self, title):
+        """Return the integer id for ``title``, assigning one if it is new"""
+        app_id = self._title_ids.get(title)
+        if app_id is None:
+            app_id = len(self.titles)
+            self._title_ids[title] = app_id
+            self.titles.append(title)
+            self.app_counts.append(0)
+        return app_id
+
+    def _phase_id(self, phase):
+        phase_id = self._phase_ids.get(phase)
+        if phase_id is None:
+            phase_id = len(self.phase_names)
+            self._phase_ids[phase] = phase_id
+            self.phase_names.append(phase)
+        return phase_id
+
+    def append(self, timestamp, title, productive, phase="", seconds=None):
+        """Record one sample covering ``seconds`` (one tick by default)"""
+        if seconds is None:
+            seconds = self.tick
+        app_id = self.intern(title)
+        phase_id = self._phase_id(phase)
+        productive = bool(productive)
+        last = len(self.starts) - 1
+        if (last >= 0
+                and self.app_ids[last] == app_id
+                and self.phases[last] == phase_id
+                and self.is_productive(last) == productive
+                and abs(timestamp - seconds - self.ends[last]) <= CONTIGUOUS):
+            self.ends[last] = timestamp
+            self.ticks[last] += 1
+        else:
+            self._open(timestamp - seconds, timestamp, app_id, productive, phase_id)
+
+        self.sample_count += 1
+        if not productive:
+            self.unproductive_count += 1
+        self.app_counts[app_id] += 1
+
+    def add_interval(self, start, end, title, productive, ticks, phase=""):
+        """Append a whole interval, e.g. when restoring a journal snapshot"""
+        app_id = self.intern(title)
+        self._open(start, end, app_id, productive, self._phase_id(phase))
+        self.ticks[-1] = ticks
+        self.sample_count += ticks
+        if not productive:
+            self.unproductive_count += ticks
+        self.app_counts[app_id] += ticks
+
+    def _open(self, start, end, app_id, productive, phase_id):
+        index = len(self.starts)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.app_ids.append(app_id)
+        self.ticks.append(1)
+        self.phases.append(phase_id)
+        if index % 8 == 0:
+            self._productive_bits.append(0)
+        if productive:
+            self._productive_bits[index >> 3] |= 1 << (index & 7)
+
+    def is_productive(self, index):
+        """Return the productive flag of interval ``index``"""
+        if index < 0:
+            index += len(self)
+        return bool(self._productive_bits[index >> 3] >> (index & 7) & 1)
+
+    @property
+    def productive_count(self):
+        return self.sample_count - self.unproductive_count
+
+    def copy_columns(self):
+        """Return copies of the starts, ends and packed productive flags, e.g. to hand to a thread"""
+        return self.starts[:], self.ends[:], bytes(self._productive_bits)
+
+    def app_totals(self):
+        """Return {title: tick count} for every app seen this session"""
+        return {title: count for title, count in zip(self.titles, self.app_counts)}
+
+    def __getitem__(self, index):
+        """Return interval ``index`` as (start, end, title, productive, ticks, phase)"""
+        return (self.starts[index], self.ends[index], self.titles[self.app_ids[index]],
+                self.is_productive(index), self.ticks[index], self.phase_names[self.phases[index]])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def memory_usage(self):
+        """Return the approximate number of bytes held by the store"""
+        columns = (self.starts, self.ends, self.app_ids, self.ticks, self.phases, self.app_counts)
+        size = sum(sys.getsizeof(column) for column in columns)
+        size += sys.getsizeof(self._productive_bits)
+        size += sys.getsizeof(self.titles) + sys.getsizeof(self._title_ids)
+        size += sum(sys.getsizeof(title) for title in self.titles)
+        return size
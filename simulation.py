@@ -0,0 +1,145 @@
+import bisect
+import heapq
+
+from window_sampler import WindowSample, WindowSampler
+from window_watcher import WindowWatcher
+
+# A face box (x, y, w, h) for simulated frames where the user is present
+SIMULATED_FACE = (100, 80, 120, 120)
+
+
+class ScriptedWindowSource(WindowSampler):
+    """Polled foreground window following a script of (start_time, title) switches
+
+    sample() reports whichever title was active at the engine clock's current
+    time, so the source stays in step however fast the clock is advanced.
+    """
+
+    def __init__(self, clock, switches):
+        self.clock = clock
+        switches = sorted(switches)
+        self._starts = [start for start, _ in switches]
+        self._titles = [title for _, title in switches]
+
+    def sample(self):
+        now = self.clock.time()
+        index = bisect.bisect_right(self._starts, now) - 1
+        if index < 0:
+            return None
+        return WindowSample(now, self._titles[index], "")
+
+
+class ScriptedWindowWatcher(WindowWatcher):
+    """Simulated focus-change feed for the same script of switches
+
+    Each switch is delivered as an event stamped with its exact time once
+    the clock has passed it, as a platform hook would.
+    """
+
+    def __init__(self, clock, switches):
+        super().__init__(clock.time)
+        self._switches = sorted(switches)
+        self._next = 0
+
+    def start(self):
+        pass
+
+    def _deliver(self):
+        now = self.clock()
+        switches = self._switches
+        while self._next < len(switches) and switches[self._next][0] <= now:
+            timestamp, title = switches[self._next]
+            self._emit(title, timestamp=timestamp)
+            self._next += 1
+
+    def samples(self):
+        self._deliver()
+        return super().samples()
+
+    def skip_to_now(self):
+        self._deliver()
+        super().skip_to_now()
+
+
+class ScriptedCamera:
+    """Face detections for a user who is away during the given (start, end) spans"""
+
+    def __init__(self, away_spans=()):
+        away_spans = sorted(away_spans)
+        self._starts = [start for start, _ in away_spans]
+        self._ends = [end for _, end in away_spans]
+
+    def faces_at(self, timestamp):
+        index = bisect.bisect_right(self._starts, timestamp) - 1
+        if index >= 0 and timestamp < self._ends[index]:
+            return ()
+        return (SIMULATED_FACE,)
+
+
+class ScriptedInput:
+    """Input-idle source replaying the times of keyboard and mouse input"""
+
+    def __init__(self, clock, input_times):
+        self.clock = clock
+        self._times = sorted(input_times)
+
+    def idle_seconds(self):
+        now = self.clock.time()
+        index = bisect.bisect_right(self._times, now) - 1
+        if index < 0:
+            return None
+        return now - self._times[index]
+
+    def close(self):
+        pass
+
+
+def run_simulation(engine, clock, duration, camera=None, window_interval=1.0, timer_interval=1.0):
+    """Drive ``engine`` on a VirtualClock for ``duration`` simulated seconds
+
+    Fires the window check, the timer tick and (with a ``camera``) the camera
+    results in time order, jumping the clock straight to each event instead
+    of sleeping. The camera runs every ``engine.camera_interval`` seconds,
+    following the presence policy as the app does, and stops while that is
+    None. Returns the number of events delivered.
+
+    The app drives the same callbacks from its Scheduler; this loop keeps
+    the three sources in a heap of its own so a long replay costs a heap
+    operation per event rather than a scheduler pass.
+    """
+    start = clock.time()
+    end = start + duration
+    # (due, order, anchor, count, generation) per source. Due times are
+    # computed from counts so the schedule does not drift; order breaks ties
+    # as in the live app. The camera's entry is replaced (generation bumped)
+    # whenever the policy changes its interval.
+    pending = [(start, 0, start, 0, 0), (start, 1, start, 0, 0)]
+    camera_interval = engine.camera_interval if camera is not None else None
+    generation = 0
+    if camera_interval is not None:
+        pending.append((start, 2, start, 0, generation))
+    heapq.heapify(pending)
+    events = 0
+    while pending[0][0] <= end:
+        due, order, anchor, count, entry_generation = pending[0]
+        if order == 2 and entry_generation != generation:
+            heapq.heappop(pending)
+            continue
+        clock.set(due)
+        if order == 0:
+            engine.poll_window()
+            interval = window_interval
+        elif order == 1:
+            engine.update_timer()
+            interval = timer_interval
+        else:
+            engine.handle_faces(due, camera.faces_at(due))
+            interval = camera_interval
+        heapq.heapreplace(pending, (anchor + (count + 1) * interval, order, anchor, count + 1, entry_generation))
+        events += 1
+        if order and camera is not None and engine.camera_interval != camera_interval:
+            camera_interval = engine.camera_interval
+            generation += 1
+            if camera_interval is not None:
+                heapq.heappush(pending, (due + camera_interval, 2, due, 1, generation))
+    return events
@@ -0,0 +1,44 @@
+import random
+
+from app_classifier import AppClassifier
+
+
+def linear_scan(apps, title):
+    return any(app in title for app in apps)
+
+
+def random_text(rng, alphabet, low, high):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+
+
+def test_matches_linear_scan_on_random_lists():
+    rng = random.Random(0)
+    for _ in range(200):
+        apps = {random_text(rng, "abc", 1, 4) for _ in range(rng.randint(0, 8))}
+        classifier = AppClassifier(apps, cache_size=rng.choice((0, 4, 4096)))
+        titles = [random_text(rng, "abcd", 0, 12) for _ in range(50)]
+        titles += titles[:10]  # repeats exercise the cache
+        assert classifier.classify(titles) == [linear_scan(apps, title) for title in titles]
+
+
+def test_overlapping_patterns():
+    apps = {"he", "she", "his", "hers"}
+    classifier = AppClassifier(apps)
+    for title in ("ushers", "ahishers", "shx", "h", "xhex", "sh", ""):
+        assert classifier.is_unproductive(title) == linear_scan(apps, title)
+
+
+def test_empty_entry_matches_every_title():
+    classifier = AppClassifier({"", "youtube"})
+    assert classifier.is_unproductive("")
+    assert classifier.is_unproductive("editor")
+
+
+def test_update_rebuilds_only_on_change():
+    classifier = AppClassifier({"youtube"})
+    assert classifier.is_unproductive("youtube - firefox")
+    assert not classifier.is_unproductive("reddit - firefox")
+    assert not classifier.update(["youtube"])
+    assert classifier.update({"reddit"})
+    assert not classifier.is_unproductive("youtube - firefox")
+    assert classifier.is_unproductive("reddit - firefox")
@@ -0,0 +1,103 @@
+from engine import BREAK, LONG_BREAK, PHASE_DURATIONS, WORK, EngineListener, TrackerEngine, VirtualClock
+from simulation import ScriptedWindowSource, run_simulation
+from tracking import SessionTracker
+
+START = 1_700_000_000.0
+
+
+class RecordingListener(EngineListener):
+    def __init__(self, clock):
+        self.clock = clock
+        self.phases = []  # (time, phase, completed_sessions)
+
+    def on_phase_change(self, phase, completed_sessions):
+        self.phases.append((self.clock.time(), phase, completed_sessions))
+
+
+class MemoryJournal:
+    """Keeps the replayable tail in a list, as SessionJournal.recover() would return it"""
+
+    compaction_due = False
+
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+    def compact(self, record):
+        self.records = [record] if record is not None else []
+
+
+def make_engine(clock, journal=None):
+    listener = RecordingListener(clock)
+    switches = [(START, "notes - editor"), (START + 700, "youtube - firefox"), (START + 760, "notes - editor")]
+    engine = TrackerEngine(SessionTracker({"youtube"}), ScriptedWindowSource(clock, switches),
+                           clock=clock, journal=journal, listener=listener)
+    return engine, listener
+
+
+def expected_phases(start, first_phase, first_left, completed, end):
+    """[(time, phase, completed_sessions)] the phase machine should report until ``end``"""
+    phases = []
+    t, phase, left = start, first_phase, first_left
+    while t + left <= end:
+        t += left
+        if phase == WORK:
+            completed += 1
+            phase = LONG_BREAK if completed == 4 else BREAK
+            completed %= 4
+        else:
+            phase = WORK
+        phases.append((t, phase, completed))
+        left = PHASE_DURATIONS[phase]
+    return phases
+
+
+def test_phase_sequence_and_timing():
+    clock = VirtualClock(START)
+    engine, listener = make_engine(clock)
+    engine.start(focus=True)
+    run_simulation(engine, clock, 3 * 3600)
+
+    assert listener.phases == expected_phases(START, WORK, PHASE_DURATIONS[WORK], 0, START + 3 * 3600)
+    assert [phase for _, phase, _ in listener.phases[:8]] == [
+        BREAK, WORK, BREAK, WORK, BREAK, WORK, LONG_BREAK, WORK]
+    assert listener.phases[6] == (START + 4 * 1500 + 3 * 300, LONG_BREAK, 0)
+    assert engine.distracted_time == 60
+
+
+def test_late_tick_does_not_stretch_the_schedule():
+    clock = VirtualClock(START)
+    engine, listener = make_engine(clock)
+    engine.start(focus=True)
+    clock.set(START + PHASE_DURATIONS[WORK] + 7)  # the timer fired 7 s late
+    engine.update_timer()
+    assert listener.phases == [(START + 1507, BREAK, 1)]
+    assert engine.phase_start_time == START + 1500
+    assert engine.phase_time_left == PHASE_DURATIONS[BREAK] - 7
+
+
+def test_resume_focus_phase_from_journal():
+    clock = VirtualClock(START)
+    journal = MemoryJournal()
+    engine, _ = make_engine(clock, journal)
+    engine.start(focus=True)
+    run_simulation(engine, clock, 2000)  # Work, Break, then 200 s into the second Work phase
+    records = journal.records
+    assert engine.current_phase == WORK and engine.consecutive_work_sessions == 1
+
+    # The app was down for ten minutes; that time counts towards neither the phase nor the session
+    resumed_at = START + 2000 + 600
+    clock = VirtualClock(resumed_at)
+    engine, listener = make_engine(clock)
+    engine.start(focus=True, restore=records)
+    assert engine.current_phase == WORK
+    assert engine.consecutive_work_sessions == 1
+    assert engine.phase_time_left == PHASE_DURATIONS[WORK] - 200
+    assert engine.start_time == resumed_at - 2000
+
+    run_simulation(engine, clock, 3600)
+    assert listener.phases == expected_phases(resumed_at, WORK, PHASE_DURATIONS[WORK] - 200, 1,
+                                              resumed_at + 3600)
+    assert listener.phases[0] == (resumed_at + 1300, BREAK, 2)
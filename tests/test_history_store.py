@@ -0,0 +1,36 @@
+import sqlite3
+import time
+
+from history_store import HistoryStore
+
+
+def local(year, month, day, hour):
+    return time.mktime((year, month, day, hour, 0, 0, 0, 0, -1))
+
+
+def test_week_spanning_new_year_is_one_bucket(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    store.start()
+    # Wednesday 31 December 2025 and Thursday 1 January 2026 are both in ISO week 2026-W01
+    store.add(1, (local(2025, 12, 31, 10), local(2025, 12, 31, 11), "editor", True, 3600, "Work"))
+    store.add(1, (local(2026, 1, 1, 10), local(2026, 1, 1, 10) + 1800, "youtube", False, 1800, "Work"))
+    store.close()
+
+    store = HistoryStore(str(tmp_path / "history.db"))
+    assert store.weekly_totals(weeks=2, now=local(2026, 1, 2, 12)) == [("2026-W01", 3600.0, 1800.0)]
+    store.close()
+
+
+def test_existing_weeks_are_migrated_to_iso_weeks(tmp_path):
+    path = str(tmp_path / "history.db")
+    store = HistoryStore(path)
+    store.start()
+    store.add(1, (local(2026, 1, 1, 10), local(2026, 1, 1, 11), "editor", True, 3600, "Work"))
+    store.close()
+    with sqlite3.connect(path) as conn:  # as written before weeks were ISO weeks
+        conn.execute("UPDATE activity SET week = '2026-W00'")
+        conn.execute("PRAGMA user_version = 0")
+
+    store = HistoryStore(path)
+    assert store.weekly_totals(weeks=2, now=local(2026, 1, 2, 12)) == [("2026-W01", 3600.0, 0.0)]
+    store.close()
@@ -0,0 +1,36 @@
+import time
+
+from journal import SessionJournal
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.0005)
+
+
+def test_large_snapshot_does_not_compact_every_tick(tmp_path):
+    """A title that changes every tick adds an interval per tick to every snapshot"""
+    journal = SessionJournal(str(tmp_path), segment_bytes=20000, batch_size=1)
+    journal.start()
+    intervals = []
+    try:
+        journal.compact({"type": "start", "intervals": []})
+        for tick in range(1500):
+            title = f"{1500 - tick} s left - browser"
+            intervals.append([tick, tick + 1.0, title, False, 1, "Work"])
+            written = journal.records_written
+            journal.write({"type": "sample", "t": tick + 1.0, "app": title, "unproductive": True, "phase": "Work"})
+            wait_for(lambda: journal.records_written > written)
+            if journal.compaction_due:
+                journal.compact({"type": "snapshot", "intervals": list(intervals)})
+    finally:
+        journal.close()
+
+    # Once snapshots pass segment_bytes the limit doubles with them, so
+    # compactions grow with log(intervals) instead of one every other tick
+    assert 1 <= journal.compactions <= 20
+    records = SessionJournal.recover(str(tmp_path))
+    assert records[0]["type"] == "snapshot"
+    assert len(records[0]["intervals"]) + len(records) - 1 == len(intervals)
@@ -0,0 +1,77 @@
+import random
+import tracemalloc
+from collections import Counter
+
+from session_store import MEMORY_BUDGET_PER_HOUR, SessionStore
+
+
+def typical_samples(count, distinct_titles=200, mean_dwell=30, seed=0):
+    """(timestamp, title, productive) at 1 Hz, switching title every ~30 s"""
+    rng = random.Random(seed)
+    titles = [f"notes {n} - editor" for n in range(distinct_titles - 40)]
+    titles += [f"video {n} - youtube" for n in range(40)]
+    samples = []
+    t = 1_700_000_000.0
+    while len(samples) < count:
+        title = rng.choice(titles)
+        for _ in range(max(1, int(rng.expovariate(1 / mean_dwell)))):
+            t += 1.0
+            samples.append((t, title, "youtube" not in title))
+            if len(samples) == count:
+                break
+    return samples
+
+
+def fill(samples):
+    store = SessionStore()
+    for timestamp, title, productive in samples:
+        store.append(timestamp, title, productive)
+    return store
+
+
+def test_memory_per_hour_within_budget():
+    hours = 8
+    samples = typical_samples(hours * 3600)  # built before tracing so only the store is measured
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        store = fill(samples)
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert store.sample_count == len(samples)
+    assert used / hours <= MEMORY_BUDGET_PER_HOUR
+
+
+def test_interval_totals_match_per_tick_accounting():
+    samples = typical_samples(4 * 3600, seed=1)
+    store = fill(samples)
+
+    seconds_per_app = Counter()
+    unproductive = 0.0
+    for interval in store:
+        start, end, title, productive, ticks, phase = interval
+        assert end - start == ticks * store.tick
+        seconds_per_app[title] += end - start
+        if not productive:
+            unproductive += end - start
+
+    ticks_per_app = Counter(title for _, title, _ in samples)
+    assert seconds_per_app == {title: count * store.tick for title, count in ticks_per_app.items()}
+    assert store.app_totals() == dict(ticks_per_app)
+    assert store.unproductive_count == sum(1 for _, _, productive in samples if not productive)
+    assert unproductive == store.unproductive_count * store.tick
+    assert len(store) < len(samples) / 10
+
+
+def test_gap_and_phase_change_start_new_intervals():
+    store = SessionStore()
+    for t in range(1, 11):
+        store.append(float(t), "editor", True, "Work")
+    store.append(100.0, "editor", True, "Work")
+    store.append(101.0, "editor", True, "Break")
+    assert [tuple(interval) for interval in store] == [
+        (0.0, 10.0, "editor", True, 10, "Work"),
+        (99.0, 100.0, "editor", True, 1, "Work"),
+        (100.0, 101.0, "editor", True, 1, "Break"),
+    ]
@@ -0,0 +1,82 @@
+from tracking import SessionTracker
+from window_sampler import WindowSample
+
+APPS = {"youtube", "reddit"}
+TITLES = ["notes - editor", "youtube - firefox", "terminal", "reddit - firefox", "notes - editor"]
+
+
+class RecordingHistory:
+    def __init__(self):
+        self.added = []
+
+    def add(self, session_id, interval):
+        self.added.append((session_id, interval))
+
+
+def run_session(tracker, samples):
+    """Process ``samples`` and return the journal records the engine would write"""
+    records = [dict(type="start", **tracker.snapshot())]
+    for index, sample in enumerate(samples):
+        if index == len(samples) // 2:
+            tracker.phase = "Break"
+        verdict = tracker.process(sample)
+        records.append({"type": "sample", "t": sample.timestamp, "app": sample.title,
+                        "unproductive": verdict, "phase": tracker.phase})
+    return records
+
+
+def make_samples():
+    samples = []
+    t = 1_700_000_000.0
+    for title in TITLES:
+        for _ in range(20):
+            t += 1.0
+            samples.append(WindowSample(t, title, ""))
+        t += 30.0  # a gap longer than max_gap
+    return samples
+
+
+def test_restore_from_start_reproduces_session():
+    original = SessionTracker(APPS)
+    records = run_session(original, make_samples())
+
+    restored = SessionTracker(APPS)
+    restored.restore(records)
+    assert restored.snapshot() == original.snapshot()
+    assert restored.distracted_time == original.distracted_time == 40.0
+
+
+def test_restore_from_snapshot_and_later_samples():
+    samples = make_samples()
+    original = SessionTracker(APPS)
+    run_session(original, samples[:50])
+    snapshot = dict(type="snapshot", **original.snapshot())
+    later = run_session(original, samples[50:])[1:]
+
+    restored = SessionTracker(APPS)
+    restored.restore([snapshot] + later)
+    assert restored.snapshot() == original.snapshot()
+
+
+def test_restore_keeps_recorded_verdicts():
+    original = SessionTracker(APPS)
+    records = run_session(original, make_samples())
+
+    restored = SessionTracker({"editor"})  # the app list changed since the crash
+    restored.restore(records)
+    assert restored.distracted_time == original.distracted_time
+    assert [interval[3] for interval in restored.session_data] == \
+        [interval[3] for interval in original.session_data]
+
+
+def test_restore_requeues_closed_intervals_once():
+    original = SessionTracker(APPS)
+    records = run_session(original, make_samples())
+
+    history = RecordingHistory()
+    restored = SessionTracker(APPS, history=history)
+    restored.restore(records)
+    intervals = list(restored.session_data)
+    assert history.added == [(original.session_id, interval) for interval in intervals[:-1]]
+    restored.finish()
+    assert history.added[-1] == (original.session_id, intervals[-1])
@@ -0,0 +1,25 @@
+from window_sampler import parse_xprop_line, xprop_title
+
+
+def parse(output):
+    return dict(parse_xprop_line(line) for line in output.splitlines())
+
+
+def test_xprop_title_prefers_net_wm_name():
+    values = parse('_NET_WM_PID(CARDINAL) = 4242\n'
+                   '_NET_WM_NAME(UTF8_STRING) = "Inbox = mail - firefox"\n'
+                   'WM_NAME(STRING) = "inbox"\n')
+    assert values["_NET_WM_PID"] == "4242"
+    assert xprop_title(values) == "Inbox = mail - firefox"
+
+
+def test_xprop_title_falls_back_to_wm_name():
+    values = parse('_NET_WM_PID:  not found.\n'
+                   '_NET_WM_NAME:  not found.\n'
+                   'WM_NAME(STRING) = "xterm - bash"\n')
+    assert values["_NET_WM_PID"] is None
+    assert xprop_title(values) == "xterm - bash"
+
+
+def test_xprop_title_of_untitled_window_is_empty():
+    assert xprop_title(parse('_NET_WM_NAME:  not found.\nWM_NAME:  not found.\n')) == ""
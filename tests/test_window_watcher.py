@@ -0,0 +1,28 @@
+import types
+
+from window_watcher import X11Watcher
+
+
+def follow(lines):
+    watcher = X11Watcher(clock=lambda: 100.0)
+    watcher._follow_title(types.SimpleNamespace(stdout=iter(lines)), "xterm")
+    return [sample.title for sample in watcher.samples()]
+
+
+def test_xprop_spy_follows_wm_name_only_windows():
+    titles = follow(['_NET_WM_NAME:  not found.\n',
+                     'WM_NAME(STRING) = "Build - xterm"\n',
+                     'WM_NAME(STRING) = "Tests - xterm"\n'])
+    assert titles == ["build - xterm", "tests - xterm"]
+
+
+def test_xprop_spy_prefers_net_wm_name():
+    titles = follow(['_NET_WM_NAME(UTF8_STRING) = "Inbox - Firefox"\n',
+                     'WM_NAME(STRING) = "Inbox - Firefox"\n',
+                     'WM_NAME(STRING) = "ignored"\n',
+                     '_NET_WM_NAME(UTF8_STRING) = "News - Firefox"\n'])
+    assert titles == ["inbox - firefox", "news - firefox"]
+
+
+def test_xprop_spy_reports_untitled_window():
+    assert follow(['_NET_WM_NAME:  not found.\n', 'WM_NAME:  not found.\n']) == [""]
@@ -0,0 +1,138 @@
+import time
+
+import numpy as np
+
+DAY = 24 * 3600
+
+
+def coverage(starts, ends, edges, weights=None):
+    """Seconds of the intervals [starts, ends) that fall in each bin between ``edges``
+
+    The intervals must be sorted and must not overlap, which holds for
+    SessionStore intervals and away spans. With ``weights`` (e.g. the
+    productive flags) each interval's seconds are multiplied by its weight.
+    The cumulative covered time is evaluated at every edge with one
+    searchsorted, so the cost is O((intervals + bins) log intervals) with no
+    Python loop.
+    """
+    if len(starts) == 0:
+        return np.zeros(len(edges) - 1)
+    lengths = ends - starts
+    rates = np.ones(len(starts)) if weights is None else weights
+    covered_before = np.concatenate(([0.0], np.cumsum(lengths * rates)))
+    index = np.searchsorted(starts, edges, side="right") - 1  # last interval starting by each edge
+    last = np.maximum(index, 0)
+    partial = np.where(index >= 0, np.clip(edges - starts[last], 0, lengths[last]) * rates[last], 0.0)
+    return np.diff(covered_before[last] + partial)
+
+
+def _merge_bins(values, step):
+    """Sum every ``step`` consecutive bins (the last group may be short)"""
+    if step == 1:
+        return values
+    padded = np.zeros(-(-len(values) // step) * step)
+    padded[:len(values)] = values
+    return padded.reshape(-1, step).sum(axis=1)
+
+
+class SessionTimeline:
+    """Per-minute and hour-of-day views of one session, binned with NumPy
+
+    Built from copies of the SessionStore columns (see from_session), so a
+    background thread can bin and draw while the Tk thread keeps appending
+    to the live store. ``productive``, ``unproductive`` and ``away`` hold
+    seconds per ``bin_seconds`` bin since the start; ``heatmap`` holds the
+    productive share for each (day, local hour).
+    """
+
+    def __init__(self, starts, ends, productive_bits, away_spans=(), now=None, bin_seconds=60):
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        productive = np.unpackbits(
+            np.frombuffer(productive_bits, dtype=np.uint8), bitorder="little"
+        )[:len(starts)].astype(np.float64)
+        now = now if now is not None else (ends[-1] if len(ends) else time.time())
+        away = np.array([(start, end if end is not None else now) for start, end in away_spans],
+                        dtype=np.float64).reshape(-1, 2)
+
+        self.bin_seconds = bin_seconds
+        self.origin = starts[0] if len(starts) else now
+        bins = max(1, int(np.ceil((max(now, self.origin) - self.origin) / bin_seconds)))
+        self.edges = self.origin + np.arange(bins + 1) * bin_seconds
+        self.productive = coverage(starts, ends, self.edges, productive)
+        self.unproductive = coverage(starts, ends, self.edges) - self.productive
+        self.away = coverage(away[:, 0], away[:, 1], self.edges)
+        self.away_spans = away
+
+        # Local hours, with the UTC offset in effect at the start of the session
+        offset = time.localtime(self.origin).tm_gmtoff
+        first_day = (self.origin + offset) // DAY * DAY - offset
+        last = max(now, self.origin)
+        days = int((last - first_day) // DAY) + 1
+        hour_edges = first_day + np.arange(days * 24 + 1) * 3600.0
+        self.day_starts = first_day + np.arange(days) * DAY
+        self.hour_productive = coverage(starts, ends, hour_edges, productive).reshape(days, 24)
+        self.hour_tracked = coverage(starts, ends, hour_edges).reshape(days, 24)
+
+    @classmethod
+    def from_session(cls, store, away_spans=(), now=None, bin_seconds=60):
+        """Bin a SessionStore; ``store`` columns are copied, so take this on the thread that owns it"""
+        starts, ends, bits = store.copy_columns()
+        return cls(starts, ends, bits, [list(span) for span in away_spans], now, bin_seconds)
+
+    @property
+    def heatmap(self):
+        """Productive share per (day, hour); NaN where nothing was tracked"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.hour_tracked > 0, self.hour_productive / self.hour_tracked, np.nan)
+
+    def render(self, width=620, height=380, dpi=100):
+        """Draw the timeline and heatmap into a PIL image
+
+        Uses matplotlib's Agg canvas directly (no pyplot, no GUI backend),
+        so it is safe to call off the Tk thread.
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from PIL import Image
+
+        figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi, layout="constrained")
+        canvas = FigureCanvasAgg(figure)
+        timeline_axes, heatmap_axes = figure.subplots(
+            2, 1, gridspec_kw={"height_ratios": [3, 2]}
+        )
+
+        # At most one bar per two pixels; longer sessions merge neighbouring bins
+        step = max(1, -(-len(self.productive) // (width // 2)))
+        bar_seconds = self.bin_seconds * step
+        productive = _merge_bins(self.productive, step) / bar_seconds
+        unproductive = _merge_bins(self.unproductive, step) / bar_seconds
+        minutes = np.arange(len(productive) + 1) * bar_seconds / 60
+        timeline_axes.stairs(productive, minutes, baseline=0,
+                             fill=True, color="#4caf50", label="Productive")
+        timeline_axes.stairs(productive + unproductive, minutes,
+                             baseline=productive, fill=True, color="#e53935", label="Unproductive")
+        if len(self.away_spans):
+            timeline_axes.broken_barh(
+                [((start - self.origin) / 60, (end - start) / 60) for start, end in self.away_spans],
+                (0, 1), facecolors="#9e9e9e", alpha=0.35, label="Away"
+            )
+        timeline_axes.set_xlim(0, (self.edges[-1] - self.origin) / 60)
+        timeline_axes.set_ylim(0, 1)
+        timeline_axes.set_xlabel("Minutes since start")
+        timeline_axes.set_ylabel("Share of bin")
+        timeline_axes.set_title("Productivity timeline", fontsize=10)
+        timeline_axes.legend(loc="upper right", fontsize=7, ncol=3)
+
+        image = heatmap_axes.imshow(self.heatmap, aspect="auto", cmap="RdYlGn", vmin=0, vmax=1,
+                                    interpolation="nearest")
+        heatmap_axes.set_xticks(range(0, 24, 3))
+        heatmap_axes.set_xlabel("Hour of day")
+        heatmap_axes.set_yticks(range(len(self.day_starts)))
+        heatmap_axes.set_yticklabels([time.strftime("%a %d", time.localtime(day)) for day in self.day_starts],
+                                     fontsize=7)
+        heatmap_axes.set_title("Productive share by hour", fontsize=10)
+        figure.colorbar(image, ax=heatmap_axes, fraction=0.04)
+
+        canvas.draw()
+        return Image.fromarray(np.array(canvas.buffer_rgba()))
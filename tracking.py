@@ -0,0 +1,131 @@
+import time
+
+from analytics import RunningAnalytics
+from app_classifier import AppClassifier
+from session_store import SessionStore
+from window_sampler import WindowSample
+
+
+class SessionTracker:
+    """Classifies window samples and accumulates the session accounting
+
+    Holds everything the app records per tick (the session_data intervals and
+    the RunningAnalytics aggregates) without touching Tk, so the same
+    pipeline can be fed by a live sampler or a recorded trace. When a
+    HistoryStore is attached, every interval that closes is queued for it.
+
+    Each sample is credited the real time since the previous one, so late or
+    backed-off checks neither lose nor double count time. The first sample,
+    and any that follow a gap longer than ``max_gap`` (a suspend, or the
+    clock jumping back), are credited one ``check_interval`` instead.
+    """
+
+    def __init__(self, unproductive_apps, check_interval=1.0, history=None, max_gap=10.0):
+        self.classifier = AppClassifier(unproductive_apps)
+        self.check_interval = check_interval  # nominal seconds between samples
+        self.max_gap = max_gap
+        self.history = history
+        self.reset()
+
+    def reset(self, session_id=None):
+        self.session_id = session_id if session_id is not None else int(time.time() * 1000)
+        self.session_data = SessionStore(self.check_interval)
+        self.analytics = RunningAnalytics()
+        self.samples_processed = 0
+        self.last_sample_time = None
+        self.phase = ""
+
+    def process(self, sample, is_unproductive=None):
+        """Account one window sample and return whether it was unproductive
+
+        ``is_unproductive`` overrides the classifier, so journal replays keep
+        the verdict that was recorded even if the app list changed since.
+        """
+        self.samples_processed += 1
+        window_title = sample.title
+        if is_unproductive is None:
+            is_unproductive = self.classifier.is_unproductive(window_title)
+
+        seconds = self.check_interval
+        if self.last_sample_time is not None:
+            gap = sample.timestamp - self.last_sample_time
+            if 0 <= gap <= self.max_gap:
+                seconds = gap
+        self.last_sample_time = sample.timestamp
+
+        logged = window_title and "workwise" not in window_title  # Skip logging WorkWise itself
+        self.analytics.add(seconds, is_unproductive, self.phase, window_title if logged else None)
+        if logged:
+            store = self.session_data
+            intervals = len(store)
+            store.append(sample.timestamp, window_title, not is_unproductive, self.phase, seconds)
+            if self.history is not None and len(store) > intervals > 0:
+                self.history.add(self.session_id, store[intervals - 1])
+        return is_unproductive
+
+    def finish(self):
+        """Close the session, handing the still-open interval to the history store"""
+        if self.history is not None and self.session_data:
+            self.history.add(self.session_id, self.session_data[-1])
+
+    def snapshot(self):
+        """Return the session state as a JSON-serializable dict"""
+        return {
+            "session_id": self.session_id,
+            "phase": self.phase,
+            "analytics": self.analytics.snapshot(),
+            "samples_processed": self.samples_processed,
+            "last_sample_time": self.last_sample_time,
+            "intervals": [list(interval) for interval in self.session_data],
+        }
+
+    def restore(self, records):
+        """Rebuild the session from journal records (a start or snapshot, then samples)"""
+        history, self.history = self.history, None
+        try:
+            for record in records:
+                kind = record.get("type")
+                if kind in ("start", "snapshot"):
+                    self.reset(record["session_id"])
+                    self.phase = record["phase"]
+                    self.analytics.restore(record["analytics"])
+                    self.samples_processed = record["samples_processed"]
+                    self.last_sample_time = record.get("last_sample_time")
+                    for interval in record["intervals"]:
+                        self.session_data.add_interval(*interval)
+                elif kind == "sample":
+                    self.phase = record.get("phase", "")
+                    sample = WindowSample(record["t"], record["app"], record.get("process", ""))
+                    self.process(sample, record["unproductive"])
+        finally:
+            self.history = history
+        # Re-queue closed intervals the history writer may not have flushed
+        # before the crash; rows already stored are ignored
+        if history is not None:
+            for index in range(len(self.session_data) - 1):
+                history.add(self.session_id, self.session_data[index])
+
+    @property
+    def distracted_time(self):
+        """Seconds of samples classified as unproductive"""
+        return self.analytics.unproductive_time
+
+    @property
+    def app_usage_times(self):
+        """Seconds logged per app, excluding WorkWise itself"""
+        return self.analytics.app_times
+
+
+def replay(sampler, tracker):
+    """Feed every sample from ``sampler`` through ``tracker`` as fast as possible
+
+    Returns (samples, seconds) so load tests can report throughput.
+    """
+    start = time.perf_counter()
+    count = 0
+    sample = sampler.sample()
+    while sample is not None:
+        tracker.process(sample)
+        count += 1
+        sample = sampler.sample()
+    return count, time.perf_counter() - start
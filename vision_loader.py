@@ -0,0 +1,117 @@
+import threading
+import time
+
+
+class VisionLoader:
+    """Loads the vision stack and opens the camera off the Tk thread
+
+    Importing OpenCV/NumPy/PIL and loading the Haar cascade is most of the
+    app's cold-start cost, and opening a webcam can take a second on its own.
+    load_async() does the former in the background once the window is up;
+    preopen_camera() opens the camera speculatively (e.g. while the user is
+    still editing the app list) so pressing Start does not wait for it.
+    A pre-opened camera nobody claims within ``idle_release`` seconds is
+    released again so the webcam light does not stay on.
+    """
+
+    def __init__(self, camera_index=0, idle_release=60.0):
+        self.camera_index = camera_index
+        self.idle_release = idle_release
+        self.cv2 = None
+        self.face_cascade = None
+        self.error = None
+        self.load_seconds = None
+        self._loaded = threading.Event()
+        self._load_thread = None
+        self._lock = threading.Lock()
+        self._cap = None
+        self._cap_error = None
+        self._opening = False
+        self._release_timer = None
+
+    @property
+    def loaded(self):
+        return self._loaded.is_set()
+
+    def load_async(self):
+        """Start importing the vision stack in the background (idempotent)"""
+        with self._lock:
+            if self._load_thread is None:
+                self._load_thread = threading.Thread(target=self._load, name="VisionLoader", daemon=True)
+                self._load_thread.start()
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            import cv2
+            import PIL.ImageTk  # noqa: F401  (warm the import for the preview)
+            self.face_cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+            )
+            self.cv2 = cv2
+        except Exception as e:
+            self.error = e
+        self.load_seconds = time.perf_counter() - start
+        self._loaded.set()
+
+    def preopen_camera(self):
+        """Open the camera in the background if it is not open or opening already"""
+        self.load_async()
+        with self._lock:
+            if self._cap is not None or self._opening:
+                return
+            self._opening = True
+            self._cap_error = None
+        threading.Thread(target=self._open_camera, name="CameraOpener", daemon=True).start()
+
+    def _open_camera(self):
+        self._loaded.wait()
+        cap, error = None, self.error
+        if error is None:
+            try:
+                cap = self.cv2.VideoCapture(self.camera_index)
+                if not cap.isOpened():
+                    cap.release()
+                    cap, error = None, RuntimeError("Could not open camera.")
+            except Exception as e:
+                cap, error = None, e
+        with self._lock:
+            self._opening = False
+            self._cap = cap
+            self._cap_error = error
+            if cap is not None and self.idle_release:
+                self._release_timer = threading.Timer(self.idle_release, self.release_idle_camera)
+                self._release_timer.daemon = True
+                self._release_timer.start()
+
+    def take_camera(self):
+        """Claim the opened camera
+
+        Returns the capture once it is open, None while it is still loading
+        or opening (the open is started if needed), and raises the error if
+        loading or opening failed.
+        """
+        with self._lock:
+            if self._cap is not None:
+                cap, self._cap = self._cap, None
+                self._cancel_release_timer()
+                return cap
+            if self._cap_error is not None:
+                error, self._cap_error = self._cap_error, None
+                raise error
+            opening = self._opening
+        if not opening:
+            self.preopen_camera()
+        return None
+
+    def release_idle_camera(self):
+        with self._lock:
+            cap, self._cap = self._cap, None
+            self._cancel_release_timer()
+        if cap is not None:
+            cap.release()
+
+    def _cancel_release_timer(self):
+        if self._release_timer is not None:
+            self._release_timer.cancel()
+            self._release_timer = None
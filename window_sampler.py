@@ -0,0 +1,208 @@
+import json
+import shutil
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+# One observation of the foreground window. Titles are lower-cased like the
+# rest of the app expects; process is the executable name when known.
+WindowSample = namedtuple("WindowSample", ["timestamp", "title", "process"])
+
+
+class WindowSampler:
+    """Base class for foreground-window backends; on its own it never sees a window"""
+
+    def sample(self):
+        """Return a WindowSample for the current foreground window, or None"""
+        return None
+
+    def samples(self):
+        """Return the samples to account since the last call
+
+        A poller only knows the window in front right now, so this is a
+        single sample; event-driven watchers also report the switches
+        in between (see window_watcher.py).
+        """
+        sample = self.sample()
+        return [sample] if sample is not None else []
+
+    def skip_to_now(self):
+        """Forget anything recorded before now, e.g. between sessions"""
+        pass
+
+    def close(self):
+        pass
+
+
+class Win32Sampler(WindowSampler):
+    """Foreground window via win32gui on Windows"""
+
+    def __init__(self):
+        import win32gui
+        self.win32gui = win32gui
+
+    def sample(self):
+        window = self.win32gui.GetForegroundWindow()
+        title = self.win32gui.GetWindowText(window).lower()
+        return WindowSample(time.time(), title, "")
+
+
+class X11Sampler(WindowSampler):
+    """Foreground window via the EWMH _NET_ACTIVE_WINDOW property on X11
+
+    Uses python-xlib when it is installed and falls back to the ``xprop``
+    command otherwise. The process name is read from /proc.
+    """
+
+    def __init__(self):
+        try:
+            from Xlib import X, display
+            self._display = display.Display()
+            self._root = self._display.screen().root
+            self._atoms = {
+                name: self._display.intern_atom(name)
+                for name in ("_NET_ACTIVE_WINDOW", "_NET_WM_NAME", "_NET_WM_PID", "UTF8_STRING")
+            }
+            self._any_property_type = X.AnyPropertyType
+        except Exception:
+            self._display = None
+            # Fail now rather than on the first tick if xprop is missing too
+            if shutil.which("xprop") is None:
+                raise RuntimeError("no X11 window source (python-xlib or xprop)")
+
+    def sample(self):
+        if self._display is not None:
+            window_id, title, pid = self._query_xlib()
+        else:
+            window_id, title, pid = self._query_xprop()
+        return WindowSample(time.time(), title.lower(), read_proc_name(pid))
+
+    def close(self):
+        if self._display is not None:
+            self._display.close()
+            self._display = None
+
+    def _query_xlib(self):
+        active = self._root.get_full_property(self._atoms["_NET_ACTIVE_WINDOW"], self._any_property_type)
+        if not active or not active.value or not active.value[0]:
+            return 0, "", 0
+        window_id = active.value[0]
+        window = self._display.create_resource_object("window", window_id)
+        name = window.get_full_property(self._atoms["_NET_WM_NAME"], self._atoms["UTF8_STRING"])
+        title = name.value.decode("utf-8", "replace") if name else (window.get_wm_name() or "")
+        pid_prop = window.get_full_property(self._atoms["_NET_WM_PID"], self._any_property_type)
+        pid = pid_prop.value[0] if pid_prop and pid_prop.value else 0
+        return window_id, title, pid
+
+    def _query_xprop(self):
+        output = subprocess.run(
+            ["xprop", "-root", "_NET_ACTIVE_WINDOW"], capture_output=True, text=True
+        ).stdout
+        window_id = output.strip().rsplit(" ", 1)[-1]
+        if not window_id.startswith("0x") or int(window_id, 16) == 0:
+            return 0, "", 0
+        output = subprocess.run(
+            ["xprop", "-id", window_id, "_NET_WM_PID", *XPROP_TITLE_PROPERTIES], capture_output=True, text=True
+        ).stdout
+        values = dict(parse_xprop_line(line) for line in output.splitlines())
+        pid = int(values["_NET_WM_PID"]) if values.get("_NET_WM_PID") else 0
+        return int(window_id, 16), xprop_title(values), pid
+
+
+class ReplaySampler(WindowSampler):
+    """Deterministic sampler that plays back a recorded trace
+
+    Each call to sample() returns the next recorded sample, or None once the
+    trace is exhausted (unless ``loop`` is set). Timestamps are taken from the
+    trace so replays are reproducible regardless of how fast they run.
+    """
+
+    def __init__(self, samples, loop=False):
+        self.samples = list(samples)
+        self.loop = loop
+        self.position = 0
+
+    @classmethod
+    def from_file(cls, path, loop=False):
+        return cls(load_trace(path), loop=loop)
+
+    def sample(self):
+        if self.position >= len(self.samples):
+            if not self.loop or not self.samples:
+                return None
+            self.position = 0
+        sample = self.samples[self.position]
+        self.position += 1
+        return sample
+
+    def __iter__(self):
+        while True:
+            sample = self.sample()
+            if sample is None:
+                return
+            yield sample
+
+
+# Window title properties, preferred first; older clients only set WM_NAME
+XPROP_TITLE_PROPERTIES = ("_NET_WM_NAME", "WM_NAME")
+
+
+def parse_xprop_line(line):
+    """Split a line of xprop output into (property, value); value is None if it is not set"""
+    head, separator, value = line.partition("=")
+    name = head.split("(", 1)[0].split(":", 1)[0].strip()
+    return name, value.strip() if separator else None
+
+
+def xprop_title(values):
+    """The window title from {property: value} parsed xprop output, or an empty string"""
+    for name in XPROP_TITLE_PROPERTIES:
+        if values.get(name):
+            return values[name].strip('"')
+    return ""
+
+
+def read_proc_name(pid):
+    """Return the executable name of a Linux process, or an empty string"""
+    if not pid:
+        return ""
+    try:
+        with open(f"/proc/{pid}/comm") as f:
+            return f.read().strip().lower()
+    except OSError:
+        return ""
+
+
+def load_trace(path):
+    """Load samples from a newline-delimited JSON trace file"""
+    samples = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                samples.append(WindowSample(
+                    record["t"], record.get("title", "").lower(), record.get("process", "")
+                ))
+    return samples
+
+
+def save_trace(samples, path):
+    """Write samples to a newline-delimited JSON trace file"""
+    with open(path, "w") as f:
+        for sample in samples:
+            f.write(json.dumps({"t": sample.timestamp, "title": sample.title, "process": sample.process}))
+            f.write("\n")
+
+
+def create_sampler(trace=None):
+    """Pick the sampler backend for this platform, a replay of ``trace``, or a null sampler"""
+    if trace:
+        return ReplaySampler.from_file(trace)
+    try:
+        if sys.platform == "win32":
+            return Win32Sampler()
+        return X11Sampler()
+    except Exception as e:
+        print(f"Foreground window unavailable, app tracking is off: {e}")
+        return WindowSampler()
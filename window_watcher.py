@@ -0,0 +1,325 @@
+import os
+import queue
+import select
+import subprocess
+import sys
+import threading
+import time
+
+from window_sampler import (XPROP_TITLE_PROPERTIES, ReplaySampler, WindowSample, WindowSampler, X11Sampler,
+                            create_sampler, parse_xprop_line, read_proc_name, xprop_title)
+
+
+class WindowWatcher(WindowSampler):
+    """Base class for event-driven foreground-window backends
+
+    Instead of asking for the foreground window on every tick, a backend
+    thread subscribes to the platform's focus-change notifications and
+    calls _emit() with the new window as soon as it changes (including a
+    title change in the focused window, e.g. a browser tab switch).
+
+    samples() turns the switches recorded since the last call into samples
+    for SessionTracker, which credits each sample the time since the
+    previous one: one sample of the outgoing window stamped with the exact
+    switch time, then one of the window in front now. Every second up to a
+    switch is therefore attributed to the window that really had focus,
+    and switches shorter than a poll interval are not lost.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.switches = 0
+        self._events = queue.SimpleQueue()
+        self._active = None     # WindowSample of the window in front
+        self._last_time = None  # timestamp of the last sample returned
+
+    def start(self):
+        """Subscribe to notifications; raises if they are unavailable"""
+        raise NotImplementedError
+
+    def _emit(self, title, process="", timestamp=None):
+        """Record a switch to ``title`` (called from the backend thread)"""
+        self._events.put(WindowSample(
+            timestamp if timestamp is not None else self.clock(), title.lower(), process
+        ))
+
+    def sample(self):
+        return self._active
+
+    def skip_to_now(self):
+        while True:
+            try:
+                self._active = self._events.get_nowait()
+            except queue.Empty:
+                break
+        self._last_time = None
+
+    def samples(self):
+        now = self.clock()
+        result = []
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                break
+            active = self._active
+            if active is not None and event.title == active.title and event.process == active.process:
+                continue  # repeated notification for the same window
+            if active is not None:
+                # Events racing an earlier flush cannot go back in time
+                switch_time = max(event.timestamp, self._last_time or event.timestamp)
+                result.append(WindowSample(switch_time, active.title, active.process))
+                self._last_time = switch_time
+                self.switches += 1
+            self._active = event
+        if self._active is not None:
+            result.append(WindowSample(now, self._active.title, self._active.process))
+            self._last_time = now
+        return result
+
+
+class Win32Watcher(WindowWatcher):
+    """Foreground changes via SetWinEventHook on Windows
+
+    Hooks EVENT_SYSTEM_FOREGROUND for switches and EVENT_OBJECT_NAMECHANGE
+    (filtered to the foreground window) for title changes, out of context,
+    on a thread running its own message loop.
+    """
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    OBJID_WINDOW = 0
+    WM_QUIT = 0x0012
+
+    def __init__(self, clock=time.time):
+        super().__init__(clock)
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._thread = None
+        self._thread_id = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="Win32Watcher", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        if self._thread_id is not None:
+            self._user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+            self._thread.join(1.0)
+            self._thread_id = None
+
+    def _title(self, hwnd):
+        length = self._user32.GetWindowTextLengthW(hwnd)
+        buffer = self._ctypes.create_unicode_buffer(length + 1)
+        self._user32.GetWindowTextW(hwnd, buffer, length + 1)
+        return buffer.value
+
+    def _run(self):
+        ctypes, wintypes, user32 = self._ctypes, self._wintypes, self._user32
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+        )
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.SetWinEventHook.argtypes = [
+            wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WinEventProc,
+            wintypes.DWORD, wintypes.DWORD, wintypes.DWORD
+        ]
+
+        def on_event(hook, event, hwnd, id_object, id_child, thread_id, event_ms):
+            if event == self.EVENT_OBJECT_NAMECHANGE and (
+                    id_object != self.OBJID_WINDOW or hwnd != user32.GetForegroundWindow()):
+                return
+            self._emit(self._title(hwnd))
+
+        self._callback = WinEventProc(on_event)  # must outlive the hooks
+        hooks = [
+            user32.SetWinEventHook(event, event, 0, self._callback, 0, 0, self.WINEVENT_OUTOFCONTEXT)
+            for event in (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_OBJECT_NAMECHANGE)
+        ]
+        if not all(hooks):
+            self._error = OSError("SetWinEventHook failed")
+            self._ready.set()
+            return
+        self._thread_id = self._kernel32.GetCurrentThreadId()
+        self._emit(self._title(user32.GetForegroundWindow()))
+        self._ready.set()
+
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        for hook in hooks:
+            user32.UnhookWinEvent(hook)
+
+
+class X11Watcher(WindowWatcher):
+    """Foreground changes via _NET_ACTIVE_WINDOW PropertyNotify on X11
+
+    With python-xlib the watcher thread selects PropertyChangeMask on the
+    root window (for _NET_ACTIVE_WINDOW) and on the active window (for its
+    title). Without it, ``xprop -spy`` does the same from subprocesses.
+    """
+
+    def __init__(self, clock=time.time):
+        super().__init__(clock)
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        self._closed = False
+        self._spies = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="X11Watcher", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            for spy in self._spies:
+                spy.terminate()
+            self._spies = []
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def _run(self):
+        try:
+            # Xlib connections are not thread-safe, so this thread owns its own
+            sampler = X11Sampler()
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        if sampler._display is not None:
+            self._run_xlib(sampler)
+        else:
+            self._run_xprop(sampler)
+
+    def _run_xlib(self, sampler):
+        from Xlib import X
+        display = sampler._display
+        atoms = sampler._atoms
+        title_atoms = {atoms["_NET_WM_NAME"], display.intern_atom("WM_NAME")}
+        sampler._root.change_attributes(event_mask=X.PropertyChangeMask)
+        watched = None
+
+        def follow_active():
+            nonlocal watched
+            window_id, title, pid = sampler._query_xlib()
+            if window_id != watched:
+                if watched:
+                    try:
+                        display.create_resource_object("window", watched).change_attributes(event_mask=0)
+                    except Exception:
+                        pass  # already destroyed
+                if window_id:
+                    display.create_resource_object("window", window_id).change_attributes(
+                        event_mask=X.PropertyChangeMask
+                    )
+                watched = window_id
+            self._emit(title, read_proc_name(pid))
+
+        try:
+            follow_active()
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        while not self._closed:
+            try:
+                if not display.pending_events():
+                    select.select([display.fileno()], [], [], 0.5)
+                    continue
+                event = display.next_event()
+                if event.type != X.PropertyNotify:
+                    continue
+                if event.atom == atoms["_NET_ACTIVE_WINDOW"] or (
+                        event.atom in title_atoms and event.window.id == watched):
+                    follow_active()
+            except Exception as e:
+                print(f"Error watching windows: {e}")
+                time.sleep(0.5)
+        sampler.close()
+
+    def _run_xprop(self, sampler):
+        try:
+            root_spy = self._spy(["xprop", "-root", "-spy", "_NET_ACTIVE_WINDOW"])
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        title_spy = None
+        for line in root_spy.stdout:
+            if self._closed:
+                break
+            window_id = line.strip().rsplit(" ", 1)[-1]
+            if title_spy is not None:
+                title_spy.terminate()
+                title_spy = None
+            if not window_id.startswith("0x") or int(window_id, 16) == 0:
+                self._emit("")
+                continue
+            # The title spy prints the current titles at once, then every change
+            title_spy = self._spy(["xprop", "-id", window_id, "-spy", *XPROP_TITLE_PROPERTIES])
+            pid = sampler._query_xprop()[2]
+            threading.Thread(
+                target=self._follow_title, args=(title_spy, read_proc_name(pid)), daemon=True
+            ).start()
+
+    def _follow_title(self, spy, process):
+        # Wait until every title property has been reported once, then emit
+        # the preferred one that is set (WM_NAME for clients without
+        # _NET_WM_NAME, or "" for an untitled window) on each change
+        values = {}
+        for line in spy.stdout:
+            name, value = parse_xprop_line(line)
+            if name not in XPROP_TITLE_PROPERTIES:
+                continue
+            values[name] = value
+            if len(values) == len(XPROP_TITLE_PROPERTIES):
+                self._emit(xprop_title(values), process)
+
+    def _spy(self, args):
+        spy = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        with self._lock:
+            self._spies = [p for p in self._spies if p.poll() is None] + [spy]
+        return spy
+
+
+def create_window_source(trace=None, mode=None):
+    """Pick how to follow the foreground window
+
+    ``mode`` (default: the WORKWISE_WINDOW_MODE environment variable) is
+    "events" to subscribe to focus changes, falling back to polling when the
+    platform cannot deliver them, or "poll" to always poll. A ``trace`` is
+    always replayed by polling.
+    """
+    if trace:
+        return ReplaySampler.from_file(trace)
+    mode = mode or os.environ.get("WORKWISE_WINDOW_MODE", "events")
+    if mode == "events":
+        try:
+            watcher = Win32Watcher() if sys.platform == "win32" else X11Watcher()
+            watcher.start()
+            return watcher
+        except Exception as e:
+            print(f"Window events unavailable, polling instead: {e}")
+    return create_sampler()